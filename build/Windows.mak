@@ -8,7 +8,7 @@ WIN.COMMA=,
 WIN.COPY_SCRIPT:=$(subst /,\,$(STAT_ROOT))\build\copy.cmd
 
 OS.REMOVE_DIR=@if exist $(1) @rmdir /Q /S $(subst /,\,$(1)/) >nul
-OS.MAKE_DIR=@md $(subst /,\,$(1)) >nul
+OS.MAKE_DIR=@if not exist $(subst /,\,$(1)) md $(subst /,\,$(1)) >nul
 OS.COPY=@$(WIN.COPY_SCRIPT) $(1) $(2) $(3) >nul
 OS.TOUCH=@copy /B $(1)+$(WIN.COMMA)$(WIN.COMMA) $(1)
 OS.DEFAULT_TOOLS=msvs
@@ -11,6 +11,22 @@ INCLUDES:=$(addsuffix /,$(strip $(INCLUDES)))
 INCLUDES:=$(INCLUDES://=/)
 DUMMY_INTERFACES:=$(wildcard $(addprefix $(DUMMIES_DIR)/,$(DUMMY_INTERFACES)))
 DEFINES:=$(addprefix -D,$(strip $(DEFINES)))
+
+# Shared runtime library (STAT and Unity sources), used only if built for the very same definitions
+ifneq ("$(STAT_RUNTIME_DIR)", "")
+-include $(STAT_RUNTIME_DIR)/signature.mak
+ifneq ($(STAT_RUNTIME_SIGNATURE),)
+ifneq ($(STAT_RUNTIME_SIGNATURE),$(DEFINES))
+STAT_RUNTIME_DIR:=
+endif
+endif
+endif
+ifneq ("$(STAT_RUNTIME_DIR)", "")
+STAT_RUNTIME_SOURCES:=$(filter $(STAT_SOURCES),$(SOURCES))
+STAT_RUNTIME_OBJECTS:=$(addprefix $(STAT_RUNTIME_DIR)/,$(subst .c,.$(TOOLS.OBJEXT),$(notdir $(STAT_RUNTIME_SOURCES))))
+STAT_RUNTIME_LIBRARY:=$(STAT_RUNTIME_DIR)/stat.$(TOOLS.LIBEXT)
+SOURCES:=$(filter-out $(STAT_RUNTIME_SOURCES),$(SOURCES))
+endif
 SOURCE_DIRS:=$(sort $(dir $(SOURCES)))
 
 # Build outputs
@@ -19,6 +35,13 @@ OBJECTS:=$(addprefix $(OBJECTS_DIR)/,$(subst .c,.$(TOOLS.OBJEXT),$(notdir $(SOUR
 DEPENDENCIES:=$(subst .$(TOOLS.OBJEXT),.d,$(OBJECTS)))
 EXECUTABLE:=$(BINARY_DIR)/$(OUTPUT_EXEC)
 TIMESTAMP_FILE:=$(basename $(EXECUTABLE)).txt
+COMPILE_INCLUDES=$(HEADERS_DIR)
+
+# The overlay of headers shared by packages (if provided) replaces the installation of the headers per package
+ifneq ("$(STAT_HEADERS_DIR)", "")
+COMPILE_INCLUDES=$(STAT_HEADERS_DIR)
+ALL_OUTPUT_DIRS:=$(OBJECTS_DIR) $(BINARY_DIR)
+endif
 
 # Break-line variable for multiline output of iterative processes
 define NEW_LINE_BREAK
@@ -27,7 +50,6 @@ define NEW_LINE_BREAK
 endef
 
 # Operation definitions
-RECOMPILE_COMMAND=$(eval OBJECT_FILE=$(OBJECTS_DIR)/$(notdir $(SOURCE_FILE:.c=.$(TOOLS.OBJEXT)))) $(TOOLS.COMPILE)
 COPY_METHOD_FLAGS:=$(if $(INSTALL_BY_COPY),-p,-p -s)
 
 # Cleanup prerequisite according to make commandline targets
@@ -42,27 +64,57 @@ $(info Building '$(firstword $(MAKEFILE_LIST))' for '$(PRODUCT_FLAVOR)')
 $(info $(if $(TOOLS.NAME),with <tools="$(TOOLS.NAME)">,)...)
 
 
-.PHONY: build rebuild cleanup_headers
+.PHONY: build rebuild cleanup_headers stat_runtime
 
 
 build: $(EXECUTABLE) | $(PRECEDING_CLEANUP) $(ALL_OUTPUT_DIRS)
 	@echo $(if $(LINKING_DONE),Done.,Up-to-date already.)
 
 
-rebuild: $(PRECEDING_CLEANUP) $(ALL_OUTPUT_DIRS)
-	@echo Installing dependencies...
-	$(call OS.COPY,-n $(COPY_METHOD_FLAGS),$(DUMMY_INTERFACES),$(HEADERS_DIR))
-	$(call OS.COPY,-n $(COPY_METHOD_FLAGS),$(foreach _dir_,$(INCLUDES),$(_dir_)*.h),$(HEADERS_DIR))
-	@echo Compiling all...
-	$(foreach SOURCE_FILE,$(SOURCES),$(RECOMPILE_COMMAND) $(NEW_LINE_BREAK))
-	@echo Linking...
-	$(TOOLS.LINK)
+rebuild: $(EXECUTABLE)
 	@echo Done.
 
 
 $(ALL_OUTPUT_DIRS): | $(PRECEDING_CLEANUP)
 	$(call OS.MAKE_DIR,$@)
 
+# Upon parallel jobs (-j), the existence of directories may be checked before the preceding cleanup removes them
+ifneq ($(PRECEDING_CLEANUP),)
+.PHONY: $(ALL_OUTPUT_DIRS)
+endif
+
+
+stat_runtime: $(STAT_RUNTIME_LIBRARY)
+	@echo $(if $(STAT_RUNTIME_LIBRARY),Runtime is ready.,Runtime is built along with the package.)
+
+
+# Build the shared runtime library once per variant of definitions, instead of compiling it for each package
+ifneq ("$(STAT_RUNTIME_DIR)", "")
+
+$(STAT_RUNTIME_LIBRARY): $(STAT_RUNTIME_OBJECTS)
+	@echo Archiving runtime...
+	$(TOOLS.ARCHIVE)
+	$(file >$(STAT_RUNTIME_DIR)/signature.mak,STAT_RUNTIME_SIGNATURE:=$(DEFINES))
+
+$(STAT_RUNTIME_OBJECTS): $(wildcard $(STAT_ROOT)/unity/*.h $(STAT_ROOT)/lib/inc/*.h) | $(STAT_RUNTIME_DIR)
+$(STAT_RUNTIME_OBJECTS): COMPILE_INCLUDES:=$(STAT_ROOT)/unity $(STAT_ROOT)/lib/inc
+$(STAT_RUNTIME_OBJECTS): OBJECTS_DIR:=$(STAT_RUNTIME_DIR)
+$(STAT_RUNTIME_OBJECTS): SOURCE_FILE=$<
+$(STAT_RUNTIME_OBJECTS): OBJECT_FILE=$@
+$(STAT_RUNTIME_OBJECTS): DEP_FILE=
+
+$(STAT_RUNTIME_DIR):
+	$(call OS.MAKE_DIR,$@)
+
+# Compilation macro for the runtime sources, which depend on the runtime headers only
+define composeRuntimeCompilationRule
+$(STAT_RUNTIME_DIR)/%.$(TOOLS.OBJEXT): $(1)%.c
+	$$(TOOLS.COMPILE)
+endef
+$(foreach sourceDir,$(sort $(dir $(STAT_RUNTIME_SOURCES))),$(eval $(call composeRuntimeCompilationRule,$(sourceDir))))
+
+endif
+
 
 # Set incremental build targets, if not a rebuild target was sepcified explicitely
 ifeq ($(filter rebuild, $(MAKECMDGOALS)),)
@@ -72,11 +124,15 @@ ORIGINAL_HEADERS:=$(DUMMY_INTERFACES)
 define addIncludePath
 ORIGINAL_HEADERS+=$$(filter-out $$(addprefix $(1),$$(notdir $$(ORIGINAL_HEADERS))), $$(wildcard $(1)*.h))
 endef
+ifeq ("$(STAT_HEADERS_DIR)", "")
 $(foreach includeDir,$(INCLUDES),$(eval $(call addIncludePath,$(includeDir))))
+else
+ORIGINAL_HEADERS:=
+endif
 INCLUDE_DIRS:=$(sort $(dir $(ORIGINAL_HEADERS)))
 TARGET_HEADERS:=$(addprefix $(HEADERS_DIR)/,$(notdir $(ORIGINAL_HEADERS)))
 
-$(EXECUTABLE) : $(OBJECTS) | $(ALL_OUTPUT_DIRS) $(TIMESTAMP_FILE)
+$(EXECUTABLE) : $(OBJECTS) $(STAT_RUNTIME_LIBRARY) | $(ALL_OUTPUT_DIRS) $(TIMESTAMP_FILE)
 	@echo Linking...
 	$(TOOLS.LINK)
 	$(file >$(TIMESTAMP_FILE),$?)
@@ -101,24 +157,50 @@ $(TIMESTAMP_FILE): $(ORIGINAL_HEADERS) | $(ALL_OUTPUT_DIRS)
 	$(eval CHANGED_INCLUDES:=$(sort $(dir $(CHANGED_HEADERS))))
 	$(foreach includeDir,$(CHANGED_INCLUDES),$(call installHeaders,$(includeDir)) $(NEW_LINE_BREAK))
 
+# Include dependency files (if ready)
+include $(wildcard $(DEPENDENCIES))
+
+# Otherwise, rebuild the package via the very same per-object targets, though remade regardless of their timestamps, so
+# that the translation units are compiled in parallel upon parallel jobs (-j)
+else
+
+.PHONY: install_headers forced_remake
+
+forced_remake:
+
+install_headers: | $(PRECEDING_CLEANUP) $(ALL_OUTPUT_DIRS)
+	@echo Installing dependencies...
+	$(if $(STAT_HEADERS_DIR),,$(call OS.COPY,-n $(COPY_METHOD_FLAGS),$(DUMMY_INTERFACES),$(HEADERS_DIR)))
+	$(if $(STAT_HEADERS_DIR),,$(call OS.COPY,-n $(COPY_METHOD_FLAGS),$(foreach _dir_,$(INCLUDES),$(_dir_)*.h),$(HEADERS_DIR)))
+	@echo Compiling all...
+
+$(EXECUTABLE) : $(OBJECTS) $(STAT_RUNTIME_LIBRARY) forced_remake | $(ALL_OUTPUT_DIRS)
+	@echo Linking...
+	$(TOOLS.LINK)
+
+# The objects shared with other packages were compiled anew ahead of the packages (as listed by STAT), so that they're
+# not remade into the very same files, which other packages may be linking concurrently
+-include $(OBJECTS_DIR)/shared_objects.mak
+$(filter-out $(STAT_SHARED_OBJECTS),$(OBJECTS)): forced_remake | install_headers
+$(filter $(STAT_SHARED_OBJECTS),$(OBJECTS)): | install_headers
+
+endif
+
 $(OBJECTS_DIR)/%.d:
 	@echo $@>$(OS.NULL_OUTPUT)
 
+# The variables of compilation recipes are target-specific, so that the parallel jobs (-j) never share them
+$(OBJECTS_DIR)/%.$(TOOLS.OBJEXT): SOURCE_FILE=$<
+$(OBJECTS_DIR)/%.$(TOOLS.OBJEXT): OBJECT_FILE=$@
+$(OBJECTS_DIR)/%.$(TOOLS.OBJEXT): DEP_FILE=$(subst .$(TOOLS.OBJEXT),.d,$@)
+
 # Compilation macro for dynamic creation of compilation targets per source folder
 define composeCompilationRule
 $(OBJECTS_DIR)/%.$(TOOLS.OBJEXT): $(1)%.c $(OBJECTS_DIR)/%.d | $(ALL_OUTPUT_DIRS)
-	$$(eval SOURCE_FILE=$$<)
-	$$(eval OBJECT_FILE=$$@)
-	$$(eval DEP_FILE=$$(subst .$$(TOOLS.OBJEXT),.d,$$@))
 	$$(TOOLS.COMPILE)
 endef
 $(foreach sourceDir,$(SOURCE_DIRS),$(eval $(call composeCompilationRule,$(sourceDir))))
 
-# Include dependency files (if ready)
-include $(wildcard $(DEPENDENCIES))
-
-endif
-
 cleanup_headers:
 	$(call OS.REMOVE_DIR, $(HEADERS_DIR))
 
@@ -7,22 +7,26 @@
 
 # GCC tool-chain local definitions
 GFLAGS=-g -Wall -Wno-pointer-to-int-cast -Wno-int-to-pointer-cast -Werror
-CFLAGS=$(GFLAGS) -c -I $(HEADERS_DIR) $(DEFINES) -o $(OBJECT_FILE)
+CFLAGS=$(GFLAGS) -c $(addprefix -I ,$(COMPILE_INCLUDES)) $(DEFINES) -o $(OBJECT_FILE)
 DEPFLAGS=-MT $(OBJECT_FILE) -MMD -MP -MF $(DEP_FILE).tmp
 LFLAGS=$(GFLAGS)
 CC=gcc
 LINK=gcc
+AR=ar
+CACHED_CC=$(if $(and $(STAT_PYTHON),$(CACHE_DIR)),"$(STAT_PYTHON)" $(STAT_ROOT)/stat_cache.py $(CACHE_DIR) $(CC),$(CC))
 COMPILE_WITH_DEPS=\
-	@$(CC) $(DEPFLAGS) $(CFLAGS) "$(abspath $(SOURCE_FILE))"\
+	@$(CACHED_CC) $(DEPFLAGS) $(CFLAGS) "$(abspath $(SOURCE_FILE))"\
 	$(NEW_LINE_BREAK) $(call OS.CPY, $(DEP_FILE).tmp, $(DEP_FILE))\
 	$(NEW_LINE_BREAK) $(call OS.TOUCH, $(OBJECT_FILE))
 
 # GCC tool-chain global definitions
 TOOLS.OBJEXT:=o
+TOOLS.LIBEXT:=a
 TOOLS.NAME=$(shell $(CC) --version | grep $(CC))
 
 # MSVS command-lines
-TOOLS.COMPILE = $(if $(DEP_FILE), $(COMPILE_WITH_DEPS), @$(CC) $(CFLAGS) "$(abspath $(SOURCE_FILE))")
-TOOLS.LINK = @$(LINK) $(LFLAGS) -o $(EXECUTABLE) $(OBJECTS)
+TOOLS.COMPILE = $(if $(DEP_FILE), $(COMPILE_WITH_DEPS), @$(CACHED_CC) $(CFLAGS) "$(abspath $(SOURCE_FILE))")
+TOOLS.LINK = @$(LINK) $(LFLAGS) -o $(EXECUTABLE) $(OBJECTS) $(STAT_RUNTIME_LIBRARY)
+TOOLS.ARCHIVE = @$(AR) rcs $(STAT_RUNTIME_LIBRARY) $(STAT_RUNTIME_OBJECTS)
 
 include $(STAT_ROOT)/build/engine.mak
\ No newline at end of file
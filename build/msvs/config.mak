@@ -16,27 +16,30 @@ ifeq ("$(STAT_MSVS_IN_LOOP)", "YES")
 $(error  Failed to setup MSVS tools)
 endif
 
-build rebuild:
+build rebuild stat_runtime:
 	@call "%STAT_ROOT:/=\%\build\msvs\setup.cmd" $(MAKE) --no-print-directory -f $(firstword $(MAKEFILE_LIST)) $@
 
 # After MSVS-environment got set, run make -----------------------------------------------------------------------------
 else
 
 # MSVS tool-chain local definitions
-CFLAGS=-FD -WX -W3 -Zi -c -nologo $(DEFINES) -Fd$(OBJECTS_DIR)/ -I$(HEADERS_DIR)/ -Fo$(OBJECTS_DIR)/
+CFLAGS=-FD -FS -WX -W3 -Zi -c -nologo $(DEFINES) -Fd$(OBJECTS_DIR)/ $(addprefix -I,$(addsuffix /,$(COMPILE_INCLUDES))) -Fo$(OBJECTS_DIR)/
 CC=cl
 LINK=link
+LIBRARIAN=lib
 COMPILE_WITH_DEPS=\
 	$(file >$(abspath $(DEP_FILE)), $(subst .d,.$(TOOLS.OBJEXT),$(DEP_FILE)) : $(HEADERS))\
 	$(NEW_LINE_BREAK)  @$(CC) $(CFLAGS) "$(subst /,\,$(abspath $(SOURCE_FILE)))"
 
 # MSVS tool-chain global definitions
 TOOLS.OBJEXT:=obj
+TOOLS.LIBEXT:=lib
 TOOLS.NAME=$(VSINSTALLDIR)
 
 # MSVS command-lines
 TOOLS.COMPILE = $(if $(DEP_FILE), $(COMPILE_WITH_DEPS), @$(CC) $(CFLAGS) "$(subst /,\,$(abspath $(SOURCE_FILE)))")
-TOOLS.LINK = @$(LINK) -NOLOGO -DEBUG -out:$(subst /,\,$(EXECUTABLE)) $(OBJECTS)
+TOOLS.LINK = @$(LINK) -NOLOGO -DEBUG -out:$(subst /,\,$(EXECUTABLE)) $(OBJECTS) $(STAT_RUNTIME_LIBRARY)
+TOOLS.ARCHIVE = @$(LIBRARIAN) -NOLOGO -out:$(subst /,\,$(STAT_RUNTIME_LIBRARY)) $(STAT_RUNTIME_OBJECTS)
 
 include $(STAT_ROOT)/build/engine.mak
 
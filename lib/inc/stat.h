@@ -30,6 +30,58 @@
 /*     MACROS                                                                 */
 /******************************************************************************/
 
+/*****************************************/
+/* STAT-Timing :: Per-test Timing Records */
+/*****************************************
+*
+* This built-in feature of STAT measures the duration of each test (along with its 
+* setup and tear-down) by a monotonic clock. To compile it into a STAT-based 
+* test-package add the following define to a makefile:
+*
+*       STAT_TIMING
+*
+* Each test then emits a timing record as a line of its own, after its tear-down:
+*
+*       STAT_TIMING:<test name>:<duration in microseconds>
+*/
+
+/***********************************************/
+/* STAT-Shards :: Subsets of Tests of Packages */
+/***********************************************
+*
+* The tests of a package (i.e. the RUN_TEST invocations) are numbered in the order
+* of their invocation, so that a shard of the package runs a deterministic subset 
+* of them. The shard is selected by the following environment variable:
+*
+*       STAT_SHARD=<0-based index of the shard>/<amount of shards>
+*
+* The shard runs each test, whose number modulo the amount of shards equals its 
+* index, while the rest of the tests are skipped. All the tests are run upon no 
+* (or malformed) selection. A shard announces the number of each test it runs as
+* a line of its own ahead of the test:
+*
+*       STAT_INDEX:<test name>:<number of the test>
+*
+* The tests can also be selected by their names, i.e. by a glob-pattern (where '*' 
+* matches any sequence of characters and '?' matches any single character) given by
+* the following environment variable:
+*
+*       STAT_TEST_FILTER=<glob-pattern>
+*
+* The tests that are not selected are skipped along with their setup and tear-down.
+*/
+#ifndef UNITY_SKIP_DEFAULT_RUNNER
+#undef RUN_TEST
+#if defined(UNITY_SUPPORT_VARIADIC_MACROS)
+#define RUN_TEST(...) _STAT_RUN_TEST_AT_LINE(__VA_ARGS__, __LINE__, throwaway)
+#define _STAT_RUN_TEST_AT_LINE(_func_, _line_, ...) Stat_RunTest(_func_, #_func_, _line_)
+#elif defined(CMOCK)
+#define RUN_TEST(_func_, _line_) Stat_RunTest(_func_, #_func_, _line_)
+#else
+#define RUN_TEST(_func_) Stat_RunTest(_func_, #_func_, __LINE__)
+#endif
+#endif
+
 /***************************************/
 /* STAT-Mock :: Light-weight Mock APIs */
 /***************************************
@@ -251,6 +303,18 @@ typedef enum _TAG_STAT_RNG_SOURCES
 */
 void Stat_SetTestSetupTeardownHandlers(STAT_HANDLER setupHandler, STAT_HANDLER teardownHandler);
 
+/**
+* Runs the test (through the default runner of Unity), if it belongs to the 
+* selected shard of the package and matches the filter of tests, see STAT-Shards
+*
+* @param func - the test function
+* @param name - the name of the test
+* @param line - the line of the test
+*
+* @return None
+*/
+void Stat_RunTest(UnityTestFunction func, const char *name, const int line);
+
 /**
 * Generates a random number using the specified RNG source
 *
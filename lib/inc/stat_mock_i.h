@@ -66,6 +66,14 @@
 #define STAT_MOCK_CALL_EXTENDED_RFU \
   (32 - STAT_MOCK_CALL_EXTENDED_CALL_ORDER - STAT_MOCK_BITFIELD_BOOL_SIZE)
 
+#ifdef STAT_MOCK_INDEX
+#if (STAT_MOCK_INDEX < 1)
+#error "STAT-Mock Index shall have at least a single slot!"
+#endif
+// Marks an entry of a declarator left out of the index (upon its overflow), i.e. one to be looked up by a scan
+#define STAT_MOCK_UNINDEXED_OFFSET ((_UU32)(-1))
+#endif
+
 /******************************************************************************/
 /*     MACROS                                                                 */
 /******************************************************************************/
@@ -101,9 +109,23 @@ typedef struct _StatMockBasicMetadata
 typedef struct _StatMockBasickEntry
 {
   _StatMockBasicMetadata_t metadata;
+#ifdef STAT_MOCK_INDEX
+  _UU32 nextOfDeclaratorOffset;
+#endif
   const char* declarator_p;
 }_StatMockBasicEntry_t;
 
+#ifdef STAT_MOCK_INDEX
+typedef struct _StatMockIndexSlot
+{
+  const char* declarator_p;
+  _UU32 hash;
+  _StatMockBasicEntry_t *first_p;
+  _StatMockBasicEntry_t *last_p;
+  _StatMockBasicEntry_t *unconsumed_p;
+}_StatMockIndexSlot_t;
+#endif
+
 typedef struct _StatMockExtendedMetadata
 {
   _UU32 extendedType  :STAT_MOCK_METADATA_EXTENDED_TYPE;
@@ -130,6 +152,11 @@ typedef struct _StatMockControlBlock
   _UU32 lastCallDataOffset;
   _UU32 callCount;
   _UU32 doCallOrderTracking;
+  _UU32 consumedOffset;
+#ifdef STAT_MOCK_INDEX
+  _UU32 isIndexOverflown;
+  _StatMockIndexSlot_t index[STAT_MOCK_INDEX];
+#endif
   _UU8 buffer[STAT_MOCK_ALIGNED_SIZE];
 }_StatMockControlBlock_t;
 
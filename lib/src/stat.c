@@ -16,11 +16,29 @@
 #include <stat_defs.h>
 #include <stat.h>
 #include <stat_i.h>
+#include <stdlib.h>
+#ifdef STAT_TIMING
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+#endif
 
 /******************************************************************************/
 /*     DEFINITIONS                                                            */
 /******************************************************************************/
 
+/* The environment variable selecting the shard of the package, i.e. "<index>/<amount of shards>" */
+#define STAT_SHARD_VARIABLE "STAT_SHARD"
+/* The environment variable selecting the tests of the package by their names, i.e. a glob-pattern */
+#define STAT_TEST_FILTER_VARIABLE "STAT_TEST_FILTER"
+
+/* The prefix of the record announcing the number of each test run by a shard (upon sharding) */
+#define STAT_INDEX_RECORD_PREFIX "STAT_INDEX:"
+/* The prefix of the timing record emitted per test (upon STAT_TIMING) */
+#define STAT_TIMING_RECORD_PREFIX "STAT_TIMING:"
+
 /******************************************************************************/
 /*     MACROS                                                                 */
 /******************************************************************************/
@@ -33,6 +51,16 @@
 /*     LOCAL PROTOTYPES                                                       */
 /******************************************************************************/
 static void Stat_DummyHandler(void);
+#ifndef UNITY_SKIP_DEFAULT_RUNNER
+static void Stat_SelectTests(void);
+static const char* Stat_ParseNumber(const char *string_p, _UU32 *number_p);
+static _UU32 Stat_IsMatchingGlob(const char *name_p, const char *glob_p);
+static void Stat_ReportTestIndex(const char *name_p, _UU32 index);
+#endif
+#ifdef STAT_TIMING
+static UNITY_UINT Stat_GetMonotonicMicroseconds(void);
+static void Stat_ReportTestTiming(void);
+#endif
 
 /******************************************************************************/
 /*     EXTERNAL PROTOTYPES                                                    */
@@ -43,6 +71,15 @@ static void Stat_DummyHandler(void);
 /******************************************************************************/
 STAT_HANDLER Stat_setupHandler = Stat_DummyHandler;
 STAT_HANDLER Stat_teardownHandler = Stat_DummyHandler;
+#ifndef UNITY_SKIP_DEFAULT_RUNNER
+static _UU32 Stat_shardIndex = 0;
+static _UU32 Stat_shardCount = 0; /* 0 - the shard is yet to be selected */
+static _UU32 Stat_testIndex = 0;
+static const char *Stat_testFilter_p = NULL;
+#endif
+#ifdef STAT_TIMING
+static UNITY_UINT Stat_testStartTime = 0;
+#endif
 
 /******************************************************************************/
 /*     START IMPLEMENTATION                                                   */
@@ -75,6 +112,134 @@ void Stat_SetTestSetupTeardownHandlers(STAT_HANDLER setupHandler, STAT_HANDLER t
   Stat_teardownHandler = (teardownHandler)? teardownHandler: Stat_DummyHandler;
 }
 
+#ifndef UNITY_SKIP_DEFAULT_RUNNER
+/**
+* Runs the test (through the default runner of Unity), if it belongs to the 
+* selected shard of the package and its name matches the filter of the tests 
+* (if any); the tests that are not selected are skipped along with their setup,
+* while a shard announces the number of each test it runs
+*
+* @param func - the test function
+* @param name - the name of the test
+* @param line - the line of the test
+*
+* @return None
+*/
+void Stat_RunTest(UnityTestFunction func, const char *name, const int line)
+{
+  _UU32 index;
+
+  if (!Stat_shardCount)
+  {
+    Stat_SelectTests();
+  }
+  index = Stat_testIndex++;
+  if ((index % Stat_shardCount == Stat_shardIndex) &&
+      (!Stat_testFilter_p || Stat_IsMatchingGlob(name, Stat_testFilter_p)))
+  {
+    if (Stat_shardCount > 1)
+    {
+      Stat_ReportTestIndex(name, index);
+    }
+    UnityDefaultTestRun(func, name, line);
+  }
+}
+
+/**
+* Emits the number of the test as a line of its own ahead of the test, i.e. 
+* "STAT_INDEX:<test name>:<number of the test>", so that the results of the 
+* shards are merged in the order of the tests
+*
+* @param name_p - the name of the test
+* @param index - the number of the test (in the order of the RUN_TEST invocations)
+*
+* @return None
+*/
+static void Stat_ReportTestIndex(const char *name_p, _UU32 index)
+{
+  UnityPrint(STAT_INDEX_RECORD_PREFIX);
+  UnityPrint(name_p);
+  UnityPrint(":");
+  UnityPrintNumberUnsigned(index);
+  UNITY_PRINT_EOL();
+}
+
+/* Selects the tests by the shard and by the filter announced by the environment (all the tests upon no selection) */
+static void Stat_SelectTests(void)
+{
+  const char *shard_p = getenv(STAT_SHARD_VARIABLE);
+  _UU32 index = 0;
+  _UU32 count = 0;
+
+  Stat_testFilter_p = getenv(STAT_TEST_FILTER_VARIABLE);
+  Stat_shardIndex = 0;
+  Stat_shardCount = 1;
+  if (!shard_p)
+  {
+    return;
+  }
+  shard_p = Stat_ParseNumber(shard_p, &index);
+  if (!shard_p || *shard_p++ != '/')
+  {
+    return;
+  }
+  shard_p = Stat_ParseNumber(shard_p, &count);
+  if (shard_p && !*shard_p && index < count)
+  {
+    Stat_shardIndex = index;
+    Stat_shardCount = count;
+  }
+}
+
+/* Parses the decimal number at the start of the string, returns the rest of the string (NULL if there is no number) */
+static const char* Stat_ParseNumber(const char *string_p, _UU32 *number_p)
+{
+  const char *next_p = string_p;
+
+  *number_p = 0;
+  while ('0' <= *next_p && *next_p <= '9')
+  {
+    *number_p = *number_p * 10 + (_UU32)(*next_p++ - '0');
+  }
+  return (next_p != string_p)? next_p: NULL;
+}
+
+/* Matches the name against the glob-pattern, where '*' matches any sequence of characters and '?' any character */
+static _UU32 Stat_IsMatchingGlob(const char *name_p, const char *glob_p)
+{
+  const char *star_p = NULL;
+  const char *resume_p = NULL;
+
+  while (*name_p)
+  {
+    if (*glob_p == '*')
+    {
+      star_p = glob_p++;
+      resume_p = name_p;
+    }
+    else if ((*glob_p == '?') || (*glob_p == *name_p))
+    {
+      glob_p++;
+      name_p++;
+    }
+    else if (star_p)
+    {
+      glob_p = star_p + 1;
+      name_p = ++resume_p;
+    }
+    else
+    {
+      return 0;
+    }
+  }
+  while (*glob_p == '*')
+  {
+    glob_p++;
+  }
+  return !*glob_p;
+}
+#endif
+
 /* A dummy handler for the test setup/tear-down handlers */
 static void Stat_DummyHandler(void)
 {
@@ -83,6 +248,9 @@ static void Stat_DummyHandler(void)
 /* Unity standard setup routine */
 void setUp(void)
 {
+#ifdef STAT_TIMING
+  Stat_testStartTime = Stat_GetMonotonicMicroseconds();
+#endif
   Stat_InitRng();
 #ifdef STAT_MOCK
   Stat_SetupMock();
@@ -103,8 +271,55 @@ void tearDown(void)
 #ifdef STAT_MOCK
   Stat_TearDownMock();
 #endif
+#ifdef STAT_TIMING
+  Stat_ReportTestTiming();
+#endif
 }
 
+#ifdef STAT_TIMING
+/* Reads a monotonic clock, which is immune to the adjustments of the time of the day */
+static UNITY_UINT Stat_GetMonotonicMicroseconds(void)
+{
+#ifdef _WIN32
+  LARGE_INTEGER counter;
+  LARGE_INTEGER frequency;
+
+  QueryPerformanceCounter(&counter);
+  QueryPerformanceFrequency(&frequency);
+  return (UNITY_UINT)((counter.QuadPart / frequency.QuadPart) * 1000000 +
+                      (counter.QuadPart % frequency.QuadPart) * 1000000 / frequency.QuadPart);
+#else
+  struct timespec now;
+
+  clock_gettime(CLOCK_MONOTONIC, &now);
+  return (UNITY_UINT)now.tv_sec * 1000000 + (UNITY_UINT)(now.tv_nsec / 1000);
+#endif
+}
+
+/**
+* Emits the timing record of the current test as a line of its own, i.e. 
+* "STAT_TIMING:<test name>:<duration in microseconds>", which covers the test
+* along with its setup and tear-down
+*
+* @return None
+*/
+static void Stat_ReportTestTiming(void)
+{
+  UNITY_UINT duration = Stat_GetMonotonicMicroseconds() - Stat_testStartTime;
+
+  /* Unity concludes the line of a failed or ignored test only after the tear-down */
+  if (Unity.CurrentTestFailed || Unity.CurrentTestIgnored)
+  {
+    UNITY_PRINT_EOL();
+  }
+  UnityPrint(STAT_TIMING_RECORD_PREFIX);
+  UnityPrint(Unity.CurrentTestName);
+  UnityPrint(":");
+  UnityPrintNumberUnsigned(duration);
+  UNITY_PRINT_EOL();
+}
+#endif
+
 void Stat_Memcpy(void *target_p, const void *source_p, _UU32 size)
 {
   _UU8 *nextTarget_p = (_UU8*)target_p + size;
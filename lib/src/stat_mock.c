@@ -23,6 +23,12 @@
 /*     DEFINITIONS                                                            */
 /******************************************************************************/
 
+#ifdef STAT_MOCK_INDEX
+// FNV-1a hashing of the declarators
+#define STAT_MOCK_INDEX_HASH_BASIS 2166136261UL
+#define STAT_MOCK_INDEX_HASH_PRIME 16777619UL
+#endif
+
 /******************************************************************************/
 /*     MACROS                                                                 */
 /******************************************************************************/
@@ -64,7 +70,6 @@ static _UU32 Stat_IsPrimitiveTestDouble(const _StatMockBasicEntry_t *entry_p);
 static _UU32 Stat_IsPureSpy(const _StatMockBasicEntry_t *entry_p);
 static _UU32 Stat_IsMockOverridden(const _StatMockBasicEntry_t *entry_p);
 static _UU32 Stat_IsInfiniteMock(const _StatMockBasicEntry_t *entry_p);
-static _UU32 Stat_IsTheOneAndUnconsumed(const _StatMockBasicEntry_t *entry_p, const char *declarator_p);
 static _UU32 Stat_IsMockConsumed(const _StatMockBasicEntry_t *entry_p);
 static _StatMockBasicEntry_t* Stat_PopNextMockEntry(const char *declarator_p);
 static void* Stat_CallOverridingHandler(_StatMockBasicEntry_t *entry_p, const void* dataToSpy_p);
@@ -89,6 +94,17 @@ static _UU32 Stat_CountOverriddenCalls(const _StatMockBasicEntry_t *entry_p);
 static _UU32 Stat_CountExtendedMockEntryCalls(const _StatMockBasicEntry_t *entry_p);
 static _UU32 Stat_CountExtendedMockExpectedUses(const _StatMockBasicEntry_t *entry_p);
 static _UU32 Stat_HasCallDataNoExtendedMetadata(const _StatMockBasicEntry_t *entry_p);
+static _StatMockBasicEntry_t* Stat_GetFirstEntryOfDeclarator(const char *declarator_p);
+static _StatMockBasicEntry_t* Stat_GetNextEntryOfDeclarator(const _StatMockBasicEntry_t *entry_p);
+static _StatMockBasicEntry_t* Stat_ScanForEntryOfDeclarator(const _StatMockBasicEntry_t *entry_p, const char *declarator_p);
+static _StatMockBasicEntry_t* Stat_FindUnconsumedEntry(const char *declarator_p);
+static _StatMockBasicEntry_t* Stat_SkipCalledEntries(_StatMockBasicEntry_t *entry_p);
+static void Stat_ValidateCallOrder(const _StatMockBasicEntry_t *unconsumed_p, const char *declarator_p);
+#ifdef STAT_MOCK_INDEX
+static void Stat_IndexEntry(_StatMockBasicEntry_t *entry_p);
+static _StatMockIndexSlot_t* Stat_LookUpIndexSlot(const char *declarator_p, _UU32 doInsert);
+static _UU32 Stat_HashDeclarator(const char *declarator_p);
+#endif
 
 /******************************************************************************/
 /*     EXTERNAL PROTOTYPES                                                    */
@@ -114,6 +130,11 @@ void Stat_SetupMock(void)
   Stat_mocks.callCount = 0;
   Stat_mocks.lastCallDataOffset = STAT_MOCK_ALIGNED_SIZE;
   Stat_mocks.doCallOrderTracking = 0;
+  Stat_mocks.consumedOffset = 0;
+#ifdef STAT_MOCK_INDEX
+  Stat_mocks.isIndexOverflown = 0;
+  Stat_Memset(Stat_mocks.index, 0, sizeof(Stat_mocks.index));
+#endif
 }
 
 /**
@@ -384,27 +405,24 @@ _UU32 Stat_GetCallOrder(const char *declarator_p, _UU32 creationIndex)
 */
 _UU32 Stat_CountCalls(const char *declarator_p)
 {
-  _StatMockBasicEntry_t *entry_p = (void*)Stat_mocks.buffer;
+  _StatMockBasicEntry_t *entry_p = Stat_GetFirstEntryOfDeclarator(declarator_p);
   _UU32 count = 0;
 
-  while (STAT_IS_MOCK_ITERATION_VALID(entry_p))
+  while (entry_p)
   {
-    if (Stat_AreStringsEqual(entry_p->declarator_p, declarator_p))
+    if ((entry_p->metadata.callOrder) && Stat_IsPrimitiveTestDouble(entry_p))
     {
-      if ((entry_p->metadata.callOrder) && Stat_IsPrimitiveTestDouble(entry_p))
-      {
-        count++;
-      }
-      else if (Stat_IsMockOverridden(entry_p))
-      {
-        count += Stat_CountOverriddenCalls(entry_p);
-      }
-      else if (entry_p->metadata.isExtended)
-      {
-        count += Stat_CountExtendedMockEntryCalls(entry_p);
-      }
+      count++;
     }
-    entry_p = Stat_GetNextMockEntry(entry_p);
+    else if (Stat_IsMockOverridden(entry_p))
+    {
+      count += Stat_CountOverriddenCalls(entry_p);
+    }
+    else if (entry_p->metadata.isExtended)
+    {
+      count += Stat_CountExtendedMockEntryCalls(entry_p);
+    }
+    entry_p = Stat_GetNextEntryOfDeclarator(entry_p);
   }
   
   return count;
@@ -419,23 +437,20 @@ _UU32 Stat_CountCalls(const char *declarator_p)
 */
 _UU32 Stat_CountCallables(const char *declarator_p)
 {
-  _StatMockBasicEntry_t *entry_p = (void*)Stat_mocks.buffer;
+  _StatMockBasicEntry_t *entry_p = Stat_GetFirstEntryOfDeclarator(declarator_p);
   _UU32 count = 0;
 
-  while (STAT_IS_MOCK_ITERATION_VALID(entry_p))
+  while (entry_p)
   {
-    if (Stat_AreStringsEqual(entry_p->declarator_p, declarator_p))
+    if (Stat_IsExtendedWithMockMetadata(entry_p))
     {
-      if (Stat_IsExtendedWithMockMetadata(entry_p))
-      {
-        count += Stat_CountExtendedMockExpectedUses(entry_p);
-      }
-      else
-      {
-        count++;
-      }
+      count += Stat_CountExtendedMockExpectedUses(entry_p);
     }
-    entry_p = Stat_GetNextMockEntry(entry_p);
+    else
+    {
+      count++;
+    }
+    entry_p = Stat_GetNextEntryOfDeclarator(entry_p);
   }
   
   return count;
@@ -449,18 +464,14 @@ _UU32 Stat_CountCallables(const char *declarator_p)
 */
 void* Stat_FindMock(const char *declarator_p)
 {
-  _StatMockBasicEntry_t *entry_p = (void*)Stat_mocks.buffer;
+  _StatMockBasicEntry_t *entry_p = Stat_GetFirstEntryOfDeclarator(declarator_p);
 
-  while (STAT_IS_MOCK_ITERATION_VALID(entry_p))
+  while (entry_p && Stat_IsPureSpy(entry_p))
   {
-    if (Stat_AreStringsEqual(entry_p->declarator_p, declarator_p) && !Stat_IsPureSpy(entry_p))
-    {
-      return entry_p;
-    }
-    entry_p = Stat_GetNextMockEntry(entry_p);
+    entry_p = Stat_GetNextEntryOfDeclarator(entry_p);
   }
   
-  return NULL;
+  return entry_p;
 }
 
 /**
@@ -471,49 +482,38 @@ void* Stat_FindMock(const char *declarator_p)
 */
 void* Stat_FindUnconsumedMock(const char *declarator_p)
 {
-  _StatMockBasicEntry_t *entry_p = (void*)Stat_mocks.buffer;
+  _StatMockBasicEntry_t *entry_p = Stat_FindUnconsumedEntry(declarator_p);
 
-  while (STAT_IS_MOCK_ITERATION_VALID(entry_p))
+  if (Stat_mocks.doCallOrderTracking)
   {
-    if (Stat_IsTheOneAndUnconsumed(entry_p, declarator_p))
-    {
-      return entry_p;
-    }
-    else if (Stat_mocks.doCallOrderTracking)
-    {
-      STAT_MOCK_ASSERT(Stat_IsMockConsumed(entry_p), "Consumed mock out of order for ", declarator_p);
-    }
-    entry_p = Stat_GetNextMockEntry(entry_p);
+    Stat_ValidateCallOrder(entry_p, declarator_p);
   }
 
-  return NULL;
+  return entry_p;
 }
 
 void* Stat_GetMockHandle(const char *declarator_p, _UU32 creationIndex)
 {
-  _StatMockBasicEntry_t *entry_p = (void*)Stat_mocks.buffer;
+  _StatMockBasicEntry_t *entry_p = Stat_GetFirstEntryOfDeclarator(declarator_p);
   _UU32 countDown = creationIndex;
   _UU32 callCount;
 
-  while (STAT_IS_MOCK_ITERATION_VALID(entry_p))
+  while (entry_p)
   {
-    if (Stat_AreStringsEqual(entry_p->declarator_p, declarator_p))
+    if (Stat_IsExtendedWithMockMetadata(entry_p))
     {
-      if (Stat_IsExtendedWithMockMetadata(entry_p))
-      {
-        callCount = Stat_CountExtendedMockEntryCalls(entry_p);
-        if (callCount > countDown)
-        {
-          return entry_p;
-        }
-        countDown -= callCount;
-      }
-      else if (0 == countDown--)
+      callCount = Stat_CountExtendedMockEntryCalls(entry_p);
+      if (callCount > countDown)
       {
         return entry_p;
       }
+      countDown -= callCount;
     }
-    entry_p = Stat_GetNextMockEntry(entry_p);
+    else if (0 == countDown--)
+    {
+      return entry_p;
+    }
+    entry_p = Stat_GetNextEntryOfDeclarator(entry_p);
   }
   
   return NULL;
@@ -589,6 +589,9 @@ static _StatMockBasicEntry_t* Stat_AllocateEntry(const char *declarator_p, _UU32
   entry_p->metadata.nextOffset = _STAT_MOCK_BYTES_2_ENTRY_OFFSET(Stat_mocks.mockOffsetToAllocate);
   entry_p->metadata.isExtended = isExtended;
   entry_p->metadata.hasCallback = hasCallback;
+#ifdef STAT_MOCK_INDEX
+  Stat_IndexEntry(entry_p);
+#endif
   return entry_p;
 }
 
@@ -629,11 +632,6 @@ static _UU32 Stat_IsInfiniteMock(const _StatMockBasicEntry_t *entry_p)
     (STAT_MOCK_INFINITE_TYPE == extended_p->extendedType);
 }
 
-static _UU32 Stat_IsTheOneAndUnconsumed(const _StatMockBasicEntry_t *entry_p, const char *declarator_p)
-{
-  return !(entry_p->metadata.callOrder) && Stat_AreStringsEqual(entry_p->declarator_p, declarator_p);
-}
-
 static _UU32 Stat_IsMockConsumed(const _StatMockBasicEntry_t *entry_p)
 {
   return entry_p->metadata.callOrder || Stat_IsMockOverridden(entry_p) || Stat_IsInfiniteMock(entry_p);
@@ -884,6 +882,164 @@ static _UU32 Stat_HasCallDataNoExtendedMetadata(const _StatMockBasicEntry_t *ent
   return (STAT_MOCK_CALL_ORDER_NATURAL_MAX > entry_p->metadata.callOrder) && !Stat_IsExtendedWithMockMetadata(entry_p);
 }
 
+static _StatMockBasicEntry_t* Stat_GetFirstEntryOfDeclarator(const char *declarator_p)
+{
+#ifdef STAT_MOCK_INDEX
+  _StatMockIndexSlot_t *slot_p = Stat_LookUpIndexSlot(declarator_p, 0);
+  if (slot_p || !Stat_mocks.isIndexOverflown)
+  {
+    return (slot_p)? slot_p->first_p: NULL;
+  }
+#endif
+  return Stat_ScanForEntryOfDeclarator((void*)Stat_mocks.buffer, declarator_p);
+}
+
+static _StatMockBasicEntry_t* Stat_GetNextEntryOfDeclarator(const _StatMockBasicEntry_t *entry_p)
+{
+#ifdef STAT_MOCK_INDEX
+  _UU32 nextOffset = entry_p->nextOfDeclaratorOffset;
+  if (STAT_MOCK_UNINDEXED_OFFSET != nextOffset)
+  {
+    return (nextOffset)? (void*)&Stat_mocks.buffer[_STAT_MOCK_ENTRY_OFFSET_2_BYTES(nextOffset)]: NULL;
+  }
+#endif
+  return Stat_ScanForEntryOfDeclarator(Stat_GetNextMockEntry(entry_p), entry_p->declarator_p);
+}
+
+static _StatMockBasicEntry_t* Stat_ScanForEntryOfDeclarator(const _StatMockBasicEntry_t *entry_p, const char *declarator_p)
+{
+  while (STAT_IS_MOCK_ITERATION_VALID(entry_p))
+  {
+    if (Stat_AreStringsEqual(entry_p->declarator_p, declarator_p))
+    {
+      return (void*)entry_p;
+    }
+    entry_p = Stat_GetNextMockEntry(entry_p);
+  }
+  return NULL;
+}
+
+/**
+* Finds the first entry of the declarator that was never called (e.g. the Mock to pop next). The index keeps a
+* cursor per declarator for it, since the entries are called in the order of their creation
+*/
+static _StatMockBasicEntry_t* Stat_FindUnconsumedEntry(const char *declarator_p)
+{
+#ifdef STAT_MOCK_INDEX
+  _StatMockIndexSlot_t *slot_p = Stat_LookUpIndexSlot(declarator_p, 0);
+  if (slot_p)
+  {
+    slot_p->unconsumed_p = Stat_SkipCalledEntries(slot_p->unconsumed_p);
+    return slot_p->unconsumed_p;
+  }
+#endif
+  return Stat_SkipCalledEntries(Stat_GetFirstEntryOfDeclarator(declarator_p));
+}
+
+static _StatMockBasicEntry_t* Stat_SkipCalledEntries(_StatMockBasicEntry_t *entry_p)
+{
+  while (entry_p && entry_p->metadata.callOrder)
+  {
+    entry_p = Stat_GetNextEntryOfDeclarator(entry_p);
+  }
+  return entry_p;
+}
+
+/**
+* Asserts that all entries (of any declarator) preceding the unconsumed one are consumed. The offset of the first
+* entry not consumed only advances, since no consumed entry becomes unconsumed again during a test
+*/
+static void Stat_ValidateCallOrder(const _StatMockBasicEntry_t *unconsumed_p, const char *declarator_p)
+{
+  _StatMockBasicEntry_t *entry_p = (void*)&Stat_mocks.buffer[Stat_mocks.consumedOffset];
+
+  while (STAT_IS_MOCK_ITERATION_VALID(entry_p) && Stat_IsMockConsumed(entry_p))
+  {
+    entry_p = Stat_GetNextMockEntry(entry_p);
+  }
+  Stat_mocks.consumedOffset = (_UU32)((_UU8*)entry_p - Stat_mocks.buffer);
+
+  STAT_MOCK_ASSERT(!STAT_IS_MOCK_ITERATION_VALID(entry_p) || (unconsumed_p && ((void*)entry_p >= (void*)unconsumed_p)), 
+    "Consumed mock out of order for ", declarator_p);
+}
+
+#ifdef STAT_MOCK_INDEX
+static void Stat_IndexEntry(_StatMockBasicEntry_t *entry_p)
+{
+  _StatMockIndexSlot_t *slot_p = Stat_LookUpIndexSlot(entry_p->declarator_p, !0);
+
+  if (!slot_p)
+  {
+    entry_p->nextOfDeclaratorOffset = STAT_MOCK_UNINDEXED_OFFSET;
+    return;
+  }
+
+  entry_p->nextOfDeclaratorOffset = 0;
+  if (slot_p->last_p)
+  {
+    slot_p->last_p->nextOfDeclaratorOffset = _STAT_MOCK_BYTES_2_ENTRY_OFFSET((_UU8*)entry_p - Stat_mocks.buffer);
+  }
+  else
+  {
+    slot_p->first_p = entry_p;
+  }
+  slot_p->last_p = entry_p;
+  if (!slot_p->unconsumed_p)
+  {
+    slot_p->unconsumed_p = entry_p;
+  }
+}
+
+/**
+* Looks up the slot of the declarator in the open-addressing table of the index, and inserts it upon request.
+* Declarators are never removed during a test, so an empty slot ends the probing
+*
+* @return the slot of the declarator; NULL - if not indexed (the index overflows upon a failure to insert)
+*/
+static _StatMockIndexSlot_t* Stat_LookUpIndexSlot(const char *declarator_p, _UU32 doInsert)
+{
+  _UU32 hash = Stat_HashDeclarator(declarator_p);
+  _StatMockIndexSlot_t *slot_p;
+  _UU32 probe;
+
+  for (probe = 0; probe < STAT_MOCK_INDEX; probe++)
+  {
+    slot_p = &Stat_mocks.index[(hash + probe) % STAT_MOCK_INDEX];
+    if (!slot_p->declarator_p)
+    {
+      if (doInsert)
+      {
+        slot_p->declarator_p = declarator_p;
+        slot_p->hash = hash;
+        return slot_p;
+      }
+      return NULL;
+    }
+    else if ((slot_p->hash == hash) && 
+      ((slot_p->declarator_p == declarator_p) || Stat_AreStringsEqual(slot_p->declarator_p, declarator_p)))
+    {
+      return slot_p;
+    }
+  }
+
+  if (doInsert)
+  {
+    Stat_mocks.isIndexOverflown = !0;
+  }
+  return NULL;
+}
+
+static _UU32 Stat_HashDeclarator(const char *declarator_p)
+{
+  _UU32 hash = STAT_MOCK_INDEX_HASH_BASIS;
+  while (*declarator_p)
+  {
+    hash = (hash ^ (_UU8)*declarator_p++) * STAT_MOCK_INDEX_HASH_PRIME;
+  }
+  return hash;
+}
+#endif
+
 #endif
 /******************************************************************************/
 /*     END OF FILE                                                            */
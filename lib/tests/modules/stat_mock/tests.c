@@ -21,6 +21,9 @@
 /*     DEFINITIONS                                                            */
 /******************************************************************************/
 
+// More declarators than the slots of the index that STAT-Mock is tested with
+#define TEST_MANY_DECLARATORS_COUNT 24
+
 /******************************************************************************/
 /*     MACROS                                                                 */
 /******************************************************************************/
@@ -83,6 +86,7 @@ static void Test_TestCountCalls(void);
 static void Test_TestHasMocks(void);
 static void Test_TestHasUnconsumedMocks(void);
 static void Test_TestFindUnconsumedMock(void);
+static void Test_TestMocksOfManyDeclarators(void);
 static void Test_TestMockTeardown(void);
 static void Test_TestAddMockNoOverflow(void);
 static void Test_TestAddMockWithOverflow(void);
@@ -181,6 +185,7 @@ _UU32 Test_RunMockMainTests(void)
   RUN_TEST(Test_TestHasMocks);
   RUN_TEST(Test_TestHasUnconsumedMocks);
   RUN_TEST(Test_TestFindUnconsumedMock);
+  RUN_TEST(Test_TestMocksOfManyDeclarators);
   RUN_TEST(Test_TestMockTeardown);
   RUN_TEST(Test_TestAddMockNoOverflow);
   RUN_TEST(Test_TestAddMockWithOverflow);
@@ -738,6 +743,36 @@ static void Test_TestFindUnconsumedMock(void)
   TEST_ASSERT_NULL(Stat_FindAnyUnconsumedMockEntry());
 }
 
+static void Test_TestMocksOfManyDeclarators(void)
+{
+  static char declarators[TEST_MANY_DECLARATORS_COUNT][2];
+  char declarator[2] = {0};
+  _UU32 index, value;
+
+  for (value = 0; value < (2 * TEST_MANY_DECLARATORS_COUNT); value++)
+  {
+    index = value % TEST_MANY_DECLARATORS_COUNT;
+    declarators[index][0] = (char)('A' + index);
+    Stat_AddMock(declarators[index], &value, sizeof(value), NULL);
+  }
+
+  STAT_ENFORCE_CALL_ORDER_TRACKING();
+  for (value = 0; value < (2 * TEST_MANY_DECLARATORS_COUNT); value++)
+  {
+    declarator[0] = (char)('A' + (value % TEST_MANY_DECLARATORS_COUNT));
+    TEST_ASSERT_EQUAL(value, *(_UU32*)Stat_PopMock(declarator, NULL, 0));
+  }
+  STAT_CEASE_CALL_ORDER_TRACKING();
+
+  for (index = 0; index < TEST_MANY_DECLARATORS_COUNT; index++)
+  {
+    TEST_ASSERT_EQUAL(2, Stat_CountCalls(declarators[index]));
+    TEST_ASSERT_EQUAL(1 + index + TEST_MANY_DECLARATORS_COUNT, Stat_GetCallOrder(declarators[index], 1));
+    TEST_ASSERT_NULL(Stat_FindUnconsumedMock(declarators[index]));
+  }
+  TEST_ASSERT_NULL(Stat_FindAnyUnconsumedMockEntry());
+}
+
 static void Test_TestMockTeardown(void)
 {
   Stat_TearDownMock();
@@ -12,7 +12,6 @@ import subprocess
 import sys
 from fnmatch import filter as filterFileNames
 from shutil import rmtree
-from threading import Thread
 from time import sleep
 from json import dump as dumpJson
 from shlex import split as splitCmdLine
@@ -74,27 +73,26 @@ def formatCommandLine(command):
         return command if isinstance(command, (list, tuple)) else splitCmdLine(command)
 
 
-def execute(command, beSilent=False, **kwargs):
+def execute(command, beSilent=False, lineHandler=None, **kwargs):
+    """
+    :param lineHandler: optional callable invoked per output line, which takes over the lines from the returned list,
+                        so that the memory doesn't grow along with the output
+    :return: the exit-code and the output lines (none of them, if handed to the lineHandler)
+    """
     commandLine = formatCommandLine(command)
     arguments = dict(bufsize=1, universal_newlines=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
     arguments.update(kwargs)
     process = subprocess.Popen(commandLine, **arguments)
     lines = []
-    thread = Thread(target=__captureOutputLines, args=(process, beSilent, lines))
-    thread.setDaemon(True)
-    thread.start()
-    thread.join()
-    process.communicate()
-    return process.returncode, lines
-
-
-def __captureOutputLines(process, beSilent, lines):
-    for _line in iter(process.stdout.readline, b''):
-        if _line == '':
-            break
-        lines.append(_line)
+    for _line in iter(process.stdout.readline, ''):
+        if lineHandler is None:
+            lines.append(_line)
+        else:
+            lineHandler(_line)
         if not beSilent:
             print(_line, end='')
+    process.communicate()
+    return process.returncode, lines
 
 
 def executeForOutput(command, **kwargs):
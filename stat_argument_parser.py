@@ -11,6 +11,7 @@ import stat_attributes as attributes
 from si_ide_writer import SourceInsightWriter
 from msvs_ide_writer import MsvsWriter
 from services import listMakefiles, countCpuCores
+from stat_scheduler import ENGINES, POOL_ENGINE
 from vscode_writer import VsCodeWriter
 
 STAT_MINIMAL_PARALLELISM = 2
@@ -24,6 +25,7 @@ class StatArgumentParser(object):
         self.__defaultProduct = defaultProduct
         self.__makeFiles = []
         self.__processes = 0
+        self.__runProcesses = 0
         self.__shallBeVerbose = True
         self.__shallRun = False
         self.__cleaningLevel = 0
@@ -47,6 +49,46 @@ class StatArgumentParser(object):
     def processes(self):
         return self.__processes
 
+    @property
+    def jobSlots(self):
+        """
+        :return: the amount of jobs the gear runs at once, shared by the test-packages and their translation units
+        """
+        return getattr(self.__instructions, 'processes', 0) if self.__processes else 0
+
+    @property
+    def runProcesses(self):
+        return self.__runProcesses
+
+    @property
+    def engine(self):
+        """
+        :return: the engine of the gear, i.e. either a pool of worker processes or a single event-loop
+        """
+        return getattr(self.__instructions, 'engine', POOL_ENGINE)
+
+    @property
+    def changes(self):
+        """
+        :return: None if all the test-packages are requested, an empty string if only the ones affected by the files
+                 modified since their last successful run, or a Git reference to select the ones affected since it
+        """
+        return getattr(self.__instructions, 'changes', None)
+
+    @property
+    def testFilter(self):
+        """
+        :return: the glob-pattern of the names of the tests to run (the rest of the tests are skipped); None if all
+        """
+        return getattr(self.__instructions, 'tests', None)
+
+    @property
+    def junit(self):
+        """
+        :return: the path of the JUnit XML file to report the results of the tests into; None if not requested
+        """
+        return getattr(self.__instructions, 'junit', None)
+
     @property
     def redundant(self):
         return getattr(self.__instructions, 'redundant', None)
@@ -57,6 +99,7 @@ class StatArgumentParser(object):
         self.__processes = min(getattr(self.__instructions, 'processes', 0), len(self.__makeFiles))
         self.__shallBeVerbose = self.__instructions.shallBeVerbose and self.__processes < STAT_MINIMAL_PARALLELISM
         self.__shallRun = self.shallBuild() and not self.__instructions.build_only
+        self.__runProcesses = self.__determineRunProcesses()
         self.__cleaningLevel = self.__instructions.cleaningLevel if self.__processes < STAT_MINIMAL_PARALLELISM else 1
         if self.ide is not None:
             pureArguments = arguments if arguments else sys.argv[1:]
@@ -72,6 +115,9 @@ class StatArgumentParser(object):
     def shallRun(self):
         return self.__shallRun
 
+    def shallForceRun(self):
+        return getattr(self.__instructions, 'force_run', False)
+
     def shallBeVerbose(self):
         return self.__shallBeVerbose
 
@@ -119,10 +165,26 @@ class StatArgumentParser(object):
                                  '\n- [not specified] = incremental build, i.e. no preceding cleaning'
                                  '\n- -c = rebuild the target by just overwriting the artifact of previous build'
                                  '\n- -cc = clear the artifacts of previous build and rebuild the target from scratch')
+        parser.add_argument('-f', '--force-run', action='store_true',
+                            help='execute the test-packages even if their very same executables passed already;'
+                                 '\nby default, the output of such executables is replayed from their previous run')
         behavioralGroup = parser.add_mutually_exclusive_group()
         behavioralGroup.add_argument('-s', '--silent', action='store_false', dest='shallBeVerbose',
                                      help='set "silent-mode" on, suppresses detailed output on the display')
         self.__addGearArgument(behavioralGroup)
+        changesGroup = parser.add_mutually_exclusive_group()
+        changesGroup.add_argument('--changed', action='store_const', const='', dest='changes',
+                                  help='process only the test-packages affected by the files modified since their'
+                                       '\nlast successful run (the packages never passed are always processed)')
+        changesGroup.add_argument('--changed-since', metavar='<git ref>', type=str, dest='changes',
+                                  help='process only the test-packages affected by the files changed since the'
+                                       '\ngiven Git reference, e.g. "--changed-since origin/master"')
+        parser.add_argument('-t', '--tests', metavar='<glob>', type=str,
+                            help='run only the tests with names matching the glob-pattern, e.g. -t "Test_Foo*";'
+                                 '\nthe rest of the tests are skipped along with their setup')
+        parser.add_argument('--junit', metavar='<xml file>', type=str,
+                            help='report the results of the tests (parsed from their output) into the given JUnit'
+                                 '\nXML file as well, along with the "{0}"'.format(attributes.REPORT_FILENAME))
 
     def __addGearArgument(self, behavioralGroup):
         if countCpuCores() > 1:
@@ -142,9 +204,30 @@ class StatArgumentParser(object):
                        ''.format(implicitCpuCount, maxCpuCount)
             behavioralGroup.add_argument('-g', '--gear', dest='processes', type=parseGearValue,
                                          nargs='?', const=implicitCpuCount, default=0, metavar=meta, help=helpText)
+            self.__addRunGearArgument(maxCpuCount)
+            helpText = 'the engine of the gear: "{0}" of worker processes (default), or "{1}" driving all the' \
+                       '\nbuilds and runs as child processes of a single event-loop'.format(*ENGINES)
+            self.__parser.add_argument('--engine', choices=ENGINES, default=POOL_ENGINE, help=helpText)
         else:
             behavioralGroup.add_argument('-g', '--gear', dest='redundant', nargs='?', type=lambda x: '-g/--gear',
                                          action='append', const='', help=ARG_SUPPRESS)
+            self.__parser.add_argument('-rg', '--run-gear', dest='redundant', type=lambda x: '-rg/--run-gear',
+                                       action='append', help=ARG_SUPPRESS)
+            self.__parser.add_argument('--engine', dest='redundant', type=lambda x: '--engine',
+                                       action='append', help=ARG_SUPPRESS)
+
+    def __addRunGearArgument(self, maxCpuCount):
+        def parseRunGearValue(value):
+            amount = int(value)
+            if amount < 1:
+                self.__parser.error("Minimal run-gear is 1")
+            return amount if amount < maxCpuCount else maxCpuCount
+
+        meta = "{{1-{0}}}".format(maxCpuCount)
+        helpText = 'execute test-packages in a dedicated pool of processes of the given size,' \
+                   '\nwhile the gear keeps compiling the subsequent ones; requires "gear"'
+        self.__parser.add_argument('-rg', '--run-gear', dest='runProcesses', type=parseRunGearValue, default=0,
+                                   metavar=meta, help=helpText)
 
     def __addProductArguments(self):
         productGroup = self.__parser.add_mutually_exclusive_group()
@@ -160,6 +243,12 @@ class StatArgumentParser(object):
             productGroup.add_argument('-a', '--all-products', dest='redundant',
                                       action='append_const', const='-a/--all-products', help=ARG_SUPPRESS)
 
+    def __determineRunProcesses(self):
+        runProcesses = getattr(self.__instructions, 'runProcesses', 0)
+        if runProcesses and not self.__processes:
+            self.__parser.error("'-rg/--run-gear' can be specified along with '-g/--gear' only")
+        return min(runProcesses, len(self.__makeFiles)) if self.__shallRun else 0
+
     def __determineTargetProducts(self):
         if self.__instructions and len(self.__products) > 1:
             if self.__instructions.product:
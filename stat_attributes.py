@@ -15,9 +15,16 @@ LOGS_DIRECTORY = 'logs'
 IDE_DIRECTORY = 'ide'
 OUTPUT_DIRECTORY = 'output'
 REPORT_FILENAME = 'report.json'
+TIMINGS_FILENAME = '/'.join([OUTPUT_DIRECTORY, 'timings.json'])
+SLOWEST_TESTS_FILENAME = '/'.join([OUTPUT_DIRECTORY, 'slowest_tests.json'])
+CACHE_DIRECTORY = '/'.join([OUTPUT_DIRECTORY, 'cache'])
+DEPENDENCIES_FILENAME = '/'.join([OUTPUT_DIRECTORY, 'dependencies.json'])
+MAKEFILES_CACHE_FILENAME = '/'.join([OUTPUT_DIRECTORY, 'makefiles.json'])
+JOBSERVER_FILENAME = '/'.join([OUTPUT_DIRECTORY, 'jobserver.fifo'])
 IGNORE_FILENAME = '.statignore'
 CONFIG_FILENAME = '.statconfig'
 AUTO_GENERATED_MAKEFILE = '/'.join([OUTPUT_DIRECTORY, "stat.mak"])
+AUTO_GENERATED_PRODUCT_MAKEFILE = '/'.join([OUTPUT_DIRECTORY, '{0}', "stat.mak"])
 REBUILD_TARGET = 'rebuild'
 CLEAN_TARGET = 'clean'
 
@@ -13,6 +13,16 @@ endif
 # Declare path to auto-generated STAT makefile
 STAT_AUTO_MAKEFILE:=$(OUTPUT_DIR)/stat.mak
 
+# Declare the shared runtime library directory of the variant selected by STAT (if any)
+ifneq ("$(STAT_RUNTIME_VARIANT)", "")
+STAT_RUNTIME_DIR := $(OUTPUT_DIR)/$(PRODUCT_FLAVOR)/.runtime/$(STAT_RUNTIME_VARIANT)
+endif
+
+# Declare the shared overlay of the package headers prepared by STAT (if any), instead of installing them per package
+ifneq ("$(STAT_HEADERS_OVERLAY)", "")
+STAT_HEADERS_DIR := $(OUTPUT_DIR)/.headers/$(STAT_HEADERS_OVERLAY)
+endif
+
 # Declare output directories
 OUTPUT_DIR := $(OUTPUT_DIR)/$(PRODUCT_FLAVOR)/$(STAT_NAMESPACE)
 HEADERS_DIR := $(OUTPUT_DIR)/inc
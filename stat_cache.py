@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+from __future__ import print_function
+
+import os
+import sys
+from hashlib import sha1
+from shutil import copyfile, which
+from subprocess import Popen, PIPE, STDOUT
+
+CACHE_HIT = 'Cache hit: {0}'
+CACHE_MISS = 'Cache miss: {0}'
+OBJECT_EXTENSION = '.o'
+OUTPUT_EXTENSION = '.log'
+# The cache evicts the least recently used entries beyond this size, down to a fraction of it, so that the next runs
+# don't evict as well
+CACHE_SIZE_LIMIT = 2 ** 30
+CACHE_SIZE_AFTER_EVICTION = 0.8
+
+# Options which carry no content of their own: paths of output files and include directories (the included content
+# is a part of the preprocessed source), hence excluded to share objects across namespaces and products
+_OPTIONS_WITH_PATH = ('-o', '-MT', '-MF', '-I')
+_OPTIONS_WITHOUT_CONTENT = ('-c', '-MMD', '-MP')
+
+
+class StatCompilationCache(object):
+    """
+    Content-addressed cache of object-files keyed on the preprocessed source, the compiler flags and the compiler
+    """
+
+    def __init__(self, directory):
+        self.__directory = directory
+
+    def compile(self, compiler, arguments):
+        """
+        Compiles a source-file by a GCC-like compiler, unless an identical compilation was cached already
+
+        :return: the exit-code of the compiler
+        """
+        command = _CompilerCommand(compiler, arguments)
+        status, preprocessed = _execute(command.preprocessing, keepErrors=False)
+        if status:  # Let the compiler itself report the errors
+            return self.__compile(command)
+        entry = self.__locateEntry(self.__calculateKey(command, preprocessed))
+        if self.__fetch(entry, command):
+            print(CACHE_HIT.format(command.sourceFile))
+            return 0
+        status = self.__compile(command, entry)
+        print(CACHE_MISS.format(command.sourceFile))
+        return status
+
+    def evict(self):
+        """
+        Evicts the least recently used entries, if the cache exceeds its size limit; it scans the whole cache, hence
+        it's up to STAT to evict once per run, rather than the compilations to evict upon each miss
+        """
+        entries = sorted(self.__listEntries())
+        totalSize = sum(size for _, size, _ in entries)
+        if totalSize <= CACHE_SIZE_LIMIT:
+            return
+        for _, size, entry in entries:
+            if totalSize <= CACHE_SIZE_LIMIT * CACHE_SIZE_AFTER_EVICTION:
+                break
+            for path in [entry + OBJECT_EXTENSION, entry + OUTPUT_EXTENSION]:
+                _removeFile(path)
+            totalSize -= size
+
+    @staticmethod
+    def __fetch(entry, command):
+        """
+        Fetches the cached object-file, unless it's missing (or evicted concurrently); the hit refreshes its usage time
+        """
+        try:
+            with open(entry + OUTPUT_EXTENSION) as fp:
+                output = fp.read()
+            copyfile(entry + OBJECT_EXTENSION, command.objectFile)
+            os.utime(entry + OBJECT_EXTENSION)
+        except OSError:
+            return False
+        sys.stdout.write(output)
+        return True
+
+    def __compile(self, command, entry=None):
+        status, output = _execute(command.compilation)
+        sys.stdout.write(output)
+        if not status and entry is not None:
+            self.__store(entry + OUTPUT_EXTENSION, lambda path: _writeText(path, output))
+            self.__store(entry + OBJECT_EXTENSION, lambda path: copyfile(command.objectFile, path))
+        return status
+
+    def __calculateKey(self, command, preprocessed):
+        key = sha1(self.__identifyCompiler(command.compiler).encode('utf-8'))
+        key.update('\0'.join(command.significantArguments).encode('utf-8'))
+        key.update(preprocessed.encode('utf-8'))
+        return key.hexdigest()
+
+    def __identifyCompiler(self, compiler):
+        path = os.path.realpath(which(compiler) or compiler)
+        info = os.stat(path)
+        identity = sha1('{0}|{1}|{2}'.format(path, info.st_size, info.st_mtime).encode('utf-8')).hexdigest()
+        versionFile = os.path.join(self.__directory, 'compilers', identity)
+        if not os.path.isfile(versionFile):
+            _, version = _execute([compiler, '--version'])
+            self.__store(versionFile, lambda _path: _writeText(_path, version))
+        with open(versionFile) as fp:
+            return fp.read()
+
+    def __listEntries(self):
+        """
+        :return: the usage time, the size and the path (without extension) of each entry of the cache
+        """
+        for directory, _, files in os.walk(self.__directory):
+            for fileName in files:
+                if fileName.endswith(OBJECT_EXTENSION):
+                    entry = os.path.join(directory, fileName[:-len(OBJECT_EXTENSION)])
+                    try:
+                        info = os.stat(entry + OBJECT_EXTENSION)
+                        size = info.st_size + os.path.getsize(entry + OUTPUT_EXTENSION)
+                    except OSError:  # Evicted concurrently
+                        continue
+                    yield info.st_mtime, size, entry
+
+    def __locateEntry(self, key):
+        return os.path.join(self.__directory, key[:2], key)
+
+    @staticmethod
+    def __store(path, write):
+        """
+        Stores the file atomically, since concurrent compilations may race on the very same entry
+        """
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        temporaryPath = '{0}.{1}.tmp'.format(path, os.getpid())
+        write(temporaryPath)
+        os.replace(temporaryPath, path)
+
+
+class _CompilerCommand(object):
+    """
+    Splits the command-line of a GCC-like compiler into its aspects that are relevant to the cache
+    """
+
+    def __init__(self, compiler, arguments):
+        self.compiler = compiler
+        self.compilation = [compiler] + list(arguments)
+        self.objectFile = arguments[arguments.index('-o') + 1]
+        self.sourceFile = [argument for argument in arguments if not argument.startswith('-')][-1]
+        self.preprocessing = [compiler, '-E'] + self.__filterOut(arguments, ('-o',), ('-c',))
+        self.significantArguments = self.__filterOut(arguments, _OPTIONS_WITH_PATH, _OPTIONS_WITHOUT_CONTENT)
+
+    @staticmethod
+    def __filterOut(arguments, optionsWithPath, optionsWithoutContent):
+        filtered = []
+        iterator = iter(arguments)
+        for argument in iterator:
+            if argument in optionsWithPath:
+                next(iterator, None)
+            elif argument not in optionsWithoutContent and not argument.startswith(optionsWithPath):
+                filtered.append(argument)
+        return filtered
+
+
+def _execute(command, keepErrors=True):
+    process = Popen(command, stdout=PIPE, stderr=STDOUT if keepErrors else PIPE, universal_newlines=True)
+    output, _ = process.communicate()
+    return process.returncode, output
+
+
+def _removeFile(path):
+    try:
+        os.remove(path)
+    except OSError:  # Removed concurrently
+        pass
+
+
+def _writeText(path, text):
+    with open(path, 'w') as fp:
+        fp.write(text)
+
+
+if __name__ == '__main__':
+    sys.exit(StatCompilationCache(sys.argv[1]).compile(sys.argv[2], sys.argv[3:]))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+import stat_attributes as attributes
+from services import countCpuCores
+from stat_makefile import StatMakefile, getMakefileCache
+
+
+class StatCatalog(object):
+    """
+    Catalog of the test-packages parsed and validated up front (in parallel), so that the corrupted makefiles are
+    reported ahead of any build, while the parsed makefiles are handed over to the workers instead of re-parsing them
+    """
+
+    def __init__(self, makefiles, threads=None):
+        """
+        :param makefiles: the names of the makefiles of the test-packages
+        :param threads: the amount of threads parsing the makefiles; by default, as many as the CPU cores
+        """
+        self.__packages = OrderedDict()
+        self.__failures = OrderedDict()
+        getMakefileCache()  # Loaded ahead of the threads sharing it
+        threads = min(threads or countCpuCores(), len(makefiles))
+        if threads > 1:
+            pool = ThreadPool(threads)
+            try:
+                results = pool.map(_discoverPackage, makefiles)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_discoverPackage(makefile) for makefile in makefiles]
+        for makefile, package, failure in results:
+            if package is None:
+                self.__failures[makefile] = failure
+            else:
+                self.__packages[makefile] = package
+
+    @property
+    def packages(self):
+        """
+        :return: the names of the makefiles of the valid test-packages (in the order of their listing)
+        """
+        return list(self.__packages)
+
+    @property
+    def failures(self):
+        """
+        :return: the descriptions of the failures by the names of the makefiles of the corrupted test-packages
+        """
+        return self.__failures
+
+    def __getitem__(self, makefile):
+        return self.__packages[makefile]
+
+    def __contains__(self, makefile):
+        return makefile in self.__packages
+
+    def __iter__(self):
+        for makefile in self.__packages:
+            yield makefile
+
+    def __len__(self):
+        return len(self.__packages)
+
+    def describe(self, makefile):
+        """
+        :return: the description of a valid test-package, e.g. for the tools built upon STAT
+        """
+        package = self.__packages[makefile]
+        return {'name': package.name, 'product': package[StatMakefile.NAME],
+                'sources': package[StatMakefile.SOURCES].split(), 'includes': package[StatMakefile.INCLUDES].split(),
+                'interfaces': package[StatMakefile.INTERFACES].split(),
+                'defines': package[StatMakefile.DEFINES].split(),
+                'executable': '/'.join([attributes.OUTPUT_DIRECTORY, package[StatMakefile.NAME], package.name, 'bin',
+                                        package[StatMakefile.EXEC]])}
+
+
+def _discoverPackage(makefile):
+    try:
+        package = StatMakefile(makefile)
+        _validatePackage(package)
+    except Exception as exception:
+        return makefile, None, str(exception)
+    return makefile, package, None
+
+
+def _validatePackage(package):
+    if not package[StatMakefile.SOURCES].split():
+        raise StatCatalogException(StatCatalogException.NO_SOURCES)
+
+
+class StatCatalogException(Exception):
+    """
+    Custom exception for STAT catalog of test-packages
+    """
+    NO_SOURCES = 'The test-package lists no source files.'
@@ -23,7 +23,8 @@ class StatConfiguration(meta_class(SingletonMeta, Configuration)):
         self.update(TOOL_VERSION=attributes.VERSION,
                     OUTPUT_DIR=attributes.OUTPUT_DIRECTORY,
                     STAT_ROOT=toPosixPath(os.path.relpath(attributes.TOOL_PATH)),
-                    DUMMIES_DIR=attributes.DUMMIES_DIRECTORY)
+                    DUMMIES_DIR=attributes.DUMMIES_DIRECTORY,
+                    CACHE_DIR=attributes.CACHE_DIRECTORY)
         self.__products = [item[:-4] for item in listMakefiles(attributes.PRODUCT_DIRECTORY)]
         self.__autoGenerated = {}
         self.__readUserConfiguration()
@@ -36,7 +37,7 @@ class StatConfiguration(meta_class(SingletonMeta, Configuration)):
     def __readAutoGenerated(self):
         if os.path.isfile(attributes.AUTO_GENERATED_MAKEFILE):
             text = readTextFileAtOnce(attributes.AUTO_GENERATED_MAKEFILE)
-            self.__autoGenerated.update(re.findall(r'\s*(\w+)\s*=\s*(.+)\s*', text))
+            self.__autoGenerated.update(re.findall(r'\s*(\w+)\s*\??=\s*(.+)\s*', text))
 
     @property
     def products(self):
@@ -44,14 +45,9 @@ class StatConfiguration(meta_class(SingletonMeta, Configuration)):
 
     @property
     def defaultProduct(self):
-        product = self.__autoGenerated.get('PRODUCT_FLAVOR', None)
+        product = self.__autoGenerated.get(StatMakefile.PRODUCT, None)
         return product if product in self.products else None
 
-    def isStale(self):
-        return self.defaultProduct is None \
-               or self.__autoGenerated.get('TOOL_VERSION', None) != attributes.VERSION \
-               or self.__autoGenerated.get('CONFIG_VERSION', None) != calculateConfigurationVersion()
-
 
 class StatConfigurationException(Exception):
     """
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import time
+from json import load as loadJson
+
+import stat_attributes as attributes
+from services import writeJsonFile, execute
+from stat_makefile import StatMakefile
+from stat_object_sharing import resolveHeaders
+
+DEPENDENCY_EXTENSIONS = ('.d', '.d.tmp')
+
+
+class StatDependencyIndex(object):
+    """
+    Persistent index of the files (makefiles, sources, headers and dummies) each test-package of each product was built
+    from upon its last successful run
+    """
+
+    def __init__(self, filePath=attributes.DEPENDENCIES_FILENAME):
+        self.__filePath = filePath
+        self.__timestamp = time.time()
+        self.__index = self.__read()
+
+    def __getitem__(self, key):
+        target, makefile = key
+        return self.__index.get(target, {}).get(makefile, {}).get('Files', [])
+
+    def __setitem__(self, key, files):
+        target, makefile = key
+        self.__index.setdefault(target, {})[makefile] = {'Timestamp': self.__timestamp, 'Files': sorted(set(files))}
+
+    def __delitem__(self, key):
+        target, makefile = key
+        self.__index.get(target, {}).pop(makefile, None)
+
+    def isAffected(self, target, makefile, changedFiles=None):
+        """
+        :param changedFiles: the real paths of the changed files; if None, the modification times are checked instead
+        :return: True if the package was never recorded or any of the files it depends on changed since it was
+        """
+        record = self.__index.get(target, {}).get(makefile)
+        if not record:
+            return True
+        if changedFiles is None:
+            return any(_isModifiedSince(path, record['Timestamp']) for path in record['Files'])
+        return not changedFiles.isdisjoint(record['Files'])
+
+    def write(self):
+        writeJsonFile(self.__filePath, self.__index)
+
+    def __read(self):
+        if not os.path.isfile(self.__filePath):
+            return {}
+        try:
+            with open(self.__filePath) as fp:
+                index = loadJson(fp)
+        except ValueError:
+            return {}
+        return index if isinstance(index, dict) else {}
+
+
+def collectDependencies(makefileName, makefile=None):
+    """
+    Collects the files a test-package depends on: its makefiles, its sources and the headers they include, where the
+    latter are narrowed by the dependency-files of the compiler, if any
+
+    :param makefile: the makefile parsed ahead (e.g. for another product than the selected one); if None, it's parsed
+    :return: the real paths of the files
+    """
+    makefile = StatMakefile(makefileName) if makefile is None else makefile
+    # The auto-generated makefiles are rewritten upon changes of the configuration, whose makefiles are listed anyway
+    autoGenerated = {os.path.realpath(attributes.AUTO_GENERATED_MAKEFILE),
+                     os.path.realpath(attributes.AUTO_GENERATED_PRODUCT_MAKEFILE.format(makefile[StatMakefile.NAME]))}
+    files = [os.path.realpath(path) for path in makefile.files if os.path.realpath(path) not in autoGenerated]
+    headers = resolveHeaders(makefile)
+    packageDirectory = '/'.join([makefile['OUTPUT_DIR'], makefile[StatMakefile.NAME], makefile.name])
+    headersDirectory = os.path.realpath('/'.join([packageDirectory, 'inc']))
+    for source in makefile[StatMakefile.SOURCES].split():
+        if not os.path.isfile(source):
+            continue
+        files.append(os.path.realpath(source))
+        objectName = os.path.splitext(os.path.basename(source))[0]
+        dependencies = _readDependencyFile('/'.join([packageDirectory, 'obj', objectName]))
+        if dependencies is None:  # E.g. never compiled or by a compiler providing no dependency-files
+            files.extend(headers.values())
+            continue
+        for dependency in dependencies:
+            path = os.path.realpath(dependency)
+            if os.path.dirname(path) == headersDirectory:  # The installed copy of the header
+                path = headers.get(os.path.basename(path), path)
+            files.append(path)
+    return files
+
+
+def listChangedFiles(reference):
+    """
+    :param reference: the Git reference (e.g. commit, branch or tag) to compare the working tree against
+    :return: the real paths of the files changed, added or removed since the reference, including the untracked ones
+    """
+    status, lines = execute(['git', 'rev-parse', '--show-toplevel'], beSilent=True)
+    if status:
+        raise StatDependenciesException('The changes cannot be determined outside of a Git repository.')
+    root = lines[0].strip()
+    status, changes = execute(['git', 'diff', '--name-only', reference], beSilent=True, cwd=root)
+    if status:
+        raise StatDependenciesException('The changes since "{0}" cannot be determined:\n{1}'.format(
+            reference, ''.join(changes)))
+    _, untracked = execute(['git', 'ls-files', '--others', '--exclude-standard'], beSilent=True, cwd=root)
+    return set(os.path.realpath(os.path.join(root, line.strip())) for line in changes + untracked if line.strip())
+
+
+def _readDependencyFile(basePath):
+    for extension in DEPENDENCY_EXTENSIONS:
+        if os.path.isfile(basePath + extension):
+            with open(basePath + extension) as fp:
+                content = fp.read().replace('\\\n', ' ')
+            rule = content.strip().split('\n', 1)[0] if content.strip() else ''
+            return rule.split(': ', 1)[1].split()[1:] if ': ' in rule else []
+    return None
+
+
+def _isModifiedSince(path, timestamp):
+    return not os.path.isfile(path) or os.path.getmtime(path) > timestamp
+
+
+class StatDependenciesException(Exception):
+    """
+    Custom exception for the STAT dependency index
+    """
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+from __future__ import print_function
+
+import asyncio
+import codecs
+import locale
+import subprocess
+from collections import deque
+from shlex import split as splitCmdLine
+
+from services import isWindows
+
+OUTPUT_CHUNK_SIZE = 1 << 16
+OUTPUT_TAIL_SIZE = 1000
+
+
+def createEventLoop():
+    """
+    :return: a new event-loop (set as the current one) that is capable of running child processes on this platform
+    """
+    loop = asyncio.ProactorEventLoop() if isWindows() else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+class StatOutputSink(object):
+    """
+    Splits the output of a child process into lines and streams them to a log-file, to the display and to a handler,
+    while only a bounded tail of them is kept in memory
+    """
+
+    def __init__(self, logFilePath=None, beSilent=True, lineHandler=None, tailSize=OUTPUT_TAIL_SIZE):
+        """
+        :param logFilePath: if specified, the lines are appended to this file as they arrive
+        :param beSilent: if False, the lines are printed to the display as well
+        :param lineHandler: optional callable invoked per line
+        :param tailSize: the amount of last lines kept in memory
+        """
+        self.__logFile = open(logFilePath, 'a') if logFilePath else None
+        self.__beSilent = beSilent
+        self.__lineHandler = lineHandler
+        self.__decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors='replace')
+        self.__pending = ''
+        self.__lines = deque(maxlen=tailSize)
+
+    @property
+    def lines(self):
+        """
+        :return: the tail of the output lines
+        """
+        return list(self.__lines)
+
+    def write(self, data):
+        text = self.__pending + self.__decoder.decode(data)
+        # A carriage-return at the edge of the chunk may be followed by a new-line within the next one
+        cut = len(text) - 1 if text.endswith('\r') else len(text)
+        lines = text[:cut].replace('\r\n', '\n').split('\n')
+        self.__pending = lines.pop() + text[cut:]
+        for line in lines:
+            self.__emit(line + '\n')
+        if len(self.__pending) > OUTPUT_CHUNK_SIZE:  # The buffering is bounded even upon endless lines
+            self.__emit(self.__pending)
+            self.__pending = ''
+
+    def close(self):
+        text = (self.__pending + self.__decoder.decode(b'', final=True)).replace('\r\n', '\n')
+        self.__pending = ''
+        if text:
+            self.__emit(text)
+        if self.__logFile is not None:
+            self.__logFile.close()
+            self.__logFile = None
+
+    def __emit(self, line):
+        self.__lines.append(line)
+        if self.__logFile is not None:
+            self.__logFile.write(line)
+        if self.__lineHandler is not None:
+            self.__lineHandler(line)
+        if not self.__beSilent:
+            print(line, end='')
+
+
+def executeSync(command, sink, **kwargs):
+    """
+    The synchronous counterpart of executeAsync, where the output is streamed to the sink as it arrives
+
+    :return: the exit-code of the child process
+    """
+    arguments = dict(stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    arguments.update(kwargs)
+    try:
+        process = subprocess.Popen(_composeArguments(command), **arguments)
+        with process.stdout:
+            for data in iter(lambda: process.stdout.read1(OUTPUT_CHUNK_SIZE), b''):
+                sink.write(data)
+        return process.wait()
+    finally:
+        sink.close()
+
+
+async def executeAsync(command, sink, **kwargs):
+    """
+    Executes the command as a child process of the running event-loop, where its output (along with its errors) is
+    streamed to the sink, which is closed upon completion
+
+    :return: the exit-code of the child process
+    """
+    arguments = dict(stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    arguments.update(kwargs)
+    try:
+        process = await asyncio.create_subprocess_exec(*_composeArguments(command), **arguments)
+        while True:
+            data = await process.stdout.read(OUTPUT_CHUNK_SIZE)
+            if not data:
+                break
+            sink.write(data)
+        return await process.wait()
+    finally:
+        sink.close()
+
+
+def _composeArguments(command):
+    """
+    :return: the arguments of the child process, which both the engines hand over the very same way (without a shell),
+             so that neither the quoting nor the exit-codes depend on the engine; on Windows, a command-line given as
+             a single string is the path of an executable
+    """
+    if isinstance(command, (list, tuple)):
+        return list(command)
+    return [command] if isWindows() else splitCmdLine(command)
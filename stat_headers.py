@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+from hashlib import sha1
+
+from services import isWindows, writeJsonFile
+from stat_object_sharing import resolveHeaders
+
+HEADERS_OVERLAY_DIRECTORY = '.headers'
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def prepareHeadersOverlay(makefile, listings=None):
+    """
+    Prepares the overlay of the headers of a test-package: a directory of symbolic links to the headers resolved by
+    their precedence (dummy-interfaces first, then include directories in their order). The overlay is keyed by its
+    manifest, thus it is created once and shared by all the test-packages resolving the very same headers.
+
+    :param makefile: the parsed makefile of a test-package
+    :param listings: optional cache of the headers listed per directory, reused across the test-packages
+    :return: the key of the overlay, or an empty string if the headers shall be installed per package (i.e. on
+             platforms where symbolic links require special privileges)
+    """
+    if isWindows():
+        return ''
+    manifest = resolveHeaders(makefile, listings)
+    key = sha1(repr(sorted(manifest.items())).encode('utf-8')).hexdigest()[:16]
+    overlayPath = '/'.join([makefile['OUTPUT_DIR'], HEADERS_OVERLAY_DIRECTORY, key])
+    if not os.path.isdir(overlayPath):
+        _createOverlay(overlayPath, manifest)
+    return key
+
+
+def _createOverlay(overlayPath, manifest):
+    """
+    Creates the overlay aside and renames it into place, as concurrent test-packages may prepare the same one
+    """
+    temporaryPath = '{0}.{1}.tmp'.format(overlayPath, os.getpid())
+    if os.path.isdir(temporaryPath):
+        shutil.rmtree(temporaryPath)
+    os.makedirs(temporaryPath)
+    for filename, path in manifest.items():
+        os.symlink(path, os.path.join(temporaryPath, filename))
+    writeJsonFile(os.path.join(temporaryPath, MANIFEST_FILENAME), manifest)
+    try:
+        os.rename(temporaryPath, overlayPath)
+    except OSError:  # Prepared by another test-package in the meantime
+        shutil.rmtree(temporaryPath)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import os
+from weakref import WeakKeyDictionary
+
+import stat_attributes as attributes
+from services import isWindows
+
+# The environment variable announcing the jobserver to the worker processes (it's not an input of test-executables)
+JOBSERVER_VARIABLE = 'STAT_JOBSERVER'
+JOBSERVER_TOKEN = b'+'
+JOBSERVER_MAKE_FLAGS = '-j --jobserver-auth={0},{0}'
+
+_clients = {}
+
+
+class StatJobServer(object):
+    """
+    A GNU make jobserver hosted by STAT: a named pipe pre-filled with a token per slot, shared by all the make
+    processes of the gear, so that the slots are balanced among both the test-packages and their translation units
+    """
+
+    def __init__(self, slots, filePath=attributes.JOBSERVER_FILENAME):
+        """
+        :param slots: the total amount of jobs that may run at once, e.g. the amount of CPU cores
+        :param filePath: the path of the named pipe
+        """
+        self.__filePath = filePath
+        self.__descriptor = None
+        if isWindows():  # GNU make uses named semaphores on Windows, hence the package builds stay serial there
+            return
+        self.__remove()
+        os.mkfifo(filePath)
+        self.__descriptor = os.open(filePath, os.O_RDWR)
+        os.write(self.__descriptor, JOBSERVER_TOKEN * slots)
+        os.environ[JOBSERVER_VARIABLE] = filePath
+
+    @property
+    def isActive(self):
+        return self.__descriptor is not None
+
+    def close(self):
+        if self.__descriptor is not None:
+            os.environ.pop(JOBSERVER_VARIABLE, None)
+            client = _clients.pop(self.__filePath, None)
+            if client is not None:
+                client.close()
+            os.close(self.__descriptor)
+            self.__descriptor = None
+            self.__remove()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __remove(self):
+        try:
+            os.remove(self.__filePath)
+        except FileNotFoundError:  # A named pipe is not a regular file, hence it's not a subject for services.remove()
+            pass
+
+
+class StatJobServerClient(object):
+    """
+    The connection of a process to the jobserver: the process holds a token for the implicit slot of each make it
+    runs, while the make processes take the tokens of their additional jobs on their own
+    """
+
+    def __init__(self, filePath):
+        self.__descriptor = os.open(filePath, os.O_RDWR)
+        # GNU make (since 4.3) turns the descriptors it inherits non-blocking, and the flag is shared by all the
+        # duplicates of a descriptor, hence make gets a separate one, while the blocking waits use the private one
+        self.__sharedDescriptor = os.open(filePath, os.O_RDWR)
+        # The waiting of an event-loop for a token must never block it, hence the separate non-blocking descriptor
+        self.__pollingDescriptor = os.open(filePath, os.O_RDWR | os.O_NONBLOCK)
+        # An asyncio lock is bound to the event-loop it's first used on, while each sharded run drives a loop of its own
+        self.__pollingLocks = WeakKeyDictionary()
+
+    @property
+    def makeFlags(self):
+        return JOBSERVER_MAKE_FLAGS.format(self.__sharedDescriptor)
+
+    @property
+    def descriptors(self):
+        return self.__sharedDescriptor,
+
+    def acquire(self):
+        os.read(self.__descriptor, 1)
+
+    async def acquireAsync(self):
+        loop = asyncio.get_event_loop()
+        if loop not in self.__pollingLocks:
+            self.__pollingLocks[loop] = asyncio.Lock()
+        async with self.__pollingLocks[loop]:  # An event-loop can only have a single reader per descriptor
+            while True:
+                try:
+                    if os.read(self.__pollingDescriptor, 1):
+                        return
+                except BlockingIOError:
+                    pass
+                readiness = asyncio.Event()
+                loop.add_reader(self.__pollingDescriptor, readiness.set)
+                try:
+                    await readiness.wait()
+                finally:
+                    loop.remove_reader(self.__pollingDescriptor)
+
+    def release(self):
+        os.write(self.__descriptor, JOBSERVER_TOKEN)
+
+    def close(self):
+        os.close(self.__descriptor)
+        os.close(self.__sharedDescriptor)
+        os.close(self.__pollingDescriptor)
+
+
+def connectJobServer():
+    """
+    :return: the client of the jobserver announced to this process (a single one per process), None if there is none
+    """
+    filePath = os.environ.get(JOBSERVER_VARIABLE)
+    if not filePath:
+        return None
+    if filePath not in _clients:
+        _clients[filePath] = StatJobServerClient(filePath)
+    return _clients[filePath]
@@ -7,44 +7,143 @@
 
 from __future__ import print_function
 
+import os
 import sys
-from multiprocessing import Pool, freeze_support
+from multiprocessing import freeze_support
 
 import stat_attributes as attributes
 from stat_argument_parser import StatArgumentParser
+from stat_cache import StatCompilationCache
+from stat_catalog import StatCatalog
 from stat_configuration import StatConfiguration
+from stat_dependencies import StatDependencyIndex, collectDependencies, listChangedFiles
+from stat_jobserver import StatJobServer
 from stat_debug import Profiler
+from stat_makefile import getMakefileCache
 from stat_makefile_generator import StatMakefileGenerator
+from stat_object_sharing import StatObjectSharing
+from stat_runtime import selectRuntimeBuilders
+from stat_scheduler import StatScheduler, RUN_STAGE, ASYNC_ENGINE
+from stat_timings import StatTimings, StatEta, formatDuration
+from stat_unity import writeJUnitReport, rankSlowestTests
 from services import writeJsonFile, remove, mkdir
 from ide_writer import IdeWorkspaceWriter
-from tests_runner import TestsRunner, TestsRunnerException
+from tests_runner import TestsRunner, TestsRunnerException, TEST_FILTER_VARIABLE
 
 STAT_OUTPUT_DELIMITER = "=" * 70
 STAT_SUMMARY = "Total:  {total} Runs  {passed} Passed  {failed} Failed"
 STAT_SILENT_OUTPUT = "{0:50}:{1}"
+STAT_ETA_OUTPUT = 'ETA {eta} (critical path: "{makefile}" for "{target}")'
+STAT_CHANGES_OUTPUT = '{affected} of {total} test-packages of "{target}" are affected by the changes'
 MAKEFILE_CORRUPTION = 'Processing "{filename}" failed with exception: \n{exception}'
+STAT_SHARED_BUILD_FAILURE = 'The artifacts shared by the test-packages of "{target}" failed to build by "{makefile}" ' \
+                            '({status}):\n{info}'
 
 
-def runTestPackage(makefile, makeArguments, shallRun, shallBeVerbose):
+def runTestPackage(makefile, makeArguments, shallRun, shallBeVerbose, shallReplay=False, package=None):
+    return processTestPackage(makefile, makeArguments, shallBeVerbose, _selectPhases(shallRun, shallReplay), package)
+
+
+def compileTestPackage(makefile, makeArguments, shallBeVerbose, package=None):
+    return processTestPackage(makefile, makeArguments, shallBeVerbose, ('compile',), package)
+
+
+def runTestExecutable(makefile, makeArguments, shallBeVerbose, shallReplay=False, package=None):
+    return processTestPackage(makefile, makeArguments, shallBeVerbose, _selectPhases(None, shallReplay), package)
+
+
+def buildTestRuntime(makefile, makeArguments, shallBeVerbose, package=None):
+    return processTestPackage(makefile, makeArguments, shallBeVerbose, ('buildRuntime',), package)
+
+
+def compileSharedObjects(makefile, makeArguments, shallBeVerbose, objectFiles, package=None):
+    return processTestPackage(makefile, list(makeArguments) + list(objectFiles), shallBeVerbose, ('compile',), package)
+
+
+def processTestPackage(makefile, makeArguments, shallBeVerbose, phases, package=None):
+    """
+    :param package: the makefile parsed ahead by the catalog of the test-packages, if any
+    """
+    timings, statistics = {}, {}
+    try:
+        runner = TestsRunner(makefile, makeArguments, shallBeVerbose, package)
+        timings, statistics = runner.timings, runner.statistics
+        try:
+            for phase in phases:
+                getattr(runner, phase)()
+        except Exception as exception:
+            status, description = _concludeFailure(runner, exception)
+        else:
+            status, description = 'PASSED', ''
+    except Exception as exception:
+        status, description = 'CRASHED', MAKEFILE_CORRUPTION.format(filename=makefile, exception=str(exception))
+    return makefile, status, description, timings, statistics
+
+
+async def runTestPackageAsync(makefile, makeArguments, shallRun, shallBeVerbose, shallReplay=False, package=None):
+    return await processTestPackageAsync(makefile, makeArguments, shallBeVerbose, _selectPhases(shallRun, shallReplay),
+                                         package)
+
+
+async def compileTestPackageAsync(makefile, makeArguments, shallBeVerbose, package=None):
+    return await processTestPackageAsync(makefile, makeArguments, shallBeVerbose, ('compile',), package)
+
+
+async def runTestExecutableAsync(makefile, makeArguments, shallBeVerbose, shallReplay=False, package=None):
+    return await processTestPackageAsync(makefile, makeArguments, shallBeVerbose, _selectPhases(None, shallReplay),
+                                         package)
+
+
+async def buildTestRuntimeAsync(makefile, makeArguments, shallBeVerbose, package=None):
+    return await processTestPackageAsync(makefile, makeArguments, shallBeVerbose, ('buildRuntime',), package)
+
+
+async def compileSharedObjectsAsync(makefile, makeArguments, shallBeVerbose, objectFiles, package=None):
+    return await processTestPackageAsync(makefile, list(makeArguments) + list(objectFiles), shallBeVerbose,
+                                         ('compile',), package)
+
+
+async def processTestPackageAsync(makefile, makeArguments, shallBeVerbose, phases, package=None):
+    """
+    The counterpart of processTestPackage for the event-loop of the asynchronous engine
+    """
+    timings, statistics = {}, {}
     try:
-        runner = TestsRunner(makefile, makeArguments, shallBeVerbose)
+        runner = TestsRunner(makefile, makeArguments, shallBeVerbose, package)
+        timings, statistics = runner.timings, runner.statistics
         try:
-            runner.compile()
-            if shallRun:
-                runner.run()
-        except TestsRunnerException as exception:
-            errorMessage = str(exception)
-            runner.writeLog(errorMessage)
-            status, description = 'FAILED', errorMessage
+            for phase in phases:
+                await getattr(runner, phase + 'Async')()
         except Exception as exception:
-            errorMessage = str(exception)
-            runner.writeLog(errorMessage)
-            status, description = 'CRASHED', str(errorMessage)
+            status, description = _concludeFailure(runner, exception)
         else:
             status, description = 'PASSED', ''
     except Exception as exception:
         status, description = 'CRASHED', MAKEFILE_CORRUPTION.format(filename=makefile, exception=str(exception))
-    return makefile, status, description
+    return makefile, status, description, timings, statistics
+
+
+# The jobs of the asynchronous engine that replace the ones of the pool of worker processes
+ASYNC_JOBS = {runTestPackage: runTestPackageAsync, compileTestPackage: compileTestPackageAsync,
+              runTestExecutable: runTestExecutableAsync, buildTestRuntime: buildTestRuntimeAsync,
+              compileSharedObjects: compileSharedObjectsAsync}
+
+
+def _selectPhases(shallRun, shallReplay):
+    """
+    The phases of the jobs that conclude the processing of a test-package, hence its log is compressed (if requested)
+    once they pass
+
+    :param shallRun: True to compile and run, False to compile only, None to run only
+    """
+    runPhase = 'runOrReplay' if shallReplay else 'run'
+    return {True: ('compile', runPhase), False: ('compile',), None: (runPhase,)}[shallRun] + ('compressLog',)
+
+
+def _concludeFailure(runner, exception):
+    errorMessage = str(exception)
+    runner.writeLog(errorMessage)
+    return 'FAILED' if isinstance(exception, TestsRunnerException) else 'CRASHED', errorMessage
 
 
 def prepareOutputDirectories():
@@ -68,6 +167,13 @@ class StatMain(object):
         self.__parser = StatArgumentParser(self.__config.products, self.__config.defaultProduct)
         self.__makeArguments = ['INSTALL_BY_COPY="TRUE"']
         self.__report = StatReport()
+        self.__timings = StatTimings()
+        self.__dependencies = StatDependencyIndex()
+        self.__packages = {}
+        self.__catalogs = {}
+        self.__eta = None
+        self.__builtPackages = {}
+        self.__sharedBuildFailures = []
 
     def _run(self, manualArguments):
         self.__parser.parse(manualArguments)
@@ -89,60 +195,198 @@ class StatMain(object):
 
     def __runTests(self):
         prepareOutputDirectories()
+        if self.__parser.testFilter is not None:  # Inherited by the executables and keys their replays as STAT-variable
+            os.environ[TEST_FILTER_VARIABLE] = self.__parser.testFilter
+        # The last target stays the default one for the subsequent runs, as the makefile of each product is its own
+        StatMakefileGenerator(self.__parser.targetProducts[-1] + ".mak").makeDefault()
+        self.__selectPackages()
+        self.__eta = StatEta(self.__timings.estimate, self.__parser.processes)
         for target in self.__parser.targetProducts:
-            self.__runTestsOnTarget(target)
+            for makefile in self.__packages[target]:
+                self.__eta.add(target, makefile)
+        if self.__parser.processes:
+            with StatJobServer(self.__parser.jobSlots), \
+                    StatScheduler(self.__parser.processes, self.__timings.estimate, self.__parser.runProcesses,
+                                  self.__parser.engine) as scheduler:
+                self.__runTestsInParallel(scheduler)
+        else:
+            for target in self.__parser.targetProducts:
+                self.__runTestsOnTargetInSerial(target)
         self.__report.write()
+        if self.__parser.junit is not None:
+            self.__report.writeJUnit(self.__parser.junit)
+        self.__timings.write()
+        self.__dependencies.write()
+        getMakefileCache().write()
+        if self.__config['CACHE_DIR']:  # The compilations don't evict, since each eviction scans the whole cache
+            StatCompilationCache(self.__config['CACHE_DIR']).evict()
         print(STAT_OUTPUT_DELIMITER)
         print(STAT_SUMMARY.format(total=self.__report.total, passed=self.__report.passed, failed=self.__report.failed))
-        if self.__report.failed:
-            raise StatException('The following packages failed:\n\t{0}'.format('\n\t'.join(self.__report.failedList)))
-
-    def __runTestsOnTarget(self, target):
-        if self.__parser.processes:
-            self.__runTestsOnTargetInParallel(target)
-        else:
-            self.__runTestsOnTargetInSerial(target)
+        if self.__report.failed or self.__sharedBuildFailures:
+            raise StatException(self.__describeFailures())
 
     def __runTestsOnTargetInSerial(self, target):
         self.__prepareTarget(target)
-        for makefile in self.__parser.makeFiles:
+        catalog = self.__discoverPackages(target)
+        sharing, jobs = self.__planSharedArtifacts(target)
+        for job in jobs:
+            self.__reportSharedBuild(target, *job[0](*job[1:]))
+        sharing.share()
+        for makefile in catalog:
             result = runTestPackage(makefile, self.__makeArguments, self.__parser.shallRun(),
-                                    self.__parser.shallBeVerbose())
-            self.__log(*result)
+                                    self.__parser.shallBeVerbose(), not self.__parser.shallForceRun(),
+                                    catalog[makefile])
+            self.__log(target, *result)
 
-    def __runTestsOnTargetInParallel(self, target):
-        def handleResult(result):
-            self.__log(*result)
-        self.__prepareTarget(target)
-        pool = Pool(self.__parser.processes)
-        for makefile in self.__parser.makeFiles:
-            args = (makefile, self.__makeArguments, self.__parser.shallRun(), self.__parser.shallBeVerbose())
-            pool.apply_async(runTestPackage, args, callback=handleResult)
-        pool.close()
-        pool.join()
+    def __runTestsInParallel(self, scheduler):
+        """
+        Schedules the test-packages of all the targets as a single set of jobs, where the packages of a target are
+        submitted as soon as the artifacts they share are built, rather than upon the completion of other targets
+        """
+        sharings, remainingJobs = {}, {}
+
+        def handleResult(target, result):
+            if remainingJobs[target]:
+                self.__reportSharedBuild(target, *result)
+                remainingJobs[target] -= 1
+                if not remainingJobs[target]:
+                    self.__submitPackages(target, sharings[target], scheduler)
+            else:
+                self.__handleParallelResult(scheduler, target, *result)
+
+        for target in self.__parser.targetProducts:
+            self.__prepareTarget(target)
+            self.__discoverPackages(target)
+            sharings[target], jobs = self.__planSharedArtifacts(target)
+            remainingJobs[target] = len(jobs)
+            for job in jobs:
+                scheduler.submit(target, self.__selectJob(job[0]), *job[1:])
+            if not jobs:
+                self.__submitPackages(target, sharings[target], scheduler)
+        scheduler.drain(handleResult)
+
+    def __submitPackages(self, target, sharing, scheduler):
+        sharing.share()
+        catalog = self.__catalogs[target]
+        for makefile in catalog:
+            if self.__parser.runProcesses:
+                scheduler.submit(target, self.__selectJob(compileTestPackage), makefile, self.__makeArguments,
+                                 self.__parser.shallBeVerbose(), catalog[makefile])
+            else:
+                scheduler.submit(target, self.__selectJob(runTestPackage), makefile, self.__makeArguments,
+                                 self.__parser.shallRun(), self.__parser.shallBeVerbose(),
+                                 not self.__parser.shallForceRun(), catalog[makefile])
+
+    def __planSharedArtifacts(self, target):
+        """
+        Plans the builds of the runtime variants and of the objects shared by test-packages, which are to precede the
+        packages, so that the packages sharing them just link against them
+
+        :return: the sharing of the objects (to be shared upon the builds) and the jobs of the builds
+        """
+        catalog = self.__catalogs[target]
+        # The cleaning removes the linked objects along with the package outputs, while upon a rebuild (e.g. by the
+        # gear) the objects of the owners are compiled anew ahead, and the rebuilds of the packages don't remake them
+        shallRebuild = attributes.REBUILD_TARGET in self.__makeArguments
+        sharing = StatObjectSharing(catalog, shallShare=attributes.CLEAN_TARGET not in self.__makeArguments)
+        sharing.unshare(shallRebuild)
+        shallBeVerbose = self.__parser.shallBeVerbose()
+        jobs = [(buildTestRuntime, makefile, self.__makeArguments, shallBeVerbose, catalog[makefile])
+                for makefile in selectRuntimeBuilders(catalog)]
+        objectArguments = [argument for argument in self.__makeArguments if argument != attributes.REBUILD_TARGET]
+        jobs += [(compileSharedObjects, makefile, objectArguments, shallBeVerbose, objectFiles, catalog[makefile])
+                 for makefile, objectFiles in sharing.owners.items()]
+        return sharing, jobs
+
+    def __reportSharedBuild(self, target, makefile, status, info, timings, statistics):
+        """
+        Reports a failed build of shared artifacts right away, since the packages linking against them fail later on
+        """
+        if status != 'PASSED':
+            self.__sharedBuildFailures.append('{0} ({1})'.format(makefile, target))
+            print(STAT_SHARED_BUILD_FAILURE.format(target=target, makefile=makefile, status=status, info=info))
+
+    def __describeFailures(self):
+        description = []
+        if self.__sharedBuildFailures:
+            description.append('The shared artifacts failed to build by:\n\t{0}'.format(
+                '\n\t'.join(self.__sharedBuildFailures)))
+        if self.__report.failed:
+            description.append('The following packages failed:\n\t{0}'.format('\n\t'.join(self.__report.failedList)))
+        return '\n'.join(description)
+
+    def __selectPackages(self):
+        changes = self.__parser.changes
+        changedFiles = listChangedFiles(changes) if changes else None
+        for target in self.__parser.targetProducts:
+            makeFiles = self.__parser.makeFiles
+            if changes is not None:
+                makeFiles = [makefile for makefile in makeFiles
+                             if self.__dependencies.isAffected(target, makefile, changedFiles)]
+                print(STAT_CHANGES_OUTPUT.format(affected=len(makeFiles), total=len(self.__parser.makeFiles),
+                                                 target=target))
+            self.__packages[target] = makeFiles
+
+    def __discoverPackages(self, target):
+        """
+        Parses the makefiles of the target up front, where the corrupted ones are reported right away
+        """
+        catalog = StatCatalog(self.__packages[target])
+        self.__catalogs[target] = catalog
+        for makefile, failure in catalog.failures.items():
+            self.__log(target, makefile, 'CRASHED', MAKEFILE_CORRUPTION.format(filename=makefile, exception=failure),
+                       {}, {})
+        return catalog
+
+    def __handleParallelResult(self, scheduler, target, makefile, status, info, timings, statistics):
+        compilation = self.__builtPackages.pop((target, makefile), None)
+        if compilation is not None:
+            compileTimings, compileStatistics = compilation
+            self.__log(target, makefile, status, info, dict(compileTimings, **timings),
+                       dict(compileStatistics, **statistics))
+        elif self.__parser.runProcesses and status == 'PASSED':
+            self.__builtPackages[target, makefile] = timings, statistics
+            scheduler.submitToStage(RUN_STAGE, target, self.__selectJob(runTestExecutable), makefile,
+                                    self.__makeArguments, self.__parser.shallBeVerbose(),
+                                    not self.__parser.shallForceRun(), self.__catalogs[target][makefile])
+        else:
+            self.__log(target, makefile, status, info, timings, statistics)
+
+    def __selectJob(self, job):
+        return ASYNC_JOBS[job] if self.__parser.engine == ASYNC_ENGINE else job
 
     def __createIdeWorkspace(self):
         self.__prepareTarget(self.__parser.targetProducts[0])
+        StatMakefileGenerator(self.__parser.targetProducts[0] + ".mak").makeDefault()
         writer = IdeWorkspaceWriter(self.__parser.ide, self.__parser.makeFiles[0])
         writer.write()
 
     def __prepareTarget(self, name):
         self.__report.logTarget(name)
-        if self.__config.isStale() or self.__parser.targetProducts != [self.__config.defaultProduct]:
-            targetMakefile = StatMakefileGenerator(name + ".mak")
-            targetMakefile.generate()
-
-    def __log(self, makefile, status, info):
-        self.__report[makefile] = status, info
+        StatMakefileGenerator(name + ".mak").generate()
+
+    def __log(self, target, makefile, status, info, timings, statistics):
+        self.__report[target, makefile] = status, info, statistics
+        isPartialRun = self.__parser.testFilter is not None  # Tells neither the durations nor the state of the package
+        if not isPartialRun:
+            self.__timings[target, makefile] = timings
+        if status != 'PASSED':
+            del self.__dependencies[target, makefile]
+        elif self.__parser.shallRun() and not isPartialRun:  # Only built packages are still to be run to be up to date
+            self.__dependencies[target, makefile] = collectDependencies(makefile, self.__catalogs[target][makefile])
+        self.__eta.complete(target, makefile)
         if not self.__parser.shallBeVerbose():
             print(STAT_SILENT_OUTPUT.format(makefile, status))
+        if self.__eta.remaining:
+            criticalTarget, criticalMakefile = self.__eta.criticalPath
+            print(STAT_ETA_OUTPUT.format(eta=formatDuration(self.__eta.remaining), makefile=criticalMakefile,
+                                         target=criticalTarget))
 
 
 class StatReport(object):
 
     def __init__(self):
         self.__finalReport = {}
-        self.__targetReport = self.__finalReport
 
     @property
     def total(self):
@@ -161,15 +405,27 @@ class StatReport(object):
         return set(self.__extractFailedOnes())
 
     def logTarget(self, name):
-        self.__targetReport = {}
-        self.__finalReport[name] = self.__targetReport
+        self.__finalReport.setdefault(name, {})
 
     def write(self):
+        """
+        The slowest tests of all the test-packages are ranked into a file of their own, once any test was measured
+        (otherwise the ranking of a previous run is removed)
+        """
         writeJsonFile(attributes.REPORT_FILENAME, self.__finalReport)
+        slowestTests = rankSlowestTests(self.__finalReport)
+        if slowestTests:
+            writeJsonFile(attributes.SLOWEST_TESTS_FILENAME, slowestTests)
+        else:
+            remove(attributes.SLOWEST_TESTS_FILENAME)
+
+    def writeJUnit(self, filePath):
+        writeJUnitReport(filePath, self.__finalReport)
 
-    def __setitem__(self, makefile, results):
-        status, info = results
-        self.__targetReport[makefile] = {'Status': status, 'Info': info}
+    def __setitem__(self, key, results):
+        target, makefile = key
+        status, info, statistics = results
+        self.__finalReport.setdefault(target, {})[makefile] = dict(statistics, Status=status, Info=info)
 
     def __extractFailedOnes(self):
         return [makefile for target in self.__finalReport for makefile in self.__finalReport[target]
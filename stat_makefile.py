@@ -7,13 +7,21 @@
 
 import os
 import re
+from json import load as loadJson
+
+import stat_attributes as attributes
+from services import writeJsonFile
 
 _STAT_FILE_NAMES_TO_IGNORE = ["stat_build.mak"]
 
-_REG_EXP_VARIABLE = r'\s*(?P<name>\w+)\s*(?P<operand>[:\+]?=)(?P<value>.*)$'
+_REG_EXP_VARIABLE = r'\s*(?P<name>\w+)\s*(?P<operand>[:\+\?]?=)(?P<value>.*)$'
 _REG_EXP_SUBSTITUTION = r'\$\((?P<variable>[^\(\)\$]+)\)'
 _REG_EXP_INCLUDE = r'^(?:\s+)?(?:\binclude\b)\s+(?P<path>.+\S)(?:\s+)?$'
 
+_INCLUDE_PATTERN = re.compile(_REG_EXP_INCLUDE, re.IGNORECASE)
+_VARIABLE_PATTERN = re.compile(_REG_EXP_VARIABLE)
+_SUBSTITUTION_PATTERN = re.compile(_REG_EXP_SUBSTITUTION)
+
 
 class StatMakefile(object):
     """
@@ -26,24 +34,50 @@ class StatMakefile(object):
     NAME = 'PRODUCT_FLAVOR'
     EXEC = 'OUTPUT_EXEC'
     OS = 'OS_NAME'
+    PRODUCT = 'STAT_PRODUCT'
+    SHARDS = 'TEST_SHARDS'
 
     def __init__(self, filePath):
         self.__name = os.path.splitext(os.path.basename(filePath))[0]
-        self.__file = _MakefileReader(filePath)
-        self.__items = {}
-        self.__parse()
+        cache = getMakefileCache()
+        snapshot = cache.lookup(filePath)
+        if snapshot is None:
+            reader = _MakefileReader(filePath)
+            self.__files = [filePath]
+            self.__items = {}
+            self.__environment = {}
+            self.__parse(reader)
+            self.__includes = reader.includes
+            cache.store(filePath, self.__files, {key: self[key] for key in self}, self.__includes, self.__environment)
+        else:
+            self.__files, items, self.__includes = snapshot
+            self.__items = {key: _Variable(value) for key, value in items.items()}
 
     @property
     def name(self):
         return self.__name
 
+    @property
+    def files(self):
+        """
+        :return: the paths of the makefile itself and of all the makefiles it includes (in the order of inclusion)
+        """
+        return self.__files
+
+    @property
+    def includes(self):
+        """
+        :return: the graph of inclusion, i.e. the makefiles included by each makefile (in the order of inclusion)
+        """
+        return self.__includes
+
     def __getitem__(self, key):
         _key = key.upper()
-        return self.__items[_key] if _key in self else ''
+        return self.__items[_key].value if _key in self else ''
 
     def __setitem__(self, key, value):
         _key = key.upper()
-        self.__items[_key] = (self.__interpretString(value)).strip()
+        self.__items[_key] = _Variable(self.__interpretString(value).strip())
 
     def __contains__(self, key):
         _key = key.upper()
@@ -53,28 +87,32 @@ class StatMakefile(object):
         for key in self.__items:
             yield key
 
-    def __parse(self):
-        for line in self.__file.readLines():
-            if not self.__parseForInclude(line):
+    def __parse(self, reader):
+        for line in reader.readLines():
+            if not self.__parseForInclude(reader, line):
                 self.__parseForVariable(line)
 
-    def __parseForInclude(self, currentLine):
-        regexResults = re.search(_REG_EXP_INCLUDE, currentLine, re.IGNORECASE)
+    def __parseForInclude(self, reader, currentLine):
+        regexResults = _INCLUDE_PATTERN.search(currentLine)
         if regexResults:
-            names = regexResults.group('path').split()
-            for filename in names:
-                if os.path.basename(filename) not in _STAT_FILE_NAMES_TO_IGNORE:
-                    self.__file.includeNestedFile(filename)
+            names = [filename for filename in self.__interpretString(regexResults.group('path')).split()
+                     if os.path.basename(filename) not in _STAT_FILE_NAMES_TO_IGNORE]
+            reader.includeNestedFiles(names)
+            self.__files.extend(names)
             return True
         else:
             return False
 
     def __parseForVariable(self, currentLine):
-        regexResults = re.search(_REG_EXP_VARIABLE, currentLine)
+        regexResults = _VARIABLE_PATTERN.search(currentLine)
         if regexResults:
             name, operand, value = regexResults.groups()
             if operand == "+=":
-                self[name] += value
+                self.__items.setdefault(name.upper(), _Variable()).append(self.__interpretString(value))
+            elif operand == "?=":
+                if name not in self:  # Like make, the variables of the environment precede the default values
+                    self.__environment[name] = os.environ.get(name)
+                    self[name] = value if self.__environment[name] is None else self.__environment[name]
             else:
                 self[name] = value
 
@@ -82,67 +120,183 @@ class StatMakefile(object):
         def interpretVariable(regMatch):
             variable = regMatch.group('variable')
             return self[variable]
-        return re.sub(_REG_EXP_SUBSTITUTION, interpretVariable, string)
+        return _SUBSTITUTION_PATTERN.sub(interpretVariable, string) if '$' in string else string
+
+
+class _Variable(object):
+    """
+    Value of a makefile variable kept as its expanded fragments (one per assignment), joined only upon lookup, so
+    that appending to long lists (e.g. thousands of "SOURCES +=" lines) stays linear
+    """
+
+    def __init__(self, value=''):
+        self.__fragments = [value] if value else []
+        self.__value = value
+
+    @property
+    def value(self):
+        if self.__value is None:
+            self.__value = ''.join(self.__fragments)
+        return self.__value
+
+    def append(self, fragment):
+        fragment = fragment.rstrip() if self.__fragments else fragment.strip()
+        if fragment:
+            self.__fragments.append(fragment)
+            self.__value = None
+
+
+class StatMakefileCache(object):
+    """
+    Persistent snapshot of the parsed makefiles, where each one stays valid as long as none of the files of its
+    include chain is modified
+    """
+
+    def __init__(self, filePath=attributes.MAKEFILES_CACHE_FILENAME):
+        self.__filePath = filePath
+        self.__snapshots = self.__read()
+        self.__isModified = False
+
+    def lookup(self, makefile):
+        """
+        :return: the files of the include chain, the variables of the makefile and its graph of inclusion; None if it's
+                 to be parsed anew
+        """
+        variants = self.__snapshots.get(makefile)
+        for snapshot in variants if isinstance(variants, list) else []:
+            if isinstance(snapshot, dict) and set(snapshot) == _SNAPSHOT_FIELDS and self.__isValid(snapshot):
+                includes = {path: list(included) for path, included in snapshot['includes'].items()}
+                return list(snapshot['files']), dict(snapshot['items']), includes
+        return None
+
+    def store(self, makefile, files, items, includes, environment=None):
+        """
+        Stores the snapshot of a parsed makefile, where a variant is kept per the values of the environment variables
+        it was parsed upon (e.g. per product)
+        """
+        environment = dict(environment or {})
+        stamps = [[path, _stampFile(path)] for path in files]
+        snapshot = {'stamps': stamps, 'files': list(files), 'items': dict(items), 'environment': environment,
+                    'includes': {path: list(included) for path, included in includes.items()}}
+        variants = self.__snapshots.get(makefile)
+        variants = [variant for variant in variants if isinstance(variant, dict) and
+                    variant.get('environment') != environment] if isinstance(variants, list) else []
+        self.__snapshots[makefile] = variants + [snapshot]
+        self.__isModified = True
+
+    def write(self):
+        if self.__isModified and os.path.isdir(os.path.dirname(self.__filePath) or os.curdir):
+            writeJsonFile(self.__filePath, self.__snapshots)
+            self.__isModified = False
+
+    def __read(self):
+        if not os.path.isfile(self.__filePath):
+            return {}
+        try:
+            with open(self.__filePath) as fp:
+                snapshots = loadJson(fp)
+        except ValueError:
+            return {}
+        return snapshots if isinstance(snapshots, dict) else {}
+
+    @staticmethod
+    def __isValid(snapshot):
+        return all(os.environ.get(name) == value for name, value in snapshot['environment'].items()) and \
+               all(_stampFile(path) == stamp for path, stamp in snapshot['stamps'])
+
+
+_SNAPSHOT_FIELDS = {'stamps', 'files', 'items', 'includes', 'environment'}
+_caches = {}
+
+
+def getMakefileCache(filePath=attributes.MAKEFILES_CACHE_FILENAME):
+    """
+    :return: the cache of the parsed makefiles (a single one per process and cache file), loaded upon the first use
+    """
+    if filePath not in _caches:
+        _caches[filePath] = StatMakefileCache(filePath)
+    return _caches[filePath]
+
+
+def _stampFile(path):
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return [status.st_mtime_ns, status.st_size]
 
 
 class _MakefileReader(object):
     """
-    Mak-file reader that allows reading with included files
+    Mak-file reader that allows reading with included files, which are kept on an explicit stack, so that a line costs
+    the same at any depth of inclusion
     """
 
     def __init__(self, filePath):
         if not os.path.isfile(filePath):
             raise StatMakFileException("Makefile '{fileName}' doesn't exist!".format(fileName=filePath))
-        self.__filePath = filePath
-        self.__nested = None
+        self.__stack = []
+        self.__contents = {}
+        self.__includes = {}
+        self.__push(filePath)
 
-    def includeNestedFile(self, filename):
-        if self.__nested is not None:
-            self.__nested.includeNestedFile(filename)
-        elif os.path.isfile(filename):
-            self.__nested = _MakefileReader(filename)
-        else:
-            raise StatMakFileException(
-                "Attempt to include not existing file '{0}' within '{1}'.".format(filename, self.__filePath))
+    @property
+    def includes(self):
+        """
+        :return: the graph of inclusion, i.e. the files included by each of the files read (in the order of inclusion)
+        """
+        return self.__includes
+
+    def includeNestedFiles(self, filenames):
+        """
+        Includes the files into the current one, so that they are read (one after another) ahead of its next line
+        """
+        for filename in filenames:
+            if not os.path.isfile(filename):
+                raise StatMakFileException("Attempt to include not existing file '{0}' within '{1}'.".format(
+                    filename, self.getCurrentFilePath()))
+        self.__includes.setdefault(self.getCurrentFilePath(), []).extend(filenames)
+        for filename in reversed(filenames):
+            self.__push(filename)
 
     def getCurrentFilePath(self):
-        if self.__nested is not None:
-            return self.__nested.getCurrentFilePath()
-        else:
-            return self.__filePath
+        return self.__stack[-1][0]
 
     def readLines(self):
-        for line in self.__readSyntacticLines():
-            yield line
-            for nested in self.__readNestedFileLines():
-                yield nested
-
-    def __readNestedFileLines(self):
-        if self.__nested is not None:
-            for line in self.__nested.readLines():
-                yield line
+        while self.__stack:
+            line = next(self.__stack[-1][2], None)
+            if line is None:
+                self.__stack.pop()
             else:
-                self.__nested = None
+                yield line
 
-    def __readSyntacticLines(self):
+    def __push(self, filePath):
+        realPath = os.path.realpath(filePath)
+        realPaths = [entry[1] for entry in self.__stack]
+        if realPath in realPaths:
+            cycle = [entry[0] for entry in self.__stack[realPaths.index(realPath):]] + [filePath]
+            raise StatMakFileException("Cyclic inclusion of '{0}': {1}".format(filePath, ' -> '.join(cycle)))
+        if realPath not in self.__contents:
+            self.__contents[realPath] = self.__readSyntacticLines(filePath)
+        self.__stack.append((filePath, realPath, iter(self.__contents[realPath])))
+
+    @staticmethod
+    def __readSyntacticLines(filePath):
+        with open(filePath) as _file:
+            textLines = _file.readlines()
+        lines = []
         line = ''
-        for nextLine in self.__readTextFileLines():
+        for nextLine in textLines:
+            nextLine = nextLine.rstrip()
             line = line + nextLine if line else nextLine
             if line.endswith('\\'):
                 line = line[:-1]
                 continue
-            yield line
+            lines.append(line)
             line = ''
-        else:
-            if line:
-                yield line
-
-    def __readTextFileLines(self):
-        _file = open(self.__filePath)
-        for line in _file:
-            yield line.rstrip()
-        else:
-            _file.close()
+        if line:
+            lines.append(line)
+        return lines
 
 
 class StatMakFileException(Exception):
@@ -7,13 +7,18 @@
 
 import os
 import platform
+import re
+from hashlib import sha1
 
 import stat_attributes as attributes
-from services import toPosixPath, mkdir, nameExecutable
-from stat_configuration import StatConfiguration
+from services import toPosixPath, mkdir, nameExecutable, readTextFileAtOnce
+from stat_configuration import StatConfiguration, calculateConfigurationVersion
 from build_tools_crawler import BuildToolsCrawler
 from stat_makefile import StatMakefile
 
+FINGERPRINT_VARIABLE = 'STAT_FINGERPRINT'
+TOOLS_VARIABLE = 'STAT_TOOLS'
+
 _makFileTemplate = """# Makefile autogenerated by STAT
 {variables}
 
@@ -22,27 +27,59 @@ include {tool_path}/components.mak
 include {tool_path}/stat_build.mak
 """
 
+_entryMakFileTemplate = """# Makefile autogenerated by STAT
+{product_variable} ?= {product}
+
+include {makefile_path}
+"""
+
 
 class StatMakefileGenerator(object):
+    """
+    Generator of the makefile of a product (output/<product>/stat.mak), which is kept as long as its fingerprint holds,
+    while the makefile included by the test-packages (output/stat.mak) just selects the product to build for
+    """
 
     def __init__(self, productMakefile):
         self.__targetName = productMakefile.split('.')[0]
         self.__productFilePath = '/'.join([toPosixPath(attributes.PRODUCT_DIRECTORY), productMakefile])
         if not os.path.isfile(self.__productFilePath):
             raise StatMakefileGeneratorException("The product file '{0}' was not found".format(self.__productFilePath))
+        self.__fileName = attributes.AUTO_GENERATED_PRODUCT_MAKEFILE.format(self.__targetName)
+
+    @property
+    def fileName(self):
+        return self.__fileName
+
+    def isStale(self):
+        if not os.path.isfile(self.__fileName):
+            return True
+        values = dict(re.findall(r'\s*(\w+)\s*=\s*(.+)\s*', readTextFileAtOnce(self.__fileName)))
+        toolAttributes = {key: values.get(key, '') for key in values.get(TOOLS_VARIABLE, '').split()}
+        return values.get(FINGERPRINT_VARIABLE) != self.__calculateFingerprint(toolAttributes)
 
     def generate(self):
-        variables = self.__constructVariablesInitialization()
-        fileContext = _makFileTemplate.format(variables=variables,
-                                              tool_path=toPosixPath(os.path.relpath(attributes.TOOL_PATH)),
-                                              product_file_path=self.__productFilePath)
+        """
+        Generates the makefile of the product unless it's up to date, and selects the product for the makefiles parsed
+        by this process (via the environment, as it's done for the make processes)
+        """
+        if self.isStale():
+            variables = self.__constructVariablesInitialization()
+            fileContext = _makFileTemplate.format(variables=variables, tool_path=self.__getToolPath(),
+                                                  product_file_path=self.__productFilePath)
+            self.__write(self.__fileName, fileContext)
+        os.environ[StatMakefile.PRODUCT] = self.__targetName
+
+    def makeDefault(self):
+        """
+        Makes the product the default one of the makefiles of the test-packages, i.e. when built without STAT
+        """
         fileName = attributes.AUTO_GENERATED_MAKEFILE
-        directory = os.path.dirname(fileName)
-        mkdir(directory, exist_ok=True)
-        fileHandle = open(fileName, 'w')
-        fileHandle.write(fileContext)
-        fileHandle.flush()
-        fileHandle.close()
+        makefilePath = attributes.AUTO_GENERATED_PRODUCT_MAKEFILE.format('$({0})'.format(StatMakefile.PRODUCT))
+        fileContext = _entryMakFileTemplate.format(product_variable=StatMakefile.PRODUCT, product=self.__targetName,
+                                                   makefile_path=makefilePath)
+        if not os.path.isfile(fileName) or readTextFileAtOnce(fileName) != fileContext:
+            self.__write(fileName, fileContext)
 
     def __constructVariablesInitialization(self):
         def _formatAssignment(_variable, _value):
@@ -51,14 +88,42 @@ class StatMakefileGenerator(object):
         def _getValues(*_valueSets):
             return [_formatAssignment(_key, _values[_key]) for _values in _valueSets for _key in iter(_values)]
 
+        toolAttributes = BuildToolsCrawler().getBuildAttributes()
         values = [
+            _formatAssignment(FINGERPRINT_VARIABLE, self.__calculateFingerprint(toolAttributes)),
+            _formatAssignment(TOOLS_VARIABLE, ' '.join(sorted(toolAttributes))),
             _formatAssignment(StatMakefile.OS, platform.system()),
             _formatAssignment(StatMakefile.NAME, self.__targetName),
             _formatAssignment(StatMakefile.EXEC, nameExecutable(self.__targetName))
         ]
-        values += _getValues(StatConfiguration(), BuildToolsCrawler().getBuildAttributes())
+        values += _getValues(StatConfiguration(), toolAttributes)
         return '\n'.join(values)
 
+    def __calculateFingerprint(self, toolAttributes):
+        """
+        The inputs of the generated makefile, which are cheap to check, unlike the crawling of the build tools, whose
+        attributes are determined by the user configuration in turn; yet the files the crawled attributes point to
+        (e.g. the batch-file of the MSVS developer environment) are identified by their modification times, so that
+        an update or a removal of the tools is noticed as well
+
+        :param toolAttributes: the attributes of the build tools (as crawled or as recorded in the generated makefile)
+        """
+        inputs = [attributes.VERSION, str(calculateConfigurationVersion()), platform.system(), self.__getToolPath(),
+                  self.__productFilePath]
+        inputs += ['{0}@{1}'.format(toolAttributes[key], os.stat(toolAttributes[key]).st_mtime)
+                   for key in sorted(toolAttributes) if os.path.isfile(toolAttributes[key])]
+        return sha1('|'.join(inputs).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def __getToolPath():
+        return toPosixPath(os.path.relpath(attributes.TOOL_PATH))
+
+    @staticmethod
+    def __write(fileName, fileContext):
+        mkdir(os.path.dirname(fileName), exist_ok=True)
+        with open(fileName, 'w') as fileHandle:
+            fileHandle.write(fileContext)
+
 
 class StatMakefileGeneratorException(Exception):
     """
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+from collections import OrderedDict
+
+from services import isWindows
+from stat_makefile import StatMakefile
+from stat_runtime import calculateRuntimeVariant
+
+# The listing of the shared objects of a test-package (in its objects directory), so that its rebuild doesn't remake
+# them, since they were compiled anew ahead of the packages, and the packages sharing them may be building concurrently
+SHARED_OBJECTS_LISTING = 'shared_objects.mak'
+
+
+class StatObjectSharing(object):
+    """
+    Plan of the objects compiled once and hard-linked into every test-package that compiles the very same source with
+    the same definitions and the same resolved headers
+    """
+
+    def __init__(self, catalog, shallShare=True):
+        """
+        :param catalog: the parsed makefiles of the test-packages to be built by their file-names (e.g. StatCatalog)
+        :param shallShare: if False, nothing is planned for sharing, e.g. since the packages are to be cleaned
+        """
+        self.__headerListings = {}
+        self.__directories = OrderedDict()
+        self.__objects = OrderedDict()
+        self.__groups = OrderedDict()
+        for makefile in catalog:
+            try:
+                self.__planPackage(makefile, catalog[makefile], shallShare)
+            except Exception:  # The failing packages are reported upon their own processing
+                continue
+        self.__groups = OrderedDict((key, group) for key, group in self.__groups.items() if len(group) > 1)
+
+    @property
+    def owners(self):
+        """
+        :return: the makefiles along with the object-files each of them shall compile for the others
+        """
+        owners = OrderedDict()
+        for group in self.__groups.values():
+            makefile, objectFile = group[0]
+            owners.setdefault(makefile, []).append(objectFile)
+        return owners
+
+    def unshare(self, shallRebuild=False):
+        """
+        Breaks the links of the previous runs, except for the objects of the owners, since those are still valid
+
+        :param shallRebuild: if True, the objects of the owners are removed as well, so that they're compiled anew
+        """
+        ownedObjects = set(group[0][1] for group in self.__groups.values())
+        for directory in self.__directories.values():
+            _removeFile('/'.join([directory, SHARED_OBJECTS_LISTING]))
+        for objectFiles in self.__objects.values():
+            for objectFile in objectFiles:
+                if not os.path.isfile(objectFile):
+                    continue
+                if shallRebuild if objectFile in ownedObjects else os.stat(objectFile).st_nlink > 1:
+                    os.remove(objectFile)
+
+    def share(self):
+        """
+        Links the compiled objects of the owners into the packages that need them, and lists the shared objects of
+        each package in its objects directory
+        """
+        listings = OrderedDict()
+        for group in self.__groups.values():
+            _, ownedObject = group[0]
+            if not os.path.isfile(ownedObject):
+                continue
+            for _, objectFile in group[1:]:
+                _linkFile(ownedObject, objectFile)
+            for makefile, objectFile in group:
+                listings.setdefault(self.__directories[makefile], []).append(objectFile)
+        for directory, objectFiles in listings.items():
+            with open('/'.join([directory, SHARED_OBJECTS_LISTING]), 'w') as fp:
+                fp.write('STAT_SHARED_OBJECTS:={0}\n'.format(' '.join(objectFiles)))
+
+    def __planPackage(self, makefileName, makefile, shallShare):
+        objectsDirectory = '/'.join([makefile['OUTPUT_DIR'], makefile[StatMakefile.NAME], makefile.name, 'obj'])
+        self.__directories[makefileName] = objectsDirectory
+        headers = tuple(sorted(resolveHeaders(makefile, self.__headerListings).items())) if shallShare else None
+        defines = ' '.join(makefile[StatMakefile.DEFINES].split())
+        objectFiles = self.__objects.setdefault(makefileName, [])
+        for source in self.__listSources(makefile):
+            objectName = os.path.splitext(os.path.basename(source))[0] + ('.obj' if isWindows() else '.o')
+            objectFile = '/'.join([objectsDirectory, objectName])
+            objectFiles.append(objectFile)
+            if shallShare:
+                key = os.path.realpath(source), defines, headers
+                self.__groups.setdefault(key, []).append((makefileName, objectFile))
+
+    @staticmethod
+    def __listSources(makefile):
+        sources = [source for source in makefile[StatMakefile.SOURCES].split() if os.path.isfile(source)]
+        if calculateRuntimeVariant(makefile):
+            runtimeSources = set(os.path.realpath(source) for source in makefile['STAT_SOURCES'].split())
+            sources = [source for source in sources if os.path.realpath(source) not in runtimeSources]
+        return sources
+
+
+def resolveHeaders(makefile, listings=None):
+    """
+    Resolves the headers the same way the build-engine installs them: dummy-interfaces first, then include directories
+    in their order, where the first header of each name wins
+
+    :param makefile: the parsed makefile of a test-package
+    :param listings: optional cache of the headers listed per directory, reused across the test-packages
+    :return: the real paths of the headers by their names
+    """
+    listings = {} if listings is None else listings
+    headers = {}
+    for interface in makefile[StatMakefile.INTERFACES].split():
+        path = os.path.join(makefile['DUMMIES_DIR'], interface)
+        if os.path.isfile(path):
+            headers.setdefault(os.path.basename(path), os.path.realpath(path))
+    for directory in makefile[StatMakefile.INCLUDES].split():
+        if directory not in listings:
+            filenames = os.listdir(directory) if os.path.isdir(directory) else []
+            listings[directory] = sorted(filename for filename in filenames if filename.endswith('.h'))
+        for filename in listings[directory]:
+            headers.setdefault(filename, os.path.realpath(os.path.join(directory, filename)))
+    return headers
+
+
+def _removeFile(path):
+    if os.path.isfile(path):
+        os.remove(path)
+
+
+def _linkFile(sourcePath, targetPath):
+    if os.path.isfile(targetPath):
+        if os.path.samefile(sourcePath, targetPath):
+            return
+        os.remove(targetPath)
+    elif not os.path.isdir(os.path.dirname(targetPath)):
+        os.makedirs(os.path.dirname(targetPath))
+    try:
+        os.link(sourcePath, targetPath)
+    except OSError:  # E.g. file-systems without hard-links
+        shutil.copy2(sourcePath, targetPath)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+import os
+from collections import OrderedDict
+from hashlib import sha1
+
+import stat_attributes as attributes
+from stat_makefile import StatMakefile
+
+RUNTIME_INCLUDE_DIRECTORIES = [os.path.join(attributes.TOOL_PATH, 'unity'),
+                               os.path.join(attributes.TOOL_PATH, 'lib', 'inc')]
+
+
+def calculateRuntimeVariant(makefile):
+    """
+    :param makefile: the parsed makefile (StatMakefile) of a test-package
+    :return: the key of the shared runtime library variant, or an empty string if the package shadows any of the
+             runtime headers and thus shall build the runtime on its own
+    """
+    if __isShadowingRuntimeHeaders(makefile):
+        return ''
+    defines = ' '.join(makefile[StatMakefile.DEFINES].split())
+    return sha1(defines.encode('utf-8')).hexdigest()[:16]
+
+
+def selectRuntimeBuilders(catalog):
+    """
+    :param catalog: the parsed makefiles of the test-packages by their file-names (e.g. StatCatalog)
+    :return: the first test-package makefile of each variant of the shared runtime library
+    """
+    builders = OrderedDict()
+    for makefile in catalog:
+        try:
+            variant = calculateRuntimeVariant(catalog[makefile])
+        except Exception:  # The failing packages are reported upon their own processing
+            continue
+        if variant:
+            builders.setdefault(variant, makefile)
+    return list(builders.values())
+
+
+def __listRuntimeHeaders():
+    return set(filename for directory in RUNTIME_INCLUDE_DIRECTORIES for filename in os.listdir(directory)
+               if filename.endswith('.h'))
+
+
+def __isShadowingRuntimeHeaders(makefile):
+    runtimeHeaders = __listRuntimeHeaders()
+    interfaces = set(os.path.basename(filename) for filename in makefile[StatMakefile.INTERFACES].split())
+    if interfaces & runtimeHeaders:
+        return True
+    runtimeDirectories = set(os.path.realpath(directory) for directory in RUNTIME_INCLUDE_DIRECTORIES)
+    for directory in makefile[StatMakefile.INCLUDES].split():
+        if os.path.realpath(directory) not in runtimeDirectories and os.path.isdir(directory):
+            if runtimeHeaders.intersection(os.listdir(directory)):
+                return True
+    return False
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from collections import OrderedDict
+from heapq import heappush, heappop
+from itertools import count
+from multiprocessing import Pool
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from stat_executor import createEventLoop
+
+COMPILE_STAGE = 0
+RUN_STAGE = 1
+POOL_ENGINE = 'pool'
+ASYNC_ENGINE = 'async'
+ENGINES = (POOL_ENGINE, ASYNC_ENGINE)
+
+
+class StatScheduler(object):
+    """
+    Long-lived pools of workers shared by all targets, that dispatch queued test-packages longest-first.
+    Optionally, the execution of test-packages is pipelined into a dedicated pool of its own.
+    """
+
+    def __init__(self, processes, estimate=None, runProcesses=0, engine=POOL_ENGINE):
+        """
+        :param processes: the amount of workers (i.e. the amount of jobs in flight) compiling test-packages
+        :param estimate: a callable (target, makefile) returning the expected duration of a job
+        :param runProcesses: the amount of workers running test-packages; if 0, the compiling workers run them
+        :param engine: either a pool of worker processes, or a single event-loop, where the jobs are coroutines
+        """
+        self.__estimate = estimate if estimate is not None else lambda target, makefile: 0
+        self.__sequence = count()
+        self.__results = Queue()
+        self.__loop = createEventLoop() if engine == ASYNC_ENGINE else None
+        createPool = Pool if self.__loop is None else lambda size: _AsyncPool(size, self.__loop)
+        compileStage = _Stage(processes, self.__results, createPool)
+        runStage = _Stage(runProcesses, self.__results, createPool) if runProcesses else compileStage
+        self.__stages = [compileStage, runStage]
+
+    @property
+    def pending(self):
+        return sum(stage.pending for stage in set(self.__stages))
+
+    def submit(self, target, function, makefile, *args):
+        self.submitToStage(COMPILE_STAGE, target, function, makefile, *args)
+
+    def submitToStage(self, stage, target, function, makefile, *args):
+        job = (-self.__estimate(target, makefile), next(self.__sequence), function, (makefile,) + args)
+        self.__stages[stage].push(target, job)
+
+    def drain(self, handleResult):
+        """
+        Runs all the submitted jobs to completion, while the workers stay alive for further submissions.
+        Jobs submitted by the result handler are run within the same drain.
+
+        :param handleResult: a callable (target, result) called in the order of completion
+        """
+        self.__dispatch()
+        while any(stage.inFlight for stage in self.__stages):
+            while self.__loop is not None and self.__results.empty():
+                self.__settle()
+            stage, target, result, error = self.__results.get()
+            stage.inFlight -= 1
+            if error is not None:
+                raise StatSchedulerException(StatSchedulerException.WORKER_FAILURE.format(target, error))
+            handleResult(target, result)
+            self.__dispatch(target)
+
+    def close(self, abort=False):
+        for stage in set(self.__stages):
+            stage.close(abort)
+        if self.__loop is not None:
+            self.__loop.close()
+            self.__loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(abort=exc_type is not None)
+
+    def __dispatch(self, affinity=None):
+        for stage in reversed(self.__stages):
+            stage.dispatch(affinity)
+
+    def __settle(self):
+        """
+        Runs the event-loop until any of the jobs in flight (of any stage) completes
+        """
+        tasks = set(task for stage in set(self.__stages) for task in stage.tasks)
+        self.__loop.run_until_complete(asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED))
+
+
+class _Stage(object):
+    """
+    A pool of workers along with its per-target queues of jobs
+    """
+
+    def __init__(self, processes, results, createPool=Pool):
+        self.__processes = processes
+        self.__results = results
+        self.__createPool = createPool
+        self.__pool = None
+        self.__queues = OrderedDict()
+        self.inFlight = 0
+
+    @property
+    def pending(self):
+        return sum(len(queue) for queue in self.__queues.values())
+
+    @property
+    def tasks(self):
+        return getattr(self.__pool, 'tasks', ())
+
+    def push(self, target, job):
+        heappush(self.__queues.setdefault(target, []), job)
+
+    def dispatch(self, affinity=None):
+        while self.inFlight < self.__processes:
+            target = self.__selectTarget(affinity)
+            if target is None:
+                break
+            _, _, function, args = heappop(self.__queues[target])
+            self.__apply(target, function, args)
+
+    def close(self, abort=False):
+        if self.__pool is not None:
+            if abort:
+                self.__pool.terminate()
+            else:
+                self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+    def __selectTarget(self, affinity):
+        if self.__queues.get(affinity):
+            return affinity
+        loads = [(self.__calculateLoad(target), target) for target in self.__queues if self.__queues[target]]
+        return max(loads, key=lambda load: load[0])[1] if loads else None
+
+    def __calculateLoad(self, target):
+        return -sum(job[0] for job in self.__queues[target]), len(self.__queues[target])
+
+    def __apply(self, target, function, args):
+        def handleResult(result):
+            self.__results.put((self, target, result, None))
+
+        def handleError(error):
+            self.__results.put((self, target, None, error))
+
+        if self.__pool is None:
+            self.__pool = self.__createPool(self.__processes)
+        self.inFlight += 1
+        self.__pool.apply_async(function, args, callback=handleResult, error_callback=handleError)
+
+
+class _AsyncPool(object):
+    """
+    A pool-like runner of coroutine jobs on an event-loop, where the amount of jobs in flight is gated by a semaphore
+    """
+
+    def __init__(self, processes, loop):
+        self.__loop = loop
+        self.__semaphore = asyncio.Semaphore(processes)
+        self.tasks = set()
+
+    def apply_async(self, function, args, callback, error_callback):
+        async def runJob():
+            async with self.__semaphore:
+                return await function(*args)
+
+        def completeJob(task):
+            self.tasks.discard(task)
+            if task.cancelled():
+                return
+            if task.exception() is None:
+                callback(task.result())
+            else:
+                error_callback(task.exception())
+
+        task = self.__loop.create_task(runJob())
+        task.add_done_callback(completeJob)
+        self.tasks.add(task)
+
+    def close(self):
+        pass
+
+    def terminate(self):
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            self.__loop.run_until_complete(asyncio.wait(self.tasks))
+
+    def join(self):
+        pass
+
+
+class StatSchedulerException(Exception):
+    """
+    Custom exception for STAT scheduler
+    """
+    WORKER_FAILURE = "A worker failed to process a job of target '{0}': {1}"
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+from __future__ import division
+
+import os
+from json import load as loadJson
+
+import stat_attributes as attributes
+from services import writeJsonFile
+
+TIMING_PHASES = ('Compile', 'Link', 'Run')
+
+
+class StatTimings(object):
+    """
+    Persistent store of the durations measured per test-package (of each product) throughout the runs
+    """
+
+    def __init__(self, filePath=attributes.TIMINGS_FILENAME):
+        self.__filePath = filePath
+        self.__timings = self.__read()
+
+    def __getitem__(self, key):
+        target, makefile = key
+        return self.__timings.get(target, {}).get(makefile, {})
+
+    def __setitem__(self, key, timings):
+        target, makefile = key
+        if timings:
+            record = self.__timings.setdefault(target, {}).setdefault(makefile, {})
+            record.update(timings)
+
+    def estimate(self, target, makefile):
+        """
+        :return: the expected duration of the package; an average over the known ones if it was never measured
+        """
+        record = self[target, makefile]
+        if record:
+            return self.__sumPhases(record)
+        known = [self.__sumPhases(record) for record in self.__timings.get(target, {}).values()]
+        return sum(known) / len(known) if known else 0
+
+    def write(self):
+        writeJsonFile(self.__filePath, self.__timings)
+
+    def __read(self):
+        if not os.path.isfile(self.__filePath):
+            return {}
+        try:
+            with open(self.__filePath) as fp:
+                timings = loadJson(fp)
+        except ValueError:
+            return {}
+        return timings if isinstance(timings, dict) else {}
+
+    @staticmethod
+    def __sumPhases(record):
+        return sum(record.get(phase, 0) for phase in TIMING_PHASES)
+
+
+class StatEta(object):
+    """
+    Tracks the outstanding packages to estimate the remaining time of the run and its critical path
+    """
+
+    def __init__(self, estimate, workers=1):
+        """
+        :param estimate: a callable (target, makefile) returning the expected duration of a package
+        :param workers: the amount of packages processed concurrently
+        """
+        self.__estimate = estimate
+        self.__workers = max(workers, 1)
+        self.__outstanding = {}
+
+    def add(self, target, makefile):
+        self.__outstanding[target, makefile] = self.__estimate(target, makefile)
+
+    def complete(self, target, makefile):
+        self.__outstanding.pop((target, makefile), None)
+
+    @property
+    def remaining(self):
+        """
+        :return: the remaining time in seconds; bound by the longest outstanding package
+        """
+        if not self.__outstanding:
+            return 0
+        return max(sum(self.__outstanding.values()) / self.__workers, max(self.__outstanding.values()))
+
+    @property
+    def criticalPath(self):
+        """
+        :return: the (target, makefile) pair of the longest outstanding package, or None if nothing is left
+        """
+        if not self.__outstanding:
+            return None
+        return max(self.__outstanding, key=lambda key: self.__outstanding[key])
+
+
+def formatDuration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return '{0}:{1:02}'.format(minutes, seconds)
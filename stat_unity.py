@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: (c) 2020 Western Digital Corporation or its affiliates,
+#                             Arseniy Aharonov <arseniy@aharonov.icu>
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import re
+# noinspection PyUnresolvedReferences
+from xml.dom.minidom import Document
+
+from services import mkdir
+
+UNITY_STATUSES = {'PASS': 'PASSED', 'FAIL': 'FAILED', 'IGNORE': 'IGNORED'}
+# The slowest tests are ranked until they account for this share of the measured time, yet no more than the limit
+SLOWEST_TESTS_SHARE = 0.5
+SLOWEST_TESTS_LIMIT = 100
+
+_REG_EXP_RESULT = r'^(?P<file>.+?):(?P<line>\d+):(?P<name>\w+):(?P<status>PASS|FAIL|IGNORE)' \
+                  r'(?::\s?(?P<message>.*?))?(?:\s*\((?P<duration>\d+) ms\))?\s*$'
+_REG_EXP_TIMING = r'^STAT_TIMING:(?P<name>\w+):(?P<duration>\d+)\s*$'
+_REG_EXP_INDEX = r'^STAT_INDEX:(?P<name>\w+):(?P<index>\d+)\s*$'
+_REG_EXP_COLOR = r'\x1b\[[0-9;]*m'
+
+_RESULT_PATTERN = re.compile(_REG_EXP_RESULT)
+_TIMING_PATTERN = re.compile(_REG_EXP_TIMING)
+_INDEX_PATTERN = re.compile(_REG_EXP_INDEX)
+_COLOR_PATTERN = re.compile(_REG_EXP_COLOR)
+
+
+class UnityResultParser(object):
+    """
+    Streaming parser of the output of Unity, which picks the results of the tests out of the lines as they arrive,
+    so that neither the output nor the log-file are to be read back
+    """
+
+    def __init__(self):
+        self.__results = []
+        self.__timings = {}
+        self.__indices = {}
+
+    @property
+    def results(self):
+        """
+        :return: the results of the tests in the order of their execution, where the duration (in seconds) is known
+                 only if measured, i.e. upon STAT_TIMING or upon UNITY_INCLUDE_EXEC_TIME, while the number of the
+                 test ("Index") is known only if announced by a shard
+        """
+        return self.__results
+
+    def parseLine(self, line):
+        if line.startswith('STAT_TIMING:'):
+            regexResults = _TIMING_PATTERN.search(line)
+            if regexResults:
+                self.__parseTiming(regexResults.group('name'), int(regexResults.group('duration')) / 1000000.0)
+            return
+        if line.startswith('STAT_INDEX:'):
+            regexResults = _INDEX_PATTERN.search(line)
+            if regexResults:
+                self.__indices[regexResults.group('name')] = int(regexResults.group('index'))
+            return
+        regexResults = _RESULT_PATTERN.search(_COLOR_PATTERN.sub('', line) if '\x1b' in line else line)
+        if regexResults:
+            name = regexResults.group('name')
+            result = dict(Name=name, File=regexResults.group('file'), Line=int(regexResults.group('line')),
+                          Status=UNITY_STATUSES[regexResults.group('status')],
+                          Message=regexResults.group('message') or '')
+            if name in self.__timings:
+                result['Duration'] = self.__timings.pop(name)
+            elif regexResults.group('duration') is not None:
+                result['Duration'] = int(regexResults.group('duration')) / 1000.0
+            if name in self.__indices:
+                result['Index'] = self.__indices.pop(name)
+            self.__results.append(result)
+
+    def __parseTiming(self, name, duration):
+        """
+        The timing record of STAT precedes the result of a passed test, while it follows the one of a failed or ignored
+        test, since Unity reports these upon the failure (or the ignorance) itself, ahead of the tear-down
+        """
+        lastResult = self.__results[-1] if self.__results else {}
+        if lastResult.get('Name') == name and lastResult['Status'] != 'PASSED':
+            lastResult['Duration'] = duration
+        else:
+            self.__timings[name] = duration
+
+
+def mergeShardResults(shards):
+    """
+    Merges the results of the shards of an executable by the numbers of their tests (as announced by the shards), so
+    that the order of the tests is restored regardless of the tests skipped by the filter or lost to a crashed shard;
+    the results lacking the number follow the rest (in the order of the shards)
+
+    :param shards: the results of each shard (in the order of their indices)
+    :return: the merged results without their numbers
+    """
+    results = sorted([result for results in shards for result in results],
+                     key=lambda result: (0, result['Index']) if 'Index' in result else (1, 0))
+    return [dict((key, value) for key, value in result.items() if key != 'Index') for result in results]
+
+
+def rankSlowestTests(report, share=SLOWEST_TESTS_SHARE, limit=SLOWEST_TESTS_LIMIT):
+    """
+    Ranks the measured tests of all the test-packages (per product) by their durations, so that the few tests that
+    take the most of the time stand out
+
+    :return: the slowest tests that account for the given share of the measured time (at most the limit of them)
+    """
+    tests = [dict(Product=target, Package=makefile, Name=test['Name'], Duration=test['Duration'])
+             for target in report for makefile in report[target]
+             for test in report[target][makefile].get('Tests', []) if 'Duration' in test]
+    total = sum(test['Duration'] for test in tests)
+    slowest, accounted = [], 0
+    for test in sorted(tests, key=lambda item: item['Duration'], reverse=True)[:limit]:
+        if accounted >= share * total:
+            break
+        accounted += test['Duration']
+        slowest.append(dict(test, Share=test['Duration'] / total if total else 0))
+    return slowest
+
+
+def writeJUnitReport(filePath, report):
+    """
+    Writes the report of the test-packages (per product) as a JUnit XML file, where each package is a test-suite; a
+    package that didn't pass, while none of its tests failed (e.g. it failed to compile), gets a test-case of its own
+    """
+    doc = Document()
+    suites = doc.appendChild(doc.createElement('testsuites'))
+    for target in sorted(report):
+        for makefile in sorted(report[target]):
+            suites.appendChild(_createTestSuite(doc, target, makefile, report[target][makefile]))
+    suites.setAttribute('tests', str(sum(int(suite.getAttribute('tests')) for suite in suites.childNodes)))
+    suites.setAttribute('failures', str(sum(int(suite.getAttribute('failures')) for suite in suites.childNodes)))
+    suites.setAttribute('errors', str(sum(int(suite.getAttribute('errors')) for suite in suites.childNodes)))
+    mkdir(os.path.dirname(filePath) or os.curdir, exist_ok=True)
+    with open(filePath, 'w') as fp:
+        fp.write(doc.toprettyxml(indent='  ', encoding='utf-8').decode('utf-8'))
+
+
+def _createTestSuite(doc, target, makefile, package):
+    className = '{0}.{1}'.format(target, os.path.splitext(makefile)[0])
+    suite = doc.createElement('testsuite')
+    suite.setAttribute('name', '{0}/{1}'.format(target, makefile))
+    tests = package.get('Tests', [])
+    for test in tests:
+        case = suite.appendChild(doc.createElement('testcase'))
+        case.setAttribute('classname', className)
+        case.setAttribute('name', test['Name'])
+        case.setAttribute('file', test['File'])
+        case.setAttribute('line', str(test['Line']))
+        if 'Duration' in test:
+            case.setAttribute('time', '{0:.6f}'.format(test['Duration']))
+        if test['Status'] == 'FAILED':
+            case.appendChild(doc.createElement('failure')).setAttribute('message', test['Message'])
+        elif test['Status'] == 'IGNORED':
+            case.appendChild(doc.createElement('skipped')).setAttribute('message', test['Message'])
+    failures = len([test for test in tests if test['Status'] == 'FAILED'])
+    errors = 1 if package['Status'] != 'PASSED' and not failures else 0
+    if errors:
+        case = suite.appendChild(doc.createElement('testcase'))
+        case.setAttribute('classname', className)
+        case.setAttribute('name', makefile)
+        error = case.appendChild(doc.createElement('error'))
+        error.setAttribute('message', package['Status'])
+        error.appendChild(doc.createTextNode(package.get('Info', '')))
+    suite.setAttribute('tests', str(len(tests) + errors))
+    suite.setAttribute('failures', str(failures))
+    suite.setAttribute('errors', str(errors))
+    suite.setAttribute('skipped', str(len([test for test in tests if test['Status'] == 'IGNORED'])))
+    return suite
@@ -457,6 +457,17 @@ class TestExecute(AdvancedTestCase):
         self.assertEqual(TEST_FAKE_OUTPUT, receivedOutput)
         self.assertCalls(self.printMock, [])
 
+    def test_executeWithLineHandler(self):
+        handledLines = []
+
+        status, receivedOutput = services.execute(TEST_COMMAND_LINE + " --pass", beSilent=True,
+                                                  lineHandler=handledLines.append)
+
+        self.assertEqual(0, status)
+        self.assertEqual([], receivedOutput)
+        self.assertEqual(TEST_FAKE_OUTPUT, handledLines)
+        self.assertCalls(self.printMock, [])
+
     def test_executeWithFailure(self):
         status, receivedOutput = services.execute(TEST_COMMAND_LINE + " --fail")
 
@@ -487,7 +498,7 @@ class TestExecute(AdvancedTestCase):
     def __patchPOpen(self):
         pOpen = self.patch(CUT, '.'.join([subprocess.__name__, subprocess.Popen.__name__]))
         stdoutMock = Mock(spec=TextIOWrapper)
-        stdoutMock.readline.side_effect = TEST_FAKE_OUTPUT
+        stdoutMock.readline.side_effect = TEST_FAKE_OUTPUT + ['']
         process = pOpen.return_value
         type(process).stdout = PropertyMock(return_value=stdoutMock)
         type(process).returncode = PropertyMock(return_value=TEST_FAKE_RETURN_CODE)
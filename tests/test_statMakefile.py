@@ -1,7 +1,8 @@
+import json
 import os
 import re
 
-from stat_makefile import StatMakefile, StatMakFileException, _REG_EXP_INCLUDE
+from stat_makefile import StatMakefile, StatMakefileCache, StatMakFileException, _REG_EXP_INCLUDE, _Variable
 from tests.testing_tools import FileBasedTestCase
 
 
@@ -61,6 +62,127 @@ class TestStatMakFile(FileBasedTestCase):
         for variable in expected:
             self.assertEqual(expected[variable], parser[variable].split())
 
+    def test_filesOfCompoundMakefile(self):
+        parser = StatMakefile(self.COMPOUND_MAKEFILE)
+
+        expected = [self.COMPOUND_MAKEFILE, self.DYNAMIC_MAKEFILE, './products/product_derived.mak',
+                    './extra/system.mak', './products/product.mak']
+        self.assertEqual(expected, parser.files)
+
+    def test_parsingOfAppendedValues(self):
+        filename = './appended_values.mak'
+        with open(filename, 'w') as fp:
+            fp.write('EMPTY =\nEMPTY += \nEMPTY +=  first \n'
+                     'SOURCES = main.c \nSOURCES +=extra.c\nSOURCES += $(EMPTY)\n')
+        try:
+            parser = StatMakefile(filename)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual('first', parser['EMPTY'])
+        self.assertEqual('main.cextra.c first', parser[StatMakefile.SOURCES])
+
+    def test_parsingScalesLinearlyWithAppendedLines(self):
+        lookup = _Variable.value.fget
+        joinedLengths = []
+
+        def spyLookup(variable):
+            value = lookup(variable)
+            joinedLengths.append(len(value))
+            return value
+
+        self.patchObject(_Variable, 'value', property(spyLookup))
+
+        def measure(count):
+            filename = './appended_{0}.mak'.format(count)
+            with open(filename, 'w') as fp:
+                fp.write(''.join('SOURCES += src/module_{0}.c\n'.format(index) for index in range(count)))
+            try:
+                self.patch(StatMakefile.__module__, 'getMakefileCache', return_value=StatMakefileCache(filename))
+                del joinedLengths[:]
+                parser = StatMakefile(filename)
+                work = sum(joinedLengths)
+            finally:
+                os.remove(filename)
+            self.assertEqual(count, len(parser[StatMakefile.SOURCES].split()))
+            return work
+
+        factor = 8
+        smaller, larger = measure(200), measure(200 * factor)
+        # A quadratic parsing would look the growing value up upon each line, i.e. about the square of the factor
+        self.assertLess(larger, smaller * factor * 2)
+
+    def test_includesOfCompoundMakefile(self):
+        parser = StatMakefile(self.COMPOUND_MAKEFILE)
+
+        expected = {self.COMPOUND_MAKEFILE: [self.DYNAMIC_MAKEFILE, './products/product_derived.mak',
+                                             './extra/system.mak'],
+                    './products/product_derived.mak': ['./products/product.mak']}
+        self.assertEqual(expected, parser.includes)
+
+    def test_includesOfSeveralFilesAtOnce(self):
+        files = {'./several_first.mak': 'VALUE = first\nFIRST = $(VALUE)\n',
+                 './several_second.mak': 'VALUE = second\nSECOND = $(VALUE)\n',
+                 './several.mak': 'include ./several_first.mak ./several_second.mak\nLAST = $(VALUE)\n'}
+        self.__writeFiles(files)
+
+        parser = StatMakefile('./several.mak')
+
+        self.assertEqual(['first', 'second', 'second'], [parser['FIRST'], parser['SECOND'], parser['LAST']])
+        self.assertEqual(['./several.mak', './several_first.mak', './several_second.mak'], parser.files)
+
+    def test_initializationUponCyclicInclusion(self):
+        files = {'./cyclic_first.mak': 'include ./cyclic_second.mak\n',
+                 './cyclic_second.mak': 'VALUE = 1\ninclude ./cyclic_first.mak\n',
+                 './cyclic.mak': 'include ./cyclic_first.mak\n'}
+        self.__writeFiles(files)
+
+        try:
+            StatMakefile('./cyclic.mak')
+        except StatMakFileException as e:
+            self.assertEqual("Cyclic inclusion of './cyclic_first.mak': "
+                             "./cyclic_first.mak -> ./cyclic_second.mak -> ./cyclic_first.mak", str(e))
+        else:
+            self.fail('The operation should have raised an exception')
+
+    def test_parsingUponRepeatedInclusion(self):
+        files = {'./repeated_common.mak': 'SOURCES += common.c\n',
+                 './repeated.mak': 'include ./repeated_common.mak\ninclude ./repeated_common.mak\n'}
+        self.__writeFiles(files)
+
+        parser = StatMakefile('./repeated.mak')
+
+        self.assertEqual('common.c common.c', parser[StatMakefile.SOURCES])
+        self.assertEqual({'./repeated.mak': ['./repeated_common.mak', './repeated_common.mak']}, parser.includes)
+
+    def test_parsingOfConditionalAssignments(self):
+        files = {'./conditional.mak': 'DEFINED = first\nDEFINED ?= second\nDEFAULT ?= default\nOVERRIDDEN ?= default\n'}
+        self.__writeFiles(files)
+        self.patchDict(os.environ, {'DEFINED': 'environment', 'OVERRIDDEN': 'environment'})
+        os.environ.pop('DEFAULT', None)
+
+        parser = StatMakefile('./conditional.mak')
+
+        self.assertEqual(['first', 'default', 'environment'],
+                         [parser['DEFINED'], parser['DEFAULT'], parser['OVERRIDDEN']])
+
+    def test_parsingOfIncludesUponVariables(self):
+        files = {'./selected_first.mak': 'SELECTED = first\n', './selected_second.mak': 'SELECTED = second\n',
+                 './selecting.mak': 'CHOICE ?= first\ninclude ./selected_$(CHOICE).mak\n'}
+        self.__writeFiles(files)
+        self.patchDict(os.environ, {'CHOICE': 'second'})
+
+        parser = StatMakefile('./selecting.mak')
+
+        self.assertEqual('second', parser['SELECTED'])
+        self.assertEqual(['./selecting.mak', './selected_second.mak'], parser.files)
+
+    def __writeFiles(self, files):
+        for filename, content in files.items():
+            with open(filename, 'w') as fp:
+                fp.write(content)
+            self.addCleanup(os.remove, filename)
+
     def test_regexForValidIncludes(self):
         lines = "include good/one", "include good/url/to/catch  ", " INCLUDE another/very/good/url/to/catch\n"
         expected = [line.replace("include", "").replace("INCLUDE", "").strip() for line in lines]
@@ -79,3 +201,95 @@ class TestStatMakFile(FileBasedTestCase):
         expected = "substituted results (param1) param2) $(data1 substituted substituted"
         received = re.sub(pattern, 'substituted', text)
         self.assertEqual(expected, received)
+
+
+class TestStatMakefileCache(FileBasedTestCase):
+    CACHE_DIRECTORY = './cache_of_makefiles'
+    CACHE_FILENAME = '/'.join([CACHE_DIRECTORY, 'makefiles.json'])
+    COMPOUND_MAKEFILE = '/'.join([CACHE_DIRECTORY, 'compound.mak'])
+    INCLUDED_MAKEFILE = '/'.join([CACHE_DIRECTORY, 'included.mak'])
+
+    def setUp(self):
+        self.rmtree(self.CACHE_DIRECTORY)
+        os.mkdir(self.CACHE_DIRECTORY)
+        with open(self.COMPOUND_MAKEFILE, 'w') as fp:
+            fp.write('SOURCES = main.c\ninclude {0}\nSOURCES += $(EXTRA)\n'.format(self.INCLUDED_MAKEFILE))
+        with open(self.INCLUDED_MAKEFILE, 'w') as fp:
+            fp.write('EXTRA = extra.c\n')
+        self.cache = StatMakefileCache(self.CACHE_FILENAME)
+        self.patch(StatMakefile.__module__, 'getMakefileCache', return_value=self.cache)
+
+    def tearDown(self):
+        self.rmtree(self.CACHE_DIRECTORY)
+
+    def test_parsingUponEmptyCache(self):
+        parser = StatMakefile(self.COMPOUND_MAKEFILE)
+
+        self.assertEqual('main.c extra.c', parser[StatMakefile.SOURCES])
+        expected = ([self.COMPOUND_MAKEFILE, self.INCLUDED_MAKEFILE], {'SOURCES': 'main.c extra.c', 'EXTRA': 'extra.c'},
+                    {self.COMPOUND_MAKEFILE: [self.INCLUDED_MAKEFILE]})
+        self.assertEqual(expected, self.cache.lookup(self.COMPOUND_MAKEFILE))
+
+    def test_parsingSkippedUponPersistentSnapshot(self):
+        StatMakefile(self.COMPOUND_MAKEFILE)
+        self.cache.write()
+        self.patch(StatMakefile.__module__, 'getMakefileCache', return_value=StatMakefileCache(self.CACHE_FILENAME))
+        reader = self.patch(StatMakefile.__module__, '_MakefileReader')
+
+        parser = StatMakefile(self.COMPOUND_MAKEFILE)
+
+        reader.assert_not_called()
+        self.assertEqual('main.c extra.c', parser[StatMakefile.SOURCES])
+        self.assertEqual([self.COMPOUND_MAKEFILE, self.INCLUDED_MAKEFILE], parser.files)
+        self.assertEqual({self.COMPOUND_MAKEFILE: [self.INCLUDED_MAKEFILE]}, parser.includes)
+
+    def test_lookupUponSnapshotOfFormerFormat(self):
+        StatMakefile(self.COMPOUND_MAKEFILE)
+        self.cache.write()
+        with open(self.CACHE_FILENAME) as fp:
+            snapshots = json.load(fp)
+        snapshot = snapshots[self.COMPOUND_MAKEFILE][0]
+        del snapshot['environment']
+        snapshots[self.COMPOUND_MAKEFILE] = snapshot
+        with open(self.CACHE_FILENAME, 'w') as fp:
+            json.dump(snapshots, fp)
+
+        self.assertIsNone(StatMakefileCache(self.CACHE_FILENAME).lookup(self.COMPOUND_MAKEFILE))
+
+    def test_lookupUponVariantsOfEnvironment(self):
+        with open(self.INCLUDED_MAKEFILE, 'w') as fp:
+            fp.write('EXTRA ?= extra.c\n')
+        self.patchDict(os.environ, {'EXTRA': 'first.c'})
+        StatMakefile(self.COMPOUND_MAKEFILE)
+        os.environ['EXTRA'] = 'second.c'
+        StatMakefile(self.COMPOUND_MAKEFILE)
+        reader = self.patch(StatMakefile.__module__, '_MakefileReader')
+
+        self.assertEqual('main.c second.c', StatMakefile(self.COMPOUND_MAKEFILE)[StatMakefile.SOURCES])
+        os.environ['EXTRA'] = 'first.c'
+        self.assertEqual('main.c first.c', StatMakefile(self.COMPOUND_MAKEFILE)[StatMakefile.SOURCES])
+        reader.assert_not_called()
+        del os.environ['EXTRA']
+        self.assertIsNone(self.cache.lookup(self.COMPOUND_MAKEFILE))
+
+    def test_parsingUponModifiedIncludedFile(self):
+        StatMakefile(self.COMPOUND_MAKEFILE)
+        with open(self.INCLUDED_MAKEFILE, 'a') as fp:
+            fp.write('EXTRA += more.c\n')
+
+        self.assertIsNone(self.cache.lookup(self.COMPOUND_MAKEFILE))
+        self.assertEqual('main.c extra.c more.c', StatMakefile(self.COMPOUND_MAKEFILE)[StatMakefile.SOURCES])
+
+    def test_lookupUponRemovedIncludedFile(self):
+        StatMakefile(self.COMPOUND_MAKEFILE)
+        os.remove(self.INCLUDED_MAKEFILE)
+
+        self.assertIsNone(self.cache.lookup(self.COMPOUND_MAKEFILE))
+
+    def test_writeUponMissingDirectory(self):
+        StatMakefile(self.COMPOUND_MAKEFILE)
+        self.rmtree(self.CACHE_DIRECTORY)
+
+        self.cache.write()
+
+        self.assertFalse(os.path.exists(self.CACHE_DIRECTORY))
@@ -7,11 +7,13 @@ from stat_makefile_generator import StatMakefileGenerator, StatMakefileGenerator
 from services import isWindows, remove, nameExecutable
 from stat_configuration import StatConfiguration
 from stat_makefile import StatMakefile
-from tests.test_services import FileBasedTestCase, Mock
+from tests.test_services import FileBasedTestCase, Mock, call
 
 TEST_PRODUCT_NAME = "product"
 TEST_PRODUCT_FILE = TEST_PRODUCT_NAME + ".mak"
 TEST_PRODUCT_EXEC = nameExecutable(TEST_PRODUCT_NAME)
+TEST_DERIVED_PRODUCT_NAME = "product_derived"
+TEST_DERIVED_PRODUCT_FILE = TEST_DERIVED_PRODUCT_NAME + ".mak"
 TEST_TOOL_ATTRIBUTES = {"SOME_PATH": "some/path/to/the/tool", "SOME_VERSION": "1.3.0.7"}
 
 CUT = StatMakefileGenerator.__module__
@@ -24,8 +26,10 @@ class TestStatMakefileGenerator(FileBasedTestCase):
         remove(directory)
         self.buildToolsCrawler = self.patch(CUT, BuildToolsCrawler.__name__, autospec=True)
         self.buildToolsCrawler.return_value.getBuildAttributes.return_value = TEST_TOOL_ATTRIBUTES
+        self.patchDict(os.environ)
 
     def tearDown(self):
+        StatConfiguration.clear()
         directory = os.path.dirname(attributes.AUTO_GENERATED_MAKEFILE)
         remove(directory)
 
@@ -39,10 +43,13 @@ class TestStatMakefileGenerator(FileBasedTestCase):
 
     def test_generate(self):
         config = StatConfiguration()
-        makFile = attributes.AUTO_GENERATED_MAKEFILE
+        makFile = attributes.AUTO_GENERATED_PRODUCT_MAKEFILE.format(TEST_PRODUCT_NAME)
         generator = StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE)
         generator.generate()
+        self.assertEqual(makFile, generator.fileName)
         self.assertTrue(os.path.isfile(makFile))
+        self.assertFalse(os.path.isfile(attributes.AUTO_GENERATED_MAKEFILE))
+        self.assertEqual(TEST_PRODUCT_NAME, os.environ[StatMakefile.PRODUCT])
 
         self.parser = StatMakefile(makFile)
 
@@ -54,10 +61,9 @@ class TestStatMakefileGenerator(FileBasedTestCase):
 
         self.__verifyProductMakefileIsIncluded()
         self.__verifyToolsMakefileIsIncluded()
-        os.remove(makFile)
 
     def test_generateWhenOutputDirectoryExists(self):
-        makFile = attributes.AUTO_GENERATED_MAKEFILE
+        makFile = attributes.AUTO_GENERATED_PRODUCT_MAKEFILE.format(TEST_PRODUCT_NAME)
         directory = os.path.dirname(makFile)
         if not os.path.isdir(directory):
             os.makedirs(directory)
@@ -65,6 +71,81 @@ class TestStatMakefileGenerator(FileBasedTestCase):
         generator.generate()
         self.assertTrue(os.path.isfile(makFile))
 
+    def test_generateUponUpToDateMakefile(self):
+        generator = StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE)
+        generator.generate()
+        self.buildToolsCrawler.reset_mock()
+        os.utime(generator.fileName, (0, 0))
+
+        self.assertFalse(generator.isStale())
+        StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE).generate()
+
+        self.assertCalls(self.buildToolsCrawler, [])
+        self.assertEqual(0, os.stat(generator.fileName).st_mtime)
+
+    def test_generateUponChangedFingerprint(self):
+        generator = StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE)
+        generator.generate()
+        self.buildToolsCrawler.reset_mock()
+        self.patch(CUT, 'calculateConfigurationVersion', return_value='1234567.89')
+
+        self.assertTrue(generator.isStale())
+        generator.generate()
+
+        self.assertFalse(generator.isStale())
+        self.assertCalls(self.buildToolsCrawler, [call(), call().getBuildAttributes()])
+
+    def test_generateUponUpdatedTools(self):
+        toolFile = os.path.join(os.path.dirname(attributes.AUTO_GENERATED_MAKEFILE), 'VsDevCmd.bat')
+        os.makedirs(os.path.dirname(toolFile))
+        with open(toolFile, 'w') as fileHandle:
+            fileHandle.write('@echo off\n')
+        self.buildToolsCrawler.return_value.getBuildAttributes.return_value = dict(TEST_TOOL_ATTRIBUTES,
+                                                                                   MSVS_DEV=toolFile)
+        generator = StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE)
+        generator.generate()
+        self.assertFalse(generator.isStale())
+
+        os.utime(toolFile, (0, 0))
+        self.assertTrue(generator.isStale())
+        generator.generate()
+        self.assertFalse(generator.isStale())
+
+        os.remove(toolFile)
+        self.assertTrue(generator.isStale())
+
+    def test_generateForManyProducts(self):
+        StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE).generate()
+        StatMakefileGenerator(productMakefile=TEST_DERIVED_PRODUCT_FILE).generate()
+
+        for product in [TEST_PRODUCT_NAME, TEST_DERIVED_PRODUCT_NAME]:
+            makFile = attributes.AUTO_GENERATED_PRODUCT_MAKEFILE.format(product)
+            self.assertEqual(product, StatMakefile(makFile)[StatMakefile.NAME])
+        self.assertEqual(TEST_DERIVED_PRODUCT_NAME, os.environ[StatMakefile.PRODUCT])
+
+    def test_makeDefault(self):
+        StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE).generate()
+        StatMakefileGenerator(productMakefile=TEST_DERIVED_PRODUCT_FILE).generate()
+        generator = StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE)
+        generator.makeDefault()
+
+        StatConfiguration.clear()
+        self.assertEqual(TEST_PRODUCT_NAME, StatConfiguration().defaultProduct)
+        del os.environ[StatMakefile.PRODUCT]
+        self.assertEqual(TEST_PRODUCT_NAME, StatMakefile(attributes.AUTO_GENERATED_MAKEFILE)[StatMakefile.NAME])
+        os.environ[StatMakefile.PRODUCT] = TEST_DERIVED_PRODUCT_NAME
+        self.assertEqual(TEST_DERIVED_PRODUCT_NAME,
+                         StatMakefile(attributes.AUTO_GENERATED_MAKEFILE)[StatMakefile.NAME])
+
+    def test_makeDefaultUponSameProduct(self):
+        generator = StatMakefileGenerator(productMakefile=TEST_PRODUCT_FILE)
+        generator.makeDefault()
+        os.utime(attributes.AUTO_GENERATED_MAKEFILE, (0, 0))
+
+        generator.makeDefault()
+
+        self.assertEqual(0, os.stat(attributes.AUTO_GENERATED_MAKEFILE).st_mtime)
+
     def __verifyProductMakefileIsIncluded(self):
         self.assertIn('product.h', self.parser[StatMakefile.INTERFACES].split())
         self.assertIn('./products/product.c', self.parser[StatMakefile.SOURCES].split())
@@ -251,6 +251,7 @@ class TestStatArgumentParserUponSingleProduct(TestStatArgumentParser):
         parser.parse([])
 
         self.assertEqual(0, parser.processes)
+        self.assertEqual(0, parser.jobSlots)
 
     def test_processesGearImplicitValue(self):
         self.listMakefiles.return_value = SINGLE_PRODUCT * (TEST_MAXIMAL_PARALLELISM + 1)
@@ -270,6 +271,7 @@ class TestStatArgumentParserUponSingleProduct(TestStatArgumentParser):
         parser.parse(['-cc', '-g', str(expected)])
 
         self.assertEqual(expected, parser.processes)
+        self.assertEqual(expected, parser.jobSlots)
         self.assertFalse(parser.shallBeVerbose())
         self.assertEqual(1, parser.getRequestedCleaningLevel())
 
@@ -328,6 +330,148 @@ class TestStatArgumentParserUponSingleProduct(TestStatArgumentParser):
         else:
             self.fail("Minimal acceptable gear below minimum shall fail")
 
+    def test_jobSlotsWithSmallMakefileCount(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse(['-g', str(TEST_MAXIMAL_PARALLELISM)])
+
+        self.assertEqual(len(MANY_MAKEFILES), self.parser.processes)
+        self.assertEqual(TEST_MAXIMAL_PARALLELISM, self.parser.jobSlots)
+
+    def test_runProcessesUponNoRunGear(self):
+        self.listMakefiles.return_value = SINGLE_PRODUCT * (TEST_MAXIMAL_PARALLELISM + 1)
+
+        self.parser.parse(['-g'])
+
+        self.assertEqual(0, self.parser.runProcesses)
+
+    def test_runProcessesRunGearExplicitValue(self):
+        self.listMakefiles.return_value = SINGLE_PRODUCT * (TEST_MAXIMAL_PARALLELISM + 1)
+
+        self.parser.parse(['-g', '4', '-rg', '2'])
+
+        self.assertEqual(4, self.parser.processes)
+        self.assertEqual(2, self.parser.runProcesses)
+
+    def test_runProcessesRunGearAboveMaximalCpuCount(self):
+        self.listMakefiles.return_value = SINGLE_PRODUCT * (TEST_MAXIMAL_PARALLELISM + 1)
+
+        self.parser.parse(['-g', '--run-gear', str(TEST_MAXIMAL_PARALLELISM + 1)])
+
+        self.assertEqual(TEST_MAXIMAL_PARALLELISM, self.parser.runProcesses)
+
+    def test_runProcessesRunGearWithSmallMakefileCount(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse(['-g', '-rg', str(TEST_MAXIMAL_PARALLELISM)])
+
+        self.assertEqual(len(MANY_MAKEFILES), self.parser.runProcesses)
+
+    def test_runProcessesRunGearUponBuildOnly(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse(['-g', '-rg', '2', '-b'])
+
+        self.assertEqual(0, self.parser.runProcesses)
+
+    def test_runProcessesRunGearWithoutGear(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.assertRaises(SystemExit, self.parser.parse, ['-rg', '2'])
+
+    def test_runProcessesRunGearBelowMinimalValue(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.assertRaises(SystemExit, self.parser.parse, ['-g', '-rg', '0'])
+
+    def test_runProcessesRunGearWithTooSmallCpuCount(self):
+        self.countCpuCores.return_value = STAT_MINIMAL_PARALLELISM - 1
+        parser = StatArgumentParser([SINGLE_PRODUCT])
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        parser.parse(['-g', '-rg', '2'])
+
+        self.assertEqual(['-g/--gear', '-rg/--run-gear'], parser.redundant)
+        self.assertEqual(0, parser.runProcesses)
+
+    def test_engine(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse(['-g'])
+        self.assertEqual('pool', self.parser.engine)
+
+        self.parser.parse(['-g', '--engine', 'async'])
+        self.assertEqual('async', self.parser.engine)
+
+        self.assertRaises(SystemExit, self.parser.parse, ['-g', '--engine', 'threads'])
+
+    def test_engineWithTooSmallCpuCount(self):
+        self.countCpuCores.return_value = STAT_MINIMAL_PARALLELISM - 1
+        parser = StatArgumentParser([SINGLE_PRODUCT])
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        parser.parse(['--engine', 'async'])
+
+        self.assertEqual(['--engine'], parser.redundant)
+        self.assertEqual('pool', parser.engine)
+
+    def test_shallForceRun(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse([])
+        self.assertFalse(self.parser.shallForceRun())
+
+        self.parser.parse(['--force-run'])
+        self.assertTrue(self.parser.shallForceRun())
+
+    def test_changesUponNoRequest(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse([])
+
+        self.assertIsNone(self.parser.changes)
+
+    def test_changesUponModificationTimes(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse(['--changed', SINGLE_MAKEFILE])
+
+        self.assertEqual('', self.parser.changes)
+        self.assertCalls(self.listMakefiles, [call('.', SINGLE_MAKEFILE)])
+
+    def test_changesSinceGitReference(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse(['--changed-since', 'origin/master'])
+
+        self.assertEqual('origin/master', self.parser.changes)
+
+    def test_changesUponBothRequests(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.assertRaises(SystemExit, self.parser.parse, ['--changed', '--changed-since', 'HEAD'])
+
+    def test_testFilter(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse([])
+        self.assertIsNone(self.parser.testFilter)
+
+        self.parser.parse(['-t', 'Test_Foo*'])
+        self.assertEqual('Test_Foo*', self.parser.testFilter)
+
+        self.parser.parse(['--tests', 'Test_Fo?'])
+        self.assertEqual('Test_Fo?', self.parser.testFilter)
+
+    def test_junit(self):
+        self.listMakefiles.return_value = MANY_MAKEFILES
+
+        self.parser.parse([])
+        self.assertIsNone(self.parser.junit)
+
+        self.parser.parse(['--junit', 'reports/junit.xml'])
+        self.assertEqual('reports/junit.xml', self.parser.junit)
+
 
 class TestStatArgumentParserUponManyProducts(TestStatArgumentParser):
 
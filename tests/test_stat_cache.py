@@ -0,0 +1,144 @@
+import os
+import sys
+
+from stat_cache import StatCompilationCache, CACHE_HIT, CACHE_MISS, OBJECT_EXTENSION
+from tests.testing_tools import FileBasedTestCase, call
+
+CUT = StatCompilationCache.__module__
+
+CACHE_DIRECTORY = 'cache'
+OBJECTS_DIRECTORY = 'objects'
+SOURCE_FILE = '/abs/path/to/source.c'
+
+
+def composeArguments(namespace, *defines):
+    objectFile = '/'.join([OBJECTS_DIRECTORY, namespace + '.o'])
+    return ['-g', '-c', '-I', 'output/{0}/inc'.format(namespace)] + ['-D' + define for define in defines] + \
+           ['-MT', objectFile, '-MMD', '-MP', '-MF', objectFile + '.d.tmp', '-o', objectFile, SOURCE_FILE]
+
+
+class TestStatCompilationCache(FileBasedTestCase):
+
+    def setUp(self):
+        for directory in [CACHE_DIRECTORY, OBJECTS_DIRECTORY]:
+            self.rmtree(directory)
+        os.mkdir(OBJECTS_DIRECTORY)
+        self.compilations = []
+        self.preprocessed = 'int main(void) { return 0; }'
+        self.status = 0
+        self.execute = self.patch(CUT, '_execute', side_effect=self.fakeExecute)
+        self.patch(CUT, 'which', return_value=sys.executable)
+        self.print = self.patchBuiltinObject('print')
+
+    def tearDown(self):
+        for directory in [CACHE_DIRECTORY, OBJECTS_DIRECTORY]:
+            self.rmtree(directory)
+
+    def fakeExecute(self, command, keepErrors=True):
+        if '--version' in command:
+            return 0, 'gcc (GCC) 9.9.9'
+        if '-E' in command:
+            return self.status, self.preprocessed
+        self.compilations.append(command)
+        if not self.status:
+            with open(command[command.index('-o') + 1], 'w') as fp:
+                fp.write('object of {0}'.format(command))
+        return self.status, ''
+
+    def compile(self, arguments):
+        return StatCompilationCache(CACHE_DIRECTORY).compile('gcc', arguments)
+
+    def test_compile_sharesObjectsAcrossNamespaces(self):
+        self.assertEqual(0, self.compile(composeArguments('first', 'STAT')))
+        self.assertEqual(0, self.compile(composeArguments('second', 'STAT')))
+
+        self.assertEqual([['gcc'] + composeArguments('first', 'STAT')], self.compilations)
+        with open(os.path.join(OBJECTS_DIRECTORY, 'first.o')) as first, \
+                open(os.path.join(OBJECTS_DIRECTORY, 'second.o')) as second:
+            self.assertEqual(first.read(), second.read())
+        self.assertCalls(self.print, [call(CACHE_MISS.format(SOURCE_FILE)), call(CACHE_HIT.format(SOURCE_FILE))])
+
+    def test_compile_preprocessesWithoutOutput(self):
+        self.compile(composeArguments('first', 'STAT'))
+
+        preprocessing = self.execute.call_args_list[0]
+        objectFile = '/'.join([OBJECTS_DIRECTORY, 'first.o'])
+        expected = ['gcc', '-E', '-g', '-I', 'output/first/inc', '-DSTAT', '-MT', objectFile, '-MMD', '-MP',
+                    '-MF', objectFile + '.d.tmp', SOURCE_FILE]
+        self.assertEqual(call(expected, keepErrors=False), preprocessing)
+
+    def test_compile_uponDifferentDefinitions(self):
+        self.compile(composeArguments('first', 'STAT'))
+        self.compile(composeArguments('second', 'STAT', 'STAT_MOCK=8192'))
+
+        self.assertEqual(2, len(self.compilations))
+        self.assertCalls(self.print, [call(CACHE_MISS.format(SOURCE_FILE))] * 2)
+
+    def test_compile_uponDifferentPreprocessedSource(self):
+        self.compile(composeArguments('first', 'STAT'))
+        self.preprocessed = 'int main(void) { return 1; }'
+        self.compile(composeArguments('second', 'STAT'))
+
+        self.assertEqual(2, len(self.compilations))
+
+    def test_compile_uponShiftedLines(self):
+        self.preprocessed = '# 1 "source.c"\nint main(void) { return 0; }'
+        self.compile(composeArguments('first', 'STAT'))
+        self.preprocessed = '# 2 "source.c"\nint main(void) { return 0; }'
+        self.compile(composeArguments('second', 'STAT'))
+
+        self.assertEqual(2, len(self.compilations))
+
+    def __listObjects(self):
+        return [fileName for _, _, files in os.walk(CACHE_DIRECTORY) for fileName in files
+                if fileName.endswith(OBJECT_EXTENSION)]
+
+    def __compileAgingEntries(self, *sources):
+        for index, preprocessed in enumerate(sources):
+            self.preprocessed = preprocessed
+            self.compile(composeArguments('namespace{0}'.format(index), 'STAT'))
+            for directory, _, files in os.walk(CACHE_DIRECTORY):  # Let the usage times differ
+                for fileName in files:
+                    path = os.path.join(directory, fileName)
+                    os.utime(path, (os.path.getmtime(path) - 1, os.path.getmtime(path) - 1))
+
+    def test_compile_doesNotEvict(self):
+        self.patch(CUT, 'CACHE_SIZE_LIMIT', 0)
+
+        self.__compileAgingEntries('first', 'second')
+
+        self.assertEqual(2, len(self.__listObjects()))
+
+    def test_evict_leastRecentlyUsedBeyondLimit(self):
+        entrySize = len('object of {0}'.format(['gcc'] + composeArguments('namespace0', 'STAT')))
+        self.patch(CUT, 'CACHE_SIZE_LIMIT', 2 * entrySize)
+        self.patch(CUT, 'CACHE_SIZE_AFTER_EVICTION', 1)
+        self.__compileAgingEntries('first', 'second', 'first', 'third')
+
+        StatCompilationCache(CACHE_DIRECTORY).evict()
+
+        self.assertEqual(3, len(self.compilations))
+        self.assertEqual(2, len(self.__listObjects()))
+        self.preprocessed = 'first'
+        self.compile(composeArguments('namespace4', 'STAT'))
+        self.assertEqual(3, len(self.compilations))
+        self.preprocessed = 'second'
+        self.compile(composeArguments('namespace5', 'STAT'))
+        self.assertEqual(4, len(self.compilations))
+
+    def test_evict_withinLimit(self):
+        self.__compileAgingEntries('first', 'second')
+
+        StatCompilationCache(CACHE_DIRECTORY).evict()
+
+        self.assertEqual(2, len(self.__listObjects()))
+
+    def test_compile_uponFailure(self):
+        self.status = 1
+        self.preprocessed = ''
+
+        self.assertEqual(1, self.compile(composeArguments('first', 'STAT')))
+        self.assertEqual(1, self.compile(composeArguments('first', 'STAT')))
+
+        self.assertEqual(2, len(self.compilations))
+        self.assertCalls(self.print, [])
@@ -0,0 +1,76 @@
+import os
+import pickle
+
+import stat_attributes as attributes
+from stat_catalog import StatCatalog, StatCatalogException
+from stat_makefile import StatMakefile, StatMakFileException
+from tests.testing_tools import FileBasedTestCase
+
+CUT = StatCatalog.__module__
+
+SIMPLE_MAKEFILE = 'simple.mak'
+NO_SOURCES_MAKEFILE = 'catalog_without_sources.mak'
+NOT_EXISTING_MAKEFILE = 'catalog_not_existing.mak'
+
+
+class TestStatCatalog(FileBasedTestCase):
+
+    def setUp(self):
+        with open(NO_SOURCES_MAKEFILE, 'w') as fp:
+            fp.write('INCLUDES = ./\n')
+        self.addCleanup(os.remove, NO_SOURCES_MAKEFILE)
+
+    def test_catalog(self):
+        catalog = StatCatalog([SIMPLE_MAKEFILE, 'simplified_example.mak'], threads=2)
+
+        self.assertEqual([SIMPLE_MAKEFILE, 'simplified_example.mak'], catalog.packages)
+        self.assertEqual([SIMPLE_MAKEFILE, 'simplified_example.mak'], list(catalog))
+        self.assertEqual({}, catalog.failures)
+        self.assertEqual(2, len(catalog))
+        self.assertIn(SIMPLE_MAKEFILE, catalog)
+        self.assertIsInstance(catalog[SIMPLE_MAKEFILE], StatMakefile)
+        self.assertEqual(StatMakefile(SIMPLE_MAKEFILE)[StatMakefile.SOURCES], catalog[SIMPLE_MAKEFILE]['SOURCES'])
+
+    def test_catalogUponCorruptedMakefiles(self):
+        makefiles = [NOT_EXISTING_MAKEFILE, SIMPLE_MAKEFILE, NO_SOURCES_MAKEFILE]
+
+        catalog = StatCatalog(makefiles, threads=3)
+
+        self.assertEqual([SIMPLE_MAKEFILE], catalog.packages)
+        self.assertNotIn(NO_SOURCES_MAKEFILE, catalog)
+        expected = {NOT_EXISTING_MAKEFILE: str(StatMakFileException(
+                        "Makefile '{fileName}' doesn't exist!".format(fileName=NOT_EXISTING_MAKEFILE))),
+                    NO_SOURCES_MAKEFILE: StatCatalogException.NO_SOURCES}
+        self.assertEqual(expected, catalog.failures)
+        self.assertEqual(makefiles[::2], list(catalog.failures))
+
+    def test_catalogWithinSingleThread(self):
+        threadPool = self.patch(CUT, 'ThreadPool')
+
+        catalog = StatCatalog([SIMPLE_MAKEFILE, NO_SOURCES_MAKEFILE], threads=1)
+
+        threadPool.assert_not_called()
+        self.assertEqual([SIMPLE_MAKEFILE], catalog.packages)
+
+    def test_describe(self):
+        catalog = StatCatalog([SIMPLE_MAKEFILE])
+
+        package = catalog[SIMPLE_MAKEFILE]
+        expected = {'name': 'simple', 'product': package[StatMakefile.NAME],
+                    'sources': ['../unity/unity.c', '../lib/src/stat.c', '../lib/src/stat_rng.c',
+                                './stat_test_example.c'],
+                    'includes': package[StatMakefile.INCLUDES].split(),
+                    'interfaces': ['first_dummy.h', 'second_dummy.h', 'duplicated.h'],
+                    'defines': ['PROJECT_EXAMPLE'],
+                    'executable': '/'.join([attributes.OUTPUT_DIRECTORY, package[StatMakefile.NAME], 'simple', 'bin',
+                                            'simple_product.exe'])}
+        self.assertEqual(expected, catalog.describe(SIMPLE_MAKEFILE))
+
+    def test_packagesArePicklable(self):
+        package = StatCatalog([SIMPLE_MAKEFILE])[SIMPLE_MAKEFILE]
+
+        restored = pickle.loads(pickle.dumps(package))
+
+        self.assertEqual({key: package[key] for key in package}, {key: restored[key] for key in restored})
+        self.assertEqual(package.files, restored.files)
+        self.assertEqual(package.name, restored.name)
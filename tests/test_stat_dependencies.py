@@ -0,0 +1,148 @@
+import os
+import time
+
+import stat_attributes as attributes
+from services import mkdir, writeJsonFile
+from stat_dependencies import StatDependencyIndex, StatDependenciesException, collectDependencies, listChangedFiles
+from tests.testing_tools import FileBasedTestCase, FakeMakefile, call, writeFile
+
+CUT = StatDependencyIndex.__module__
+
+PRODUCT = 'product'
+PACKAGE = 'simplified'
+OBJECTS_DIRECTORY = '/'.join([attributes.OUTPUT_DIRECTORY, PRODUCT, PACKAGE, 'obj'])
+HEADERS_DIRECTORY = '/'.join([attributes.OUTPUT_DIRECTORY, PRODUCT, PACKAGE, 'inc'])
+
+
+AUTO_GENERATED_MAKEFILES = (attributes.AUTO_GENERATED_MAKEFILE,
+                            attributes.AUTO_GENERATED_PRODUCT_MAKEFILE.format(PRODUCT))
+
+
+class TestCollectDependencies(FileBasedTestCase):
+
+    def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+        self.makefile = FakeMakefile(PACKAGE, files=('simple.mak',) + AUTO_GENERATED_MAKEFILES)
+        self.statMakefile = self.patchStatMakefile(CUT, lambda makefile: self.makefile)
+
+    def tearDown(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    def test_collectDependencies_withoutDependencyFiles(self):
+        files = collectDependencies('simple.mak')
+
+        expected = ['simple.mak', 'file_in_root.c', 'dummies/first_dummy.h', 'duplicated.h']
+        self.assertEqual(sorted(os.path.realpath(path) for path in expected), sorted(files))
+
+    def test_collectDependencies_narrowedByDependencyFiles(self):
+        rule = '{0}/file_in_root.o: {1} \\\n {2}/first_dummy.h ../lib/inc/stat.h\n{2}/first_dummy.h:\n'
+        writeFile(OBJECTS_DIRECTORY + '/file_in_root.d.tmp',
+                  rule.format(OBJECTS_DIRECTORY, os.path.realpath('file_in_root.c'), HEADERS_DIRECTORY))
+
+        files = collectDependencies('simple.mak')
+
+        expected = ['simple.mak', 'file_in_root.c', 'dummies/first_dummy.h', '../lib/inc/stat.h']
+        self.assertEqual([os.path.realpath(path) for path in expected], files)
+
+    def test_collectDependencies_skipsMissingSources(self):
+        self.makefile = FakeMakefile(PACKAGE, SOURCES='non_existing.c')
+
+        self.assertEqual([os.path.realpath('simple.mak')], collectDependencies('simple.mak'))
+
+    def test_collectDependencies_ofParsedMakefile(self):
+        makefile = FakeMakefile(PACKAGE, SOURCES='non_existing.c')
+
+        files = collectDependencies('simple.mak', makefile)
+
+        self.assertEqual([os.path.realpath('simple.mak')], files)
+        self.statMakefile.assert_not_called()
+
+
+class TestStatDependencyIndex(FileBasedTestCase):
+
+    def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+        self.headerFile = os.path.realpath('duplicated.h')
+
+    def tearDown(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    def __writePreviousIndex(self, timestamp):
+        mkdir(attributes.OUTPUT_DIRECTORY, exist_ok=True)
+        record = {'Timestamp': timestamp, 'Files': [self.headerFile]}
+        writeJsonFile(attributes.DEPENDENCIES_FILENAME, {PRODUCT: {'simple.mak': record}})
+
+    def test_isAffected_uponUnknownPackage(self):
+        self.__writePreviousIndex(time.time())
+        index = StatDependencyIndex()
+
+        self.assertTrue(index.isAffected(PRODUCT, 'full_example.mak'))
+        self.assertTrue(index.isAffected('another_product', 'simple.mak'))
+
+    def test_isAffected_uponModificationTimes(self):
+        modified = os.path.getmtime(self.headerFile)
+        self.__writePreviousIndex(modified + 1)
+        self.assertFalse(StatDependencyIndex().isAffected(PRODUCT, 'simple.mak'))
+
+        self.__writePreviousIndex(modified - 1)
+        self.assertTrue(StatDependencyIndex().isAffected(PRODUCT, 'simple.mak'))
+
+    def test_isAffected_uponRemovedFile(self):
+        mkdir(attributes.OUTPUT_DIRECTORY, exist_ok=True)
+        index = StatDependencyIndex()
+        index[PRODUCT, 'simple.mak'] = [os.path.realpath('non_existing.h')]
+
+        self.assertTrue(index.isAffected(PRODUCT, 'simple.mak'))
+
+    def test_isAffected_uponChangedFiles(self):
+        self.__writePreviousIndex(time.time())
+        index = StatDependencyIndex()
+
+        self.assertTrue(index.isAffected(PRODUCT, 'simple.mak', {self.headerFile, os.path.realpath('simple.mak')}))
+        self.assertFalse(index.isAffected(PRODUCT, 'simple.mak', {os.path.realpath('simple.mak')}))
+
+    def test_write(self):
+        mkdir(attributes.OUTPUT_DIRECTORY, exist_ok=True)
+        index = StatDependencyIndex()
+        index[PRODUCT, 'simple.mak'] = [self.headerFile, self.headerFile]
+        index[PRODUCT, 'full_example.mak'] = [self.headerFile]
+        del index[PRODUCT, 'full_example.mak']
+        index.write()
+
+        index = StatDependencyIndex()
+        self.assertEqual([self.headerFile], index[PRODUCT, 'simple.mak'])
+        self.assertEqual([], index[PRODUCT, 'full_example.mak'])
+        self.assertFalse(index.isAffected(PRODUCT, 'simple.mak'))
+
+    def test_read_uponCorruptedFile(self):
+        mkdir(attributes.OUTPUT_DIRECTORY, exist_ok=True)
+        with open(attributes.DEPENDENCIES_FILENAME, 'w') as fp:
+            fp.write('{corrupted')
+
+        self.assertTrue(StatDependencyIndex().isAffected(PRODUCT, 'simple.mak'))
+
+
+class TestListChangedFiles(FileBasedTestCase):
+
+    def setUp(self):
+        self.results = {'rev-parse': (0, ['/repository\n']), 'diff': (0, ['lib/src/stat.c\n', 'tests/simple.mak\n']),
+                        'ls-files': (0, ['tests/new.h\n'])}
+        self.execute = self.patch(CUT, 'execute', side_effect=lambda command, **kwargs: self.results[command[1]])
+
+    def test_listChangedFiles(self):
+        files = listChangedFiles('origin/master')
+
+        expected = ['/repository/lib/src/stat.c', '/repository/tests/simple.mak', '/repository/tests/new.h']
+        self.assertEqual(set(os.path.realpath(path) for path in expected), files)
+        self.assertEqual(call(['git', 'diff', '--name-only', 'origin/master'], beSilent=True, cwd='/repository'),
+                         self.execute.call_args_list[1])
+
+    def test_listChangedFiles_uponWrongReference(self):
+        self.results['diff'] = (128, ["fatal: bad revision 'unknown'\n"])
+
+        self.assertRaises(StatDependenciesException, listChangedFiles, 'unknown')
+
+    def test_listChangedFiles_outsideOfRepository(self):
+        self.results['rev-parse'] = (128, ['fatal: not a git repository\n'])
+
+        self.assertRaises(StatDependenciesException, listChangedFiles, 'HEAD')
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sys
+
+from stat_executor import StatOutputSink, createEventLoop, executeAsync, executeSync, OUTPUT_CHUNK_SIZE
+from tests.testing_tools import FileBasedTestCase, call
+
+LOG_FILE = 'executor.log'
+
+
+def composeCommand(script):
+    return [sys.executable, '-c', script]
+
+
+class TestStatOutputSink(FileBasedTestCase):
+
+    def setUp(self):
+        self.printMock = self.patchBuiltinObject('print')
+
+    def tearDown(self):
+        if os.path.isfile(LOG_FILE):
+            os.remove(LOG_FILE)
+
+    def test_write_splitsLinesAcrossChunks(self):
+        handledLines = []
+        sink = StatOutputSink(lineHandler=handledLines.append)
+
+        for chunk in [b'first li', b'ne\r', b'\nsecond line\n', b'third']:
+            sink.write(chunk)
+        sink.close()
+
+        expected = ['first line\n', 'second line\n', 'third']
+        self.assertEqual(expected, handledLines)
+        self.assertEqual(expected, sink.lines)
+        self.assertCalls(self.printMock, [])
+
+    def test_write_keepsBoundedTail(self):
+        sink = StatOutputSink(beSilent=False, tailSize=2)
+
+        sink.write(b'1\n2\n3\n')
+
+        self.assertEqual(['2\n', '3\n'], sink.lines)
+        self.assertCalls(self.printMock, [call(line, end='') for line in ['1\n', '2\n', '3\n']])
+
+    def test_write_boundsEndlessLine(self):
+        sink = StatOutputSink()
+
+        sink.write(b'x' * (OUTPUT_CHUNK_SIZE + 1))
+
+        self.assertEqual(['x' * (OUTPUT_CHUNK_SIZE + 1)], sink.lines)
+
+    def test_write_streamsToLogFile(self):
+        with open(LOG_FILE, 'w') as fp:
+            fp.write('previous\n')
+        sink = StatOutputSink(LOG_FILE)
+
+        sink.write(b'first\nsecond\n')
+        sink.close()
+
+        with open(LOG_FILE) as fp:
+            self.assertEqual('previous\nfirst\nsecond\n', fp.read())
+
+
+class TestExecuteSync(FileBasedTestCase):
+
+    def tearDown(self):
+        if os.path.isfile(LOG_FILE):
+            os.remove(LOG_FILE)
+
+    def test_executeSync_streamsToLogFile(self):
+        sink = StatOutputSink(LOG_FILE, tailSize=2)
+        script = 'import sys; print("\\n".join(str(line) for line in range(5))); sys.stderr.write("err\\n"); ' \
+                 'sys.exit(3)'
+
+        status = executeSync(composeCommand(script), sink)
+
+        self.assertEqual(3, status)
+        self.assertEqual(['4\n', 'err\n'], sink.lines)
+        with open(LOG_FILE) as fp:
+            self.assertEqual('0\n1\n2\n3\n4\nerr\n', fp.read())
+
+    def test_executeSync_withCustomKwargs(self):
+        sink = StatOutputSink()
+        command = composeCommand('import os; print(os.environ["STAT_NAMESPACE"])')
+
+        status = executeSync(command, sink, env=dict(os.environ, STAT_NAMESPACE='ns'))
+
+        self.assertEqual(0, status)
+        self.assertEqual(['ns\n'], sink.lines)
+
+
+class TestExecuteAsync(FileBasedTestCase):
+
+    def setUp(self):
+        self.loop = createEventLoop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_executeAsync_concurrently(self):
+        sinks = [StatOutputSink(tailSize=10) for _ in range(3)]
+        script = 'import sys; print("out {0}"); sys.stdout.flush(); sys.stderr.write("err {0}\\n"); sys.exit({0})'
+        coroutines = [executeAsync(composeCommand(script.format(index)), sink) for index, sink in enumerate(sinks)]
+
+        statuses = self.loop.run_until_complete(asyncio.gather(*coroutines))
+
+        self.assertEqual([0, 1, 2], statuses)
+        self.assertEqual([['out {0}\n'.format(index), 'err {0}\n'.format(index)] for index in range(3)],
+                         [sink.lines for sink in sinks])
+
+    def test_executeAsync_withCustomKwargs(self):
+        sink = StatOutputSink()
+        command = composeCommand('import os; print(os.environ["STAT_NAMESPACE"])')
+
+        status = self.loop.run_until_complete(executeAsync(command, sink, env=dict(os.environ, STAT_NAMESPACE='ns')))
+
+        self.assertEqual(0, status)
+        self.assertEqual(['ns\n'], sink.lines)
+
+    def test_executeAsync_matchesExecuteSync(self):
+        command = composeCommand('import sys; print(sys.argv[1:]); sys.exit(3)') + ['with space', 'quoted="value"', '']
+        sinks = [StatOutputSink(), StatOutputSink()]
+
+        statuses = [executeSync(command, sinks[0]), self.loop.run_until_complete(executeAsync(command, sinks[1]))]
+
+        self.assertEqual([3, 3], statuses)
+        self.assertEqual(["['with space', 'quoted=\"value\"', '']\n"], sinks[0].lines)
+        self.assertEqual(sinks[0].lines, sinks[1].lines)
@@ -0,0 +1,63 @@
+import os
+from json import load as loadJson
+
+import stat_attributes as attributes
+from stat_headers import prepareHeadersOverlay, HEADERS_OVERLAY_DIRECTORY, MANIFEST_FILENAME
+from stat_makefile import StatMakefile
+from tests.testing_tools import FileBasedTestCase, FakeMakefile
+
+CUT = prepareHeadersOverlay.__module__
+
+
+def composePackage(**variables):
+    return FakeMakefile(**dict({StatMakefile.INTERFACES: 'first_dummy.h duplicated.h'}, **variables))
+
+
+class TestPrepareHeadersOverlay(FileBasedTestCase):
+
+    def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+        self.isWindows = self.patch(CUT, 'isWindows', return_value=False)
+
+    def tearDown(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    def __getOverlayPath(self, key, *args):
+        return os.path.join(attributes.OUTPUT_DIRECTORY, HEADERS_OVERLAY_DIRECTORY, key, *args)
+
+    def test_prepareHeadersOverlay(self):
+        key = prepareHeadersOverlay(composePackage())
+
+        self.assertEqual(os.path.realpath('dummies/first_dummy.h'),
+                         os.path.realpath(self.__getOverlayPath(key, 'first_dummy.h')))
+        self.assertEqual(os.path.realpath('dummies/duplicated.h'),
+                         os.path.realpath(self.__getOverlayPath(key, 'duplicated.h')))
+        with open(self.__getOverlayPath(key, MANIFEST_FILENAME)) as fp:
+            manifest = loadJson(fp)
+        self.assertEqual(sorted(manifest), sorted(name for name in os.listdir(self.__getOverlayPath(key))
+                                                  if name != MANIFEST_FILENAME))
+
+    def test_prepareHeadersOverlay_sharedUponSameHeaders(self):
+        key = prepareHeadersOverlay(composePackage())
+        os.remove(self.__getOverlayPath(key, 'duplicated.h'))
+
+        self.assertEqual(key, prepareHeadersOverlay(composePackage(INCLUDES='. ./')))
+        self.assertFalse(os.path.exists(self.__getOverlayPath(key, 'duplicated.h')))
+
+    def test_prepareHeadersOverlay_uponDifferentPrecedence(self):
+        key = prepareHeadersOverlay(composePackage())
+        anotherKey = prepareHeadersOverlay(composePackage(DUMMY_INTERFACES='first_dummy.h'))
+
+        self.assertNotEqual(key, anotherKey)
+        self.assertEqual(os.path.realpath('dummies/duplicated.h'),
+                         os.path.realpath(self.__getOverlayPath(key, 'duplicated.h')))
+        self.assertEqual(os.path.realpath('duplicated.h'),
+                         os.path.realpath(self.__getOverlayPath(anotherKey, 'duplicated.h')))
+        self.assertEqual(sorted([key, anotherKey]),
+                         sorted(os.listdir(os.path.join(attributes.OUTPUT_DIRECTORY, HEADERS_OVERLAY_DIRECTORY))))
+
+    def test_prepareHeadersOverlay_onWindows(self):
+        self.isWindows.return_value = True
+
+        self.assertEqual('', prepareHeadersOverlay(composePackage()))
+        self.assertFalse(os.path.exists(attributes.OUTPUT_DIRECTORY))
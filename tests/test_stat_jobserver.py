@@ -0,0 +1,150 @@
+import asyncio
+import os
+import threading
+import unittest
+
+from services import isWindows, execute
+from stat_executor import createEventLoop
+from stat_jobserver import StatJobServer, connectJobServer, JOBSERVER_VARIABLE, JOBSERVER_MAKE_FLAGS
+from stat_scheduler import StatScheduler
+from tests.testing_tools import FileBasedTestCase
+
+FIFO_PATH = 'jobserver.fifo'
+TEST_MAKEFILE = 'jobserver.mak'
+TEST_MAKEFILE_CONTENT = 'all: a b c\na b c:\n\t@echo $@\n'
+
+
+def makeUponToken(makefile):
+    """
+    A job of a gear worker: it holds a token for the implicit slot of its make, which joins the jobserver
+    """
+    client = connectJobServer()
+    client.acquire()
+    try:
+        environ = dict(os.environ, MAKEFLAGS=client.makeFlags)
+        status, _ = execute(['make', '-f', makefile], beSilent=True, env=environ, pass_fds=client.descriptors)
+    finally:
+        client.release()
+    return makefile, status
+
+
+@unittest.skipIf(isWindows(), 'GNU make uses no named pipes for its jobserver on Windows')
+class TestStatJobServer(FileBasedTestCase):
+
+    def setUp(self):
+        self.loop = createEventLoop()
+
+    def tearDown(self):
+        self.loop.close()
+        if os.path.isfile(TEST_MAKEFILE):
+            os.remove(TEST_MAKEFILE)
+
+    def __acquireAsync(self, client):
+        try:
+            self.loop.run_until_complete(asyncio.wait_for(client.acquireAsync(), 0.1))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def test_jobServer_announcedToChildProcesses(self):
+        with StatJobServer(2, FIFO_PATH) as jobServer:
+            self.assertTrue(jobServer.isActive)
+            self.assertEqual(FIFO_PATH, os.environ[JOBSERVER_VARIABLE])
+            self.assertTrue(os.path.exists(FIFO_PATH))
+
+        self.assertFalse(jobServer.isActive)
+        self.assertNotIn(JOBSERVER_VARIABLE, os.environ)
+        self.assertFalse(os.path.exists(FIFO_PATH))
+        self.assertIsNone(connectJobServer())
+
+    def test_connectJobServer_singleClientPerProcess(self):
+        with StatJobServer(2, FIFO_PATH):
+            client = connectJobServer()
+
+            self.assertIs(client, connectJobServer())
+            self.assertEqual(JOBSERVER_MAKE_FLAGS.format(client.descriptors[0]), client.makeFlags)
+
+    def test_acquire_boundedBySlots(self):
+        with StatJobServer(2, FIFO_PATH):
+            client = connectJobServer()
+            client.acquire()
+
+            self.assertTrue(self.__acquireAsync(client))
+            self.assertFalse(self.__acquireAsync(client))
+            client.release()
+            self.assertTrue(self.__acquireAsync(client))
+
+    def test_makeJoinsJobServer(self):
+        with open(TEST_MAKEFILE, 'w') as fp:
+            fp.write(TEST_MAKEFILE_CONTENT)
+        with StatJobServer(2, FIFO_PATH):
+            client = connectJobServer()
+            client.acquire()
+            environ = dict(os.environ, MAKEFLAGS=client.makeFlags)
+
+            status, lines = execute(['make', '-f', TEST_MAKEFILE], beSilent=True, env=environ,
+                                    pass_fds=client.descriptors)
+            client.release()
+
+            self.assertEqual(0, status)
+            self.assertEqual(['a\n', 'b\n', 'c\n'], sorted(lines))
+            self.assertTrue(self.__acquireAsync(client))
+            self.assertTrue(self.__acquireAsync(client))
+            self.assertFalse(self.__acquireAsync(client))
+
+    def test_acquire_blocksDespiteNonBlockingMake(self):
+        with StatJobServer(1, FIFO_PATH):
+            client = connectJobServer()
+            client.acquire()
+            os.set_blocking(client.descriptors[0], False)  # As GNU make 4.3 does to the descriptors it inherits
+            errors = []
+
+            def acquire():
+                try:
+                    client.acquire()
+                except OSError as error:
+                    errors.append(error)
+
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join(0.1)
+            self.assertTrue(thread.is_alive())
+            client.release()
+            thread.join()
+
+            self.assertEqual([], errors)
+            self.assertFalse(self.__acquireAsync(client))
+
+    def test_gearWithMoreJobsThanSlots(self):
+        with open(TEST_MAKEFILE, 'w') as fp:
+            fp.write(TEST_MAKEFILE_CONTENT)
+        results = []
+        with StatJobServer(1, FIFO_PATH):
+            with StatScheduler(3) as scheduler:
+                for target in range(12):
+                    scheduler.submit(target, makeUponToken, TEST_MAKEFILE)
+                scheduler.drain(lambda target, result: results.append(result))
+
+        self.assertEqual([(TEST_MAKEFILE, 0)] * 12, results)
+
+    def test_acquireAsync_uponConsecutiveEventLoops(self):
+        async def contend(client):
+            await client.acquireAsync()
+            waiters = [asyncio.ensure_future(client.acquireAsync()) for _ in range(2)]
+            for _ in waiters:
+                await asyncio.sleep(0.01)
+                client.release()
+            await asyncio.gather(*waiters)
+            client.release()
+
+        with StatJobServer(1, FIFO_PATH):
+            client = connectJobServer()
+            for _ in range(2):  # As the sharded runs of consecutive test-packages do
+                loop = createEventLoop()
+                try:
+                    loop.run_until_complete(asyncio.wait_for(contend(client), 1))
+                finally:
+                    loop.close()
+
+            self.assertTrue(self.__acquireAsync(client))
+            self.assertFalse(self.__acquireAsync(client))
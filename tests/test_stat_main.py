@@ -1,3 +1,4 @@
+import os
 import sys
 from multiprocessing import Pool, freeze_support
 from time import sleep
@@ -5,12 +6,23 @@ from time import sleep
 import stat_attributes as attributes
 from ide_writer import IdeWorkspaceWriter
 from msvs_ide_writer import MsvsWriter
-from stat_main import StatMain, STAT_SUMMARY, STAT_OUTPUT_DELIMITER, STAT_SILENT_OUTPUT, StatException, \
-    runTestPackage, MAKEFILE_CORRUPTION, StatWarning
+from stat_main import StatMain, STAT_SUMMARY, STAT_OUTPUT_DELIMITER, STAT_SILENT_OUTPUT, STAT_ETA_OUTPUT, \
+    STAT_CHANGES_OUTPUT, StatException, runTestPackage, compileTestPackage, runTestExecutable, buildTestRuntime, \
+    compileSharedObjects, MAKEFILE_CORRUPTION, STAT_SHARED_BUILD_FAILURE, StatWarning, ASYNC_JOBS, \
+    runTestPackageAsync, compileTestPackageAsync, runTestExecutableAsync
+from stat_cache import StatCompilationCache
+from stat_catalog import StatCatalog
 from stat_makefile_generator import StatMakefileGenerator
+from stat_object_sharing import StatObjectSharing
+from stat_executor import createEventLoop
+from stat_scheduler import StatScheduler, RUN_STAGE
+from stat_timings import StatTimings
+from stat_unity import writeJUnitReport
 from stat_configuration import StatConfiguration
+from stat_dependencies import StatDependencyIndex
+from stat_jobserver import StatJobServer
 from stat_argument_parser import StatArgumentParser
-from tests_runner import TestsRunner, TestsRunnerException
+from tests_runner import TestsRunner, TestsRunnerException, TEST_FILTER_VARIABLE
 from services import writeJsonFile, remove, mkdir
 from tests.testing_tools import AdvancedTestCase, PropertyMock, call, Mock
 
@@ -20,7 +32,7 @@ SINGLE_PRODUCT = 'single_product'
 DEFAULT_PRODUCT = 'default_product'
 TARGET_PRODUCT = 'target_product'
 ALL_PRODUCT_FILES = {product: product + '.mak' for product in [SINGLE_PRODUCT, DEFAULT_PRODUCT, TARGET_PRODUCT]}
-MANY_PRODUCTS = ALL_PRODUCT_FILES.keys()
+MANY_PRODUCTS = list(ALL_PRODUCT_FILES.keys())
 MANY_PRODUCT_FILES = ALL_PRODUCT_FILES.values()
 
 SINGLE_MAKE_FILE = "simple.mak"
@@ -32,8 +44,35 @@ MAKE_ARGUMENTS = ['INSTALL_BY_COPY="TRUE"']
 LOG_LINES = ['First line', 'second line', '3rd line']
 
 FAKE_EXCEPTION_MESSAGE = 'This is exception emulator'
-FAKE_SUCCESSFUL_RUNS = [(filename, 'PASSED', '') for filename in MANY_MAKE_FILES] * len(MANY_PRODUCTS)
-FAKE_FAILED_RUNS = [(filename, 'FAILED', FAKE_EXCEPTION_MESSAGE) for filename in MANY_MAKE_FILES] * len(MANY_PRODUCTS)
+FAKE_TIMINGS = {'Compile': 2.5, 'Link': 0.5, 'Run': 1.0, 'ExitCode': 0}
+FAKE_SUCCESSFUL_RUNS = [(filename, 'PASSED', '', FAKE_TIMINGS, {}) for filename in MANY_MAKE_FILES] * len(MANY_PRODUCTS)
+FAKE_FAILED_RUNS = [(filename, 'FAILED', FAKE_EXCEPTION_MESSAGE, FAKE_TIMINGS, {})
+                    for filename in MANY_MAKE_FILES] * len(MANY_PRODUCTS)
+
+
+def parsed(makefile):
+    return 'parsed ' + makefile
+
+
+def generated(products):
+    """
+    :return: the expected calls of the makefile generator, where the last target becomes the default product
+    """
+    return [call(ALL_PRODUCT_FILES[products[-1]]), call().makeDefault()] + \
+        [item for product in products for item in [call(ALL_PRODUCT_FILES[product]), call().generate()]]
+
+
+class FakeCatalog(object):
+
+    def __init__(self, makefiles, failures=()):
+        self.packages = [makefile for makefile in makefiles if makefile not in failures]
+        self.failures = {makefile: FAKE_EXCEPTION_MESSAGE for makefile in makefiles if makefile in failures}
+
+    def __getitem__(self, makefile):
+        return parsed(makefile)
+
+    def __iter__(self):
+        return iter(self.packages)
 
 
 class TestStatMainBase(AdvancedTestCase):
@@ -43,25 +82,56 @@ class TestStatMainBase(AdvancedTestCase):
         self.mkdir = self.patch(CUT, mkdir.__name__)
         self.open = self.patchOpen()
         self.writeJsonFile = self.patch(CUT, writeJsonFile.__name__)
+        self.writeJUnitReport = self.patch(CUT, writeJUnitReport.__name__)
         self.ideWorkspaceWriter = self.patch(CUT, IdeWorkspaceWriter.__name__, autospec=True)
 
         self.statConfiguration = self.patch(CUT, StatConfiguration.__name__, autospec=True)
         configuration = self.statConfiguration.return_value
         type(configuration).defaultProduct = PropertyMock(return_value=DEFAULT_PRODUCT)
         type(configuration).products = PropertyMock(return_value=MANY_PRODUCTS)
-        configuration.isStale.return_value = True
 
-    def _patchArgumentParser(self, targetProducts, userMakefiles, processes=0):
+        self.statTimings = self.patch(CUT, StatTimings.__name__, autospec=True)
+        self.statTimings.return_value.estimate.return_value = 0
+        self.selectRuntimeBuilders = self.patch(CUT, 'selectRuntimeBuilders', return_value=[])
+        self.statObjectSharing = self.patch(CUT, StatObjectSharing.__name__, autospec=True)
+        type(self.statObjectSharing.return_value).owners = PropertyMock(return_value={})
+        self.statDependencyIndex = self.patch(CUT, StatDependencyIndex.__name__, autospec=True)
+        self.collectDependencies = self.patch(CUT, 'collectDependencies',
+                                              side_effect=lambda makefile, package: [makefile])
+        self.listChangedFiles = self.patch(CUT, 'listChangedFiles')
+        self.statJobServer = self.patch(CUT, StatJobServer.__name__, autospec=True)
+        self.getMakefileCache = self.patch(CUT, 'getMakefileCache')
+        self.statCompilationCache = self.patch(CUT, StatCompilationCache.__name__, autospec=True)
+        self.statCatalog = self.patch(CUT, StatCatalog.__name__, side_effect=FakeCatalog)
+
+    def _patchArgumentParser(self, targetProducts, userMakefiles, processes=0, runProcesses=0, changes=None,
+                             engine='pool', junit=None, testFilter=None):
         self.statArgumentParser = self.patch(CUT, StatArgumentParser.__name__, autospec=True)
         parser = self.statArgumentParser.return_value
         type(parser).targetProducts = PropertyMock(return_value=targetProducts)
         type(parser).makeFiles = PropertyMock(return_value=userMakefiles)
         type(parser).processes = PropertyMock(return_value=processes)
+        type(parser).jobSlots = PropertyMock(return_value=processes)
+        type(parser).runProcesses = PropertyMock(return_value=runProcesses)
+        type(parser).changes = PropertyMock(return_value=changes)
+        type(parser).engine = PropertyMock(return_value=engine)
+        type(parser).junit = PropertyMock(return_value=junit)
+        type(parser).testFilter = PropertyMock(return_value=testFilter)
         self.redundantArguments = PropertyMock(return_value=None)
         type(parser).redundant = self.redundantArguments
         return parser
 
-    def _mockParserResults(self, ide=None, shallExecute=True, shallBeVerbose=True, cleaningLevel=0):
+    def _assertPlannedUponCatalog(self, planner, makefiles, **kwargs):
+        """
+        Asserts the single call of the planner upon the catalog of the makefiles, i.e. upon their parsed objects
+        """
+        self.assertEqual(1, planner.call_count)
+        catalog, = planner.call_args[0]
+        self.assertEqual(makefiles, list(catalog))
+        self.assertEqual([parsed(makefile) for makefile in makefiles], [catalog[makefile] for makefile in catalog])
+        self.assertEqual(kwargs, planner.call_args[1])
+
+    def _mockParserResults(self, ide=None, shallExecute=True, shallBeVerbose=True, cleaningLevel=0, forceRun=False):
         parser = self.statArgumentParser.return_value
         parser.ide = ide
         shallCompile = ide is None
@@ -69,6 +139,7 @@ class TestStatMainBase(AdvancedTestCase):
         parser.shallRun.return_value = shallCompile and shallExecute
         parser.shallBeVerbose.return_value = shallCompile and shallBeVerbose
         parser.getRequestedCleaningLevel.return_value = cleaningLevel
+        parser.shallForceRun.return_value = forceRun
 
 
 class TestStatMain(TestStatMainBase):
@@ -84,19 +155,84 @@ class TestStatMain(TestStatMainBase):
         StatMain.run()
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(None)])
-        self.assertCalls(self.remove, [call(attributes.LOGS_DIRECTORY)])
+        self.assertCalls(self.remove, [call(attributes.LOGS_DIRECTORY), call(attributes.SLOWEST_TESTS_FILENAME)])
         self.assertCalls(self.mkdir, [call('logs'), call('output', exist_ok=True)])
         self.assertCalls(self.open, [])
 
-        expected = [call(ALL_PRODUCT_FILES[DEFAULT_PRODUCT]), call().generate()]
-        self.assertCalls(self.statMakefileGenerator, expected)
+        self.assertCalls(self.statMakefileGenerator, generated([DEFAULT_PRODUCT]))
 
-        expected = [call(makeFile, MAKE_ARGUMENTS, True, True) for makeFile in MANY_MAKE_FILES]
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
 
         expected = {makeFile: {"Status": "PASSED", "Info": ""} for makeFile in MANY_MAKE_FILES}
         self.assertCalls(self.writeJsonFile, [call(attributes.REPORT_FILENAME, {DEFAULT_PRODUCT: expected})])
 
+    def test_run_buildsRuntimeVariantsBeforePackages(self):
+        self._patchArgumentParser(targetProducts=[DEFAULT_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults()
+        self.selectRuntimeBuilders.return_value = [SINGLE_MAKE_FILE, 'full_example.mak']
+        buildTestRuntime = self.patch(CUT, 'buildTestRuntime', side_effect=lambda makefile, *args: (
+            makefile, 'PASSED', '', FAKE_TIMINGS, {}))
+        manager = Mock()
+        manager.attach_mock(buildTestRuntime, 'buildTestRuntime')
+        manager.attach_mock(self.runTestPackage, 'runTestPackage')
+
+        StatMain.run()
+
+        expected = [call.buildTestRuntime(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, parsed(SINGLE_MAKE_FILE)),
+                    call.buildTestRuntime('full_example.mak', MAKE_ARGUMENTS, True, parsed('full_example.mak'))] + \
+                   [call.runTestPackage(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, manager.mock_calls)
+
+    def test_run_reportsFailedRuntimeBuildBeforePackages(self):
+        self._patchArgumentParser(targetProducts=[DEFAULT_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults()
+        self.selectRuntimeBuilders.return_value = [SINGLE_MAKE_FILE]
+        info = 'The runtime of package "{0}" failed to build.'.format(SINGLE_MAKE_FILE)
+        self.patch(CUT, 'buildTestRuntime', return_value=(SINGLE_MAKE_FILE, 'FAILED', info, FAKE_TIMINGS, {}))
+        printMock = self.patchBuiltinObject('print')
+        manager = Mock()
+        manager.attach_mock(printMock, 'print')
+        manager.attach_mock(self.runTestPackage, 'runTestPackage')
+
+        try:
+            StatMain.run()
+        except StatException as exception:
+            self.assertEqual('The shared artifacts failed to build by:\n\t{0} ({1})'.format(SINGLE_MAKE_FILE,
+                                                                                            DEFAULT_PRODUCT),
+                             str(exception))
+        else:
+            self.fail('The failed build of the runtime shall fail the run')
+
+        failure = STAT_SHARED_BUILD_FAILURE.format(target=DEFAULT_PRODUCT, makefile=SINGLE_MAKE_FILE, status='FAILED',
+                                                   info=info)
+        self.assertEqual(call.print(failure), manager.mock_calls[0])
+        self.assertEqual(len(MANY_MAKE_FILES), self.runTestPackage.call_count)
+
+    def test_run_compilesSharedObjectsBeforePackages(self):
+        self._patchArgumentParser(targetProducts=[DEFAULT_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults()
+        sharing = self.statObjectSharing.return_value
+        type(sharing).owners = PropertyMock(return_value={SINGLE_MAKE_FILE: ['output/a.o', 'output/b.o']})
+        compileSharedObjects = self.patch(CUT, 'compileSharedObjects', side_effect=lambda makefile, *args: (
+            makefile, 'PASSED', '', FAKE_TIMINGS, {}))
+        manager = Mock()
+        manager.attach_mock(sharing, 'sharing')
+        manager.attach_mock(compileSharedObjects, 'compileSharedObjects')
+        manager.attach_mock(self.runTestPackage, 'runTestPackage')
+
+        StatMain.run()
+
+        self._assertPlannedUponCatalog(self.statObjectSharing, MANY_MAKE_FILES, shallShare=True)
+        expected = [call.sharing.unshare(False),
+                    call.compileSharedObjects(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, ['output/a.o', 'output/b.o'],
+                                              parsed(SINGLE_MAKE_FILE)),
+                    call.sharing.share()] + \
+                   [call.runTestPackage(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, manager.mock_calls)
+
     def test_run_withNoArgumentsForManyTargets(self):
         self._patchArgumentParser(targetProducts=MANY_PRODUCTS, userMakefiles=MANY_MAKE_FILES)
         self._mockParserResults()
@@ -105,12 +241,11 @@ class TestStatMain(TestStatMainBase):
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(None)])
 
-        expected = \
-            [item for product in MANY_PRODUCTS for item in [call(ALL_PRODUCT_FILES[product]), call().generate()]]
-        self.assertCalls(self.statMakefileGenerator, expected)
+        self.assertCalls(self.statMakefileGenerator, generated(MANY_PRODUCTS))
 
         expected = \
-            [call(makeFile, MAKE_ARGUMENTS, True, True) for makeFile in MANY_MAKE_FILES] * len(MANY_PRODUCT_FILES)
+            [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile))
+             for makeFile in MANY_MAKE_FILES] * len(MANY_PRODUCT_FILES)
         self.assertCalls(self.runTestPackage, expected)
 
         expected = {makeFile: {"Status": "PASSED", "Info": ""} for makeFile in MANY_MAKE_FILES}
@@ -120,17 +255,16 @@ class TestStatMain(TestStatMainBase):
     def test_run_withAllTargets(self):
         self._patchArgumentParser(targetProducts=MANY_PRODUCTS, userMakefiles=MANY_MAKE_FILES)
         self._mockParserResults()
-        self.statConfiguration.return_value.isStale.return_value = False
 
         StatMain.run(['-a'])
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(['-a'])])
 
-        expected = [item for product in MANY_PRODUCTS for item in [call(ALL_PRODUCT_FILES[product]), call().generate()]]
-        self.assertCalls(self.statMakefileGenerator, expected)
+        self.assertCalls(self.statMakefileGenerator, generated(MANY_PRODUCTS))
 
         expected = \
-            [call(makeFile, MAKE_ARGUMENTS, True, True) for makeFile in MANY_MAKE_FILES] * len(MANY_PRODUCT_FILES)
+            [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile))
+             for makeFile in MANY_MAKE_FILES] * len(MANY_PRODUCT_FILES)
         self.assertCalls(self.runTestPackage, expected)
 
     def test_run_withCompileOnlyArguments(self):
@@ -140,7 +274,16 @@ class TestStatMain(TestStatMainBase):
         StatMain.run(['-b'])
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(['-b'])])
-        expected = [call(makeFile, MAKE_ARGUMENTS, False, True) for makeFile in MANY_MAKE_FILES]
+        expected = [call(makeFile, MAKE_ARGUMENTS, False, True, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
+        self.assertCalls(self.runTestPackage, expected)
+
+    def test_run_withForcedRun(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults(forceRun=True)
+
+        StatMain.run(['-f'])
+
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, True, False, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
 
     def test_run_withSingleLevelOfCleaning(self):
@@ -151,8 +294,11 @@ class TestStatMain(TestStatMainBase):
 
         expectedCommandLine = MAKE_ARGUMENTS + [attributes.REBUILD_TARGET]
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(['-b', '-c'])])
-        expected = [call(makeFile, expectedCommandLine, False, True) for makeFile in MANY_MAKE_FILES]
+        expected = [call(makeFile, expectedCommandLine, False, True, True, parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
+        self._assertPlannedUponCatalog(self.statObjectSharing, MANY_MAKE_FILES, shallShare=True)
+        self.statObjectSharing.return_value.unshare.assert_called_once_with(True)
 
     def test_run_withDoubleLevelOfCleaning(self):
         self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
@@ -162,8 +308,10 @@ class TestStatMain(TestStatMainBase):
 
         expectedCommandLine = MAKE_ARGUMENTS + ['clean', attributes.REBUILD_TARGET]
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(['-b', '-cc'])])
-        expected = [call(makeFile, expectedCommandLine, False, True) for makeFile in MANY_MAKE_FILES]
+        expected = [call(makeFile, expectedCommandLine, False, True, True, parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
+        self._assertPlannedUponCatalog(self.statObjectSharing, MANY_MAKE_FILES, shallShare=False)
 
     def test_run_withSilentArguments(self):
         self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
@@ -173,13 +321,124 @@ class TestStatMain(TestStatMainBase):
         StatMain.run(['-s'])
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(['-s'])])
-        expected = [call(makeFile, MAKE_ARGUMENTS, True, False) for makeFile in MANY_MAKE_FILES]
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, False, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
         count = len(MANY_MAKE_FILES)
         expected = [call(STAT_SILENT_OUTPUT.format(makeFile, 'PASSED')) for makeFile in MANY_MAKE_FILES] + \
                    [call(STAT_OUTPUT_DELIMITER), call(STAT_SUMMARY.format(total=count, passed=count, failed=0))]
         self.assertCalls(printMock, expected)
 
+    def test_run_withHistoricalTimings(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults(shallBeVerbose=False)
+        estimates = dict(zip(MANY_MAKE_FILES, [30, 60, 90]))
+        timings = self.statTimings.return_value
+        timings.estimate.side_effect = lambda target, makefile: estimates[makefile]
+        printMock = self.patchBuiltinObject('print')
+
+        StatMain.run(['-s'])
+
+        expected = [call(STAT_SILENT_OUTPUT.format(MANY_MAKE_FILES[0], 'PASSED')),
+                    call(STAT_ETA_OUTPUT.format(eta='2:30', makefile=MANY_MAKE_FILES[2], target=TARGET_PRODUCT)),
+                    call(STAT_SILENT_OUTPUT.format(MANY_MAKE_FILES[1], 'PASSED')),
+                    call(STAT_ETA_OUTPUT.format(eta='1:30', makefile=MANY_MAKE_FILES[2], target=TARGET_PRODUCT)),
+                    call(STAT_SILENT_OUTPUT.format(MANY_MAKE_FILES[2], 'PASSED'))]
+        self.assertEqual(expected, printMock.call_args_list[:len(expected)])
+        expected = [call.__setitem__((TARGET_PRODUCT, makeFile), FAKE_TIMINGS) for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, [item for item in timings.mock_calls if item[0] == '__setitem__'])
+        timings.write.assert_called_once_with()
+        self.getMakefileCache.return_value.write.assert_called_once_with()
+
+    def test_run_evictsCompilationCacheOncePerRun(self):
+        self._patchArgumentParser(targetProducts=MANY_PRODUCTS, userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults(shallBeVerbose=False)
+        self.statConfiguration.return_value.__getitem__.side_effect = {'CACHE_DIR': attributes.CACHE_DIRECTORY}.get
+        self.patchBuiltinObject('print')
+
+        StatMain.run(['-a'])
+
+        self.statCompilationCache.assert_called_once_with(attributes.CACHE_DIRECTORY)
+        self.statCompilationCache.return_value.evict.assert_called_once_with()
+
+    def test_run_withoutCompilationCache(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults(shallBeVerbose=False)
+        self.statConfiguration.return_value.__getitem__.side_effect = {'CACHE_DIR': ''}.get
+        self.patchBuiltinObject('print')
+
+        StatMain.run()
+
+        self.statCompilationCache.assert_not_called()
+
+    def test_run_recordsDependenciesOfPassedPackages(self):
+        self.runTestPackage.side_effect = [(MANY_MAKE_FILES[0], 'FAILED', FAKE_EXCEPTION_MESSAGE, FAKE_TIMINGS, {})] + \
+                                          FAKE_SUCCESSFUL_RUNS[1:]
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults()
+
+        self.assertRaises(StatException, StatMain.run)
+
+        dependencies = self.statDependencyIndex.return_value
+        expected = [call.__delitem__((TARGET_PRODUCT, MANY_MAKE_FILES[0]))] + \
+                   [call.__setitem__((TARGET_PRODUCT, makeFile), [makeFile]) for makeFile in MANY_MAKE_FILES[1:]] + \
+                   [call.write()]
+        self.assertEqual(expected, dependencies.mock_calls)
+
+    def test_run_withoutRecordingDependenciesUponCompileOnly(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults(shallExecute=False)
+
+        StatMain.run(['-b'])
+
+        self.assertCalls(self.collectDependencies, [])
+
+    def test_run_withTestFilter(self):
+        self.patchDict(os.environ)
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, testFilter='Test_A*')
+        self._mockParserResults()
+
+        StatMain.run(['-t', 'Test_A*'])
+
+        self.assertEqual('Test_A*', os.environ[TEST_FILTER_VARIABLE])
+        self.assertEqual(len(MANY_MAKE_FILES), self.runTestPackage.call_count)
+        self.assertCalls(self.collectDependencies, [])
+        timings = self.statTimings.return_value
+        self.assertEqual([], [item for item in timings.mock_calls if item[0] == '__setitem__'])
+
+    def test_run_uponChangedFilesSinceLastRun(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, changes='')
+        self._mockParserResults()
+        dependencies = self.statDependencyIndex.return_value
+        dependencies.isAffected.side_effect = lambda target, makefile, changedFiles: makefile == SINGLE_MAKE_FILE
+        printMock = self.patchBuiltinObject('print')
+
+        StatMain.run(['--changed'])
+
+        expected = [call(TARGET_PRODUCT, makeFile, None) for makeFile in MANY_MAKE_FILES]
+        self.assertCalls(dependencies.isAffected, expected)
+        self.assertCalls(self.runTestPackage,
+                         [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, True, True, parsed(SINGLE_MAKE_FILE))])
+        self.assertCalls(self.listChangedFiles, [])
+        expected = STAT_CHANGES_OUTPUT.format(affected=1, total=len(MANY_MAKE_FILES), target=TARGET_PRODUCT)
+        self.assertEqual(call(expected), printMock.call_args_list[0])
+
+    def test_run_uponChangedFilesSinceGitReference(self):
+        self._patchArgumentParser(targetProducts=[DEFAULT_PRODUCT, TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES,
+                                  changes='HEAD~1')
+        self._mockParserResults()
+        self.listChangedFiles.return_value = {'/abs/path/to/changed.h'}
+        dependencies = self.statDependencyIndex.return_value
+        dependencies.isAffected.side_effect = lambda target, makefile, changedFiles: target == TARGET_PRODUCT
+        self.patchBuiltinObject('print')
+
+        StatMain.run(['--changed-since', 'HEAD~1'])
+
+        self.assertCalls(self.listChangedFiles, [call('HEAD~1')])
+        self.assertEqual(call(DEFAULT_PRODUCT, MANY_MAKE_FILES[0], {'/abs/path/to/changed.h'}),
+                         dependencies.isAffected.call_args_list[0])
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
+        self.assertCalls(self.runTestPackage, expected)
+
     def test_run_withRedundantArguments(self):
         self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
         self._mockParserResults(shallExecute=False)
@@ -193,8 +452,59 @@ class TestStatMain(TestStatMainBase):
             self.fail("The framework shall fire a STAT Warning.")
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(['-b'])])
-        expected = [call(makeFile, MAKE_ARGUMENTS, False, True) for makeFile in MANY_MAKE_FILES]
+        expected = [call(makeFile, MAKE_ARGUMENTS, False, True, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
+        self.assertCalls(self.runTestPackage, expected)
+
+    def test_run_reportsCorruptedMakefilesAhead(self):
+        self.statCatalog.side_effect = lambda makefiles: FakeCatalog(makefiles, failures=[SINGLE_MAKE_FILE])
+        self.runTestPackage.side_effect = [run for run in FAKE_SUCCESSFUL_RUNS if run[0] != SINGLE_MAKE_FILE]
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults()
+        self.patchBuiltinObject('print')
+
+        self.assertRaises(StatException, StatMain.run)
+
+        self.assertCalls(self.statCatalog, [call(MANY_MAKE_FILES)])
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES if makeFile != SINGLE_MAKE_FILE]
         self.assertCalls(self.runTestPackage, expected)
+        self._assertPlannedUponCatalog(self.selectRuntimeBuilders, [MANY_MAKE_FILES[0], MANY_MAKE_FILES[2]])
+        report = self.writeJsonFile.call_args[0][1][TARGET_PRODUCT]
+        self.assertEqual({"Status": "CRASHED",
+                          "Info": MAKEFILE_CORRUPTION.format(filename=SINGLE_MAKE_FILE,
+                                                             exception=FAKE_EXCEPTION_MESSAGE)},
+                         report[SINGLE_MAKE_FILE])
+
+    def test_run_reportsIntoJUnitFileUponRequest(self):
+        tests = [dict(Name='Test_Some', File='tests.c', Line=7, Status='PASSED', Message='')]
+        self.runTestPackage.side_effect = [(filename, 'PASSED', '', FAKE_TIMINGS, dict(Tests=tests))
+                                           for filename in MANY_MAKE_FILES]
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, junit='junit.xml')
+        self._mockParserResults()
+        self.patchBuiltinObject('print')
+
+        StatMain.run()
+
+        expected = {makeFile: {"Status": "PASSED", "Info": "", "Tests": tests} for makeFile in MANY_MAKE_FILES}
+        self.assertCalls(self.writeJsonFile, [call(attributes.REPORT_FILENAME, {TARGET_PRODUCT: expected})])
+        self.assertCalls(self.writeJUnitReport, [call('junit.xml', {TARGET_PRODUCT: expected})])
+
+    def test_run_ranksSlowestTests(self):
+        tests = [dict(Name='Test_Some', File='tests.c', Line=7, Status='PASSED', Message='', Duration=0.5)]
+        self.runTestPackage.side_effect = [(filename, 'PASSED', '', FAKE_TIMINGS, dict(Tests=tests) if index else {})
+                                           for index, filename in enumerate(MANY_MAKE_FILES)]
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
+        self._mockParserResults()
+        self.patchBuiltinObject('print')
+
+        StatMain.run()
+
+        reportCall, rankingCall = self.writeJsonFile.call_args_list
+        self.assertEqual({TARGET_PRODUCT}, set(reportCall[0][1]))
+        self.assertEqual(call(attributes.SLOWEST_TESTS_FILENAME,
+                              [dict(Product=TARGET_PRODUCT, Package=MANY_MAKE_FILES[1], Name='Test_Some', Duration=0.5,
+                                    Share=0.5)]), rankingCall)
+        self.assertNotIn(call(attributes.SLOWEST_TESTS_FILENAME), self.remove.call_args_list)
 
     def test_run_withException(self):
         self.runTestPackage.side_effect = FAKE_FAILED_RUNS
@@ -209,10 +519,10 @@ class TestStatMain(TestStatMainBase):
         else:
             self.fail("The framework shall fire a STAT Exception.")
 
-        expected = [call(makeFile, MAKE_ARGUMENTS, True, True) for makeFile in MANY_MAKE_FILES]
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
 
-        self.assertCalls(self.remove, [call(attributes.LOGS_DIRECTORY)])
+        self.assertCalls(self.remove, [call(attributes.LOGS_DIRECTORY), call(attributes.SLOWEST_TESTS_FILENAME)])
         self.assertCalls(self.mkdir,
                          [call(attributes.LOGS_DIRECTORY), call(attributes.OUTPUT_DIRECTORY, exist_ok=True)])
 
@@ -223,19 +533,17 @@ class TestStatMain(TestStatMainBase):
         expected = [call(STAT_OUTPUT_DELIMITER), call(STAT_SUMMARY.format(total=count, passed=0, failed=count))]
         self.assertCalls(printMock, expected)
 
-    def test_run_withNonStaleConfigurationSameProduct(self):
-        self.statConfiguration.return_value.isStale.return_value = False
+    def test_run_withDefaultProduct(self):
         self._patchArgumentParser(targetProducts=[DEFAULT_PRODUCT], userMakefiles=MANY_MAKE_FILES)
         self._mockParserResults()
 
         StatMain.run()
 
-        self.assertCalls(self.statMakefileGenerator, [])
-        expected = [call(makeFile, MAKE_ARGUMENTS, True, True) for makeFile in MANY_MAKE_FILES]
+        self.assertCalls(self.statMakefileGenerator, generated([DEFAULT_PRODUCT]))
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
 
-    def test_run_withNonStaleConfigurationAnotherProduct(self):
-        self.statConfiguration.return_value.isStale.return_value = False
+    def test_run_withAnotherProduct(self):
         self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES)
         self._mockParserResults()
         arguments = ['-p', DEFAULT_PRODUCT]
@@ -243,8 +551,8 @@ class TestStatMain(TestStatMainBase):
         StatMain.run(arguments)
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(arguments)])
-        self.assertCalls(self.statMakefileGenerator, [call(ALL_PRODUCT_FILES[TARGET_PRODUCT]), call().generate()])
-        expected = [call(makeFile, MAKE_ARGUMENTS, True, True) for makeFile in MANY_MAKE_FILES]
+        self.assertCalls(self.statMakefileGenerator, generated([TARGET_PRODUCT]))
+        expected = [call(makeFile, MAKE_ARGUMENTS, True, True, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
         self.assertCalls(self.runTestPackage, expected)
 
     def test_run_uponVisualStudioRequest(self):
@@ -254,7 +562,9 @@ class TestStatMain(TestStatMainBase):
         StatMain.run(['-vs'])
 
         self.statArgumentParser.assert_has_calls([call(MANY_PRODUCTS, DEFAULT_PRODUCT), call().parse(['-vs'])])
-        self.assertCalls(self.statMakefileGenerator, [call(ALL_PRODUCT_FILES[TARGET_PRODUCT]), call().generate()])
+        expected = [call(ALL_PRODUCT_FILES[TARGET_PRODUCT]), call().generate(),
+                    call(ALL_PRODUCT_FILES[TARGET_PRODUCT]), call().makeDefault()]
+        self.assertCalls(self.statMakefileGenerator, expected)
         self.assertCalls(self.runTestPackage, [])
         self.assertCalls(self.ideWorkspaceWriter, [call(MsvsWriter.IDE, SINGLE_MAKE_FILE), call().write()])
 
@@ -262,9 +572,9 @@ class TestStatMain(TestStatMainBase):
 TEST_INFO_FORMAT = 'args:"{0}"; run:"{1}"; verbose:"{2}"'
 
 
-def runFake(makefile, makeArguments, shallRun, shallBeVerbose):
+def runFake(makefile, makeArguments, shallRun, shallBeVerbose, shallReplay=False):
     sleep(0.5)
-    return makefile, 'PASSED', TEST_INFO_FORMAT.format(makeArguments, shallRun, shallBeVerbose)
+    return makefile, 'PASSED', TEST_INFO_FORMAT.format(makeArguments, shallRun, shallBeVerbose), {}, {}
 
 
 class TestStatMainGear(TestStatMainBase):
@@ -296,11 +606,11 @@ class TestStatMainGear(TestStatMainBase):
 
         self._patchArgumentParser(targetProducts=MANY_PRODUCTS, userMakefiles=MANY_MAKE_FILES, processes=expectedCores)
         self._mockParserResults(shallBeVerbose=False)
-        self.patch(CUT, Pool.__name__, new=spyPool)
+        self.patch(StatScheduler.__module__, Pool.__name__, new=spyPool)
 
         StatMain.run(['-g'])
 
-        self.assertEqual([expectedCores]*len(MANY_PRODUCTS), receivedCores)
+        self.assertEqual([expectedCores], receivedCores)
 
         expected = {makeFile: {"Status": "PASSED", "Info": TEST_INFO_FORMAT.format(MAKE_ARGUMENTS, True, False)}
                     for makeFile in MANY_MAKE_FILES}
@@ -308,6 +618,207 @@ class TestStatMainGear(TestStatMainBase):
         self.assertCalls(self.writeJsonFile, [call(attributes.REPORT_FILENAME, expected)])
 
 
+class TestStatMainScheduling(TestStatMainBase):
+
+    def setUp(self):
+        self.setupCommon()
+        self.statScheduler = self.patch(CUT, StatScheduler.__name__, autospec=True)
+        self.scheduler = self.statScheduler.return_value.__enter__.return_value
+
+    def _drainSubmissions(self, handled=None, statuses=None):
+        """
+        Fakes the draining of the scheduler, which completes the jobs in the order of their submission, including the
+        ones submitted by the result handler
+        """
+        def fakeDrain(handleResult):
+            submissions = self.scheduler.submit.call_args_list
+            index = 0
+            while index < len(submissions):
+                target, function, makefile = submissions[index][0][:3]
+                index += 1
+                if handled is not None:
+                    handled.append((target, function, makefile, len(submissions)))
+                status = (statuses or {}).get(function, 'PASSED')
+                handleResult(target, (makefile, status, '', FAKE_TIMINGS, {}))
+        self.scheduler.drain.side_effect = fakeDrain
+
+    def test_run_sharesSingleSchedulerAmongTargets(self):
+        expectedCores = 4
+        self._patchArgumentParser(targetProducts=MANY_PRODUCTS, userMakefiles=MANY_MAKE_FILES, processes=expectedCores)
+        self._mockParserResults(shallBeVerbose=False)
+        self.patchBuiltinObject('print')
+        self._drainSubmissions()
+
+        StatMain.run(['-g', '-a'])
+
+        estimate = self.statTimings.return_value.estimate
+        self.assertEqual([call(expectedCores, estimate, 0, 'pool')], self.statScheduler.call_args_list)
+        self.assertEqual([call(expectedCores)], self.statJobServer.call_args_list)
+        self.statJobServer.return_value.__exit__.assert_called_once_with(None, None, None)
+        expected = [call(product, runTestPackage, makeFile, MAKE_ARGUMENTS, True, False, True, parsed(makeFile))
+                    for product in MANY_PRODUCTS for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, self.scheduler.submit.call_args_list)
+        self.assertEqual(1, self.scheduler.drain.call_count)
+        self.statScheduler.return_value.__exit__.assert_called_once_with(None, None, None)
+
+        expected = {makeFile: {"Status": "PASSED", "Info": ""} for makeFile in MANY_MAKE_FILES}
+        expected = {product: expected for product in MANY_PRODUCTS}
+        self.assertCalls(self.writeJsonFile, [call(attributes.REPORT_FILENAME, expected)])
+
+    def test_run_buildsRuntimeVariantsAhead(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, processes=4)
+        self._mockParserResults(shallBeVerbose=False)
+        self.patchBuiltinObject('print')
+        self.selectRuntimeBuilders.return_value = [SINGLE_MAKE_FILE]
+        handled = []
+        self._drainSubmissions(handled)
+
+        StatMain.run(['-g', '4'])
+
+        self._assertPlannedUponCatalog(self.selectRuntimeBuilders, MANY_MAKE_FILES)
+        self.assertEqual(1, self.scheduler.drain.call_count)
+        self.assertEqual(call(TARGET_PRODUCT, buildTestRuntime, SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False,
+                              parsed(SINGLE_MAKE_FILE)),
+                         self.scheduler.submit.call_args_list[0])
+        # The packages are submitted only once the runtime is built
+        expected = [(TARGET_PRODUCT, buildTestRuntime, SINGLE_MAKE_FILE, 1)] + \
+                   [(TARGET_PRODUCT, runTestPackage, makeFile, 1 + len(MANY_MAKE_FILES))
+                    for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, handled)
+
+    def test_run_reportsFailedRuntimeBuildInParallel(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, processes=4)
+        self._mockParserResults(shallBeVerbose=False)
+        printMock = self.patchBuiltinObject('print')
+        self.selectRuntimeBuilders.return_value = [SINGLE_MAKE_FILE]
+        self._drainSubmissions(statuses={buildTestRuntime: 'FAILED'})
+
+        try:
+            StatMain.run(['-g', '4'])
+        except StatException as exception:
+            self.assertEqual('The shared artifacts failed to build by:\n\t{0} ({1})'.format(SINGLE_MAKE_FILE,
+                                                                                            TARGET_PRODUCT),
+                             str(exception))
+        else:
+            self.fail('The failed build of the runtime shall fail the run')
+
+        failure = STAT_SHARED_BUILD_FAILURE.format(target=TARGET_PRODUCT, makefile=SINGLE_MAKE_FILE, status='FAILED',
+                                                   info='')
+        self.assertIn(call(failure), printMock.call_args_list)
+        self.assertEqual(1 + len(MANY_MAKE_FILES), self.scheduler.submit.call_count)
+
+    def test_run_sharesObjectsUponGear(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, processes=4)
+        self._mockParserResults(shallBeVerbose=False, cleaningLevel=1)
+        self.patchBuiltinObject('print')
+        sharing = self.statObjectSharing.return_value
+        type(sharing).owners = PropertyMock(return_value={SINGLE_MAKE_FILE: ['output/a.o']})
+        handled = []
+        self._drainSubmissions(handled)
+
+        StatMain.run(['-g', '4'])
+
+        self._assertPlannedUponCatalog(self.statObjectSharing, MANY_MAKE_FILES, shallShare=True)
+        # The objects of the owners are compiled anew ahead, though not by a rebuild of the whole owner package
+        self.assertEqual([call.unshare(True), call.share()],
+                         [item for item in sharing.mock_calls if item[0] in ('share', 'unshare')])
+        self.assertEqual(call(TARGET_PRODUCT, compileSharedObjects, SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False,
+                              ['output/a.o'], parsed(SINGLE_MAKE_FILE)),
+                         self.scheduler.submit.call_args_list[0])
+        expected = [call(TARGET_PRODUCT, runTestPackage, makeFile, MAKE_ARGUMENTS + [attributes.REBUILD_TARGET], True,
+                         False, True, parsed(makeFile)) for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, self.scheduler.submit.call_args_list[1:])
+
+    def test_run_schedulesTargetsAsSingleSetOfJobs(self):
+        self._patchArgumentParser(targetProducts=[DEFAULT_PRODUCT, TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES,
+                                  processes=4)
+        self._mockParserResults(shallBeVerbose=False)
+        self.patchBuiltinObject('print')
+        self.selectRuntimeBuilders.side_effect = [[SINGLE_MAKE_FILE], []]
+        sharing = self.statObjectSharing.return_value
+        handled = []
+        self._drainSubmissions(handled)
+
+        StatMain.run(['-g', '4', '-p', DEFAULT_PRODUCT, '-p', TARGET_PRODUCT])
+
+        self.assertEqual(1, self.scheduler.drain.call_count)
+        # The packages of a target without shared artifacts don't wait for the ones of the other targets
+        expected = [call(DEFAULT_PRODUCT, buildTestRuntime, SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False,
+                         parsed(SINGLE_MAKE_FILE))] + \
+                   [call(target, runTestPackage, makeFile, MAKE_ARGUMENTS, True, False, True, parsed(makeFile))
+                    for target in [TARGET_PRODUCT, DEFAULT_PRODUCT] for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, self.scheduler.submit.call_args_list)
+        self.assertEqual((DEFAULT_PRODUCT, buildTestRuntime, SINGLE_MAKE_FILE, 1 + len(MANY_MAKE_FILES)), handled[0])
+        self.assertEqual([call.unshare(False), call.unshare(False), call.share(), call.share()],
+                         [item for item in sharing.mock_calls if item[0] in ('share', 'unshare')])
+
+        expected = {makeFile: {"Status": "PASSED", "Info": ""} for makeFile in MANY_MAKE_FILES}
+        expected = {product: expected for product in [DEFAULT_PRODUCT, TARGET_PRODUCT]}
+        self.assertCalls(self.writeJsonFile, [call(attributes.REPORT_FILENAME, expected)])
+
+    def test_run_pipelinesExecutionIntoRunStage(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, processes=4,
+                                  runProcesses=2)
+        self._mockParserResults(shallBeVerbose=False)
+        self.patchBuiltinObject('print')
+        compileTimings = {'Compile': 2.0, 'Link': 1.0, 'ExitCode': 0}
+        runTimings = {'Run': 3.0, 'ExitCode': 0}
+        compileStatistics = {'Cache': {'Hits': 1, 'Misses': 2}}
+
+        def fakeDrain(handleResult):
+            for makefile in MANY_MAKE_FILES:
+                status = 'FAILED' if makefile == SINGLE_MAKE_FILE else 'PASSED'
+                handleResult(TARGET_PRODUCT, (makefile, status, '', compileTimings, compileStatistics))
+            for _call in self.scheduler.submitToStage.call_args_list:
+                stage, target, _, makefile = _call[0][:4]
+                handleResult(target, (makefile, 'PASSED', '', runTimings, {}))
+        self.scheduler.drain.side_effect = fakeDrain
+
+        self.assertRaises(StatException, StatMain.run, ['-g', '4', '-rg', '2'])
+
+        estimate = self.statTimings.return_value.estimate
+        self.assertEqual([call(4, estimate, 2, 'pool')], self.statScheduler.call_args_list)
+        expected = [call(TARGET_PRODUCT, compileTestPackage, makeFile, MAKE_ARGUMENTS, False, parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, self.scheduler.submit.call_args_list)
+        expected = [call(RUN_STAGE, TARGET_PRODUCT, runTestExecutable, makeFile, MAKE_ARGUMENTS, False, True,
+                         parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES if makeFile != SINGLE_MAKE_FILE]
+        self.assertEqual(expected, self.scheduler.submitToStage.call_args_list)
+
+        expected = {makeFile: dict(compileStatistics, Status="PASSED", Info="") for makeFile in MANY_MAKE_FILES}
+        expected[SINGLE_MAKE_FILE]['Status'] = 'FAILED'
+        self.assertCalls(self.writeJsonFile, [call(attributes.REPORT_FILENAME, {TARGET_PRODUCT: expected})])
+        timings = self.statTimings.return_value
+        expected = [call.__setitem__((TARGET_PRODUCT, SINGLE_MAKE_FILE), compileTimings)] + \
+                   [call.__setitem__((TARGET_PRODUCT, makeFile), dict(compileTimings, **runTimings))
+                    for makeFile in MANY_MAKE_FILES if makeFile != SINGLE_MAKE_FILE]
+        self.assertEqual(expected, [item for item in timings.mock_calls if item[0] == '__setitem__'])
+
+    def test_run_submitsCoroutinesUponAsyncEngine(self):
+        self._patchArgumentParser(targetProducts=[TARGET_PRODUCT], userMakefiles=MANY_MAKE_FILES, processes=4,
+                                  runProcesses=2, engine='async')
+        self._mockParserResults(shallBeVerbose=False)
+        self.patchBuiltinObject('print')
+
+        def fakeDrain(handleResult):
+            for makefile in MANY_MAKE_FILES:
+                handleResult(TARGET_PRODUCT, (makefile, 'PASSED', '', FAKE_TIMINGS, {}))
+        self.scheduler.drain.side_effect = fakeDrain
+
+        StatMain.run(['-g', '4', '-rg', '2', '--engine', 'async'])
+
+        estimate = self.statTimings.return_value.estimate
+        self.assertEqual([call(4, estimate, 2, 'async')], self.statScheduler.call_args_list)
+        expected = [call(TARGET_PRODUCT, compileTestPackageAsync, makeFile, MAKE_ARGUMENTS, False, parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, self.scheduler.submit.call_args_list)
+        expected = [call(RUN_STAGE, TARGET_PRODUCT, runTestExecutableAsync, makeFile, MAKE_ARGUMENTS, False, True,
+                         parsed(makeFile))
+                    for makeFile in MANY_MAKE_FILES]
+        self.assertEqual(expected, self.scheduler.submitToStage.call_args_list)
+
+
 class TestRunTestPackage(AdvancedTestCase):
 
     def setUp(self):
@@ -316,23 +827,100 @@ class TestRunTestPackage(AdvancedTestCase):
     def test_runTestPackage_fullTestRun(self):
         results = runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallRun=True, shallBeVerbose=True)
 
-        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True), call().compile(), call().run()]
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, None), call().compile(), call().run(),
+                    call().compressLog()]
+        self.assertCalls(self.testsRunner, expected)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
+
+    def test_runTestPackage_withReplay(self):
+        runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallRun=True, shallBeVerbose=True, shallReplay=True)
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, None), call().compile(), call().runOrReplay(),
+                    call().compressLog()]
+        self.assertCalls(self.testsRunner, expected)
+
+    def test_runTestPackage_withParsedPackage(self):
+        runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, True, False, parsed(SINGLE_MAKE_FILE))
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, parsed(SINGLE_MAKE_FILE)), call().compile(),
+                    call().run(), call().compressLog()]
         self.assertCalls(self.testsRunner, expected)
-        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', ''), results)
 
     def test_runTestPackage_compileOnly(self):
         results = runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallRun=False, shallBeVerbose=True)
 
-        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True), call().compile()]
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, None), call().compile(), call().compressLog()]
         self.assertCalls(self.testsRunner, expected)
-        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', ''), results)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
 
     def test_runTestPackage_withSilentArguments(self):
         results = runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallRun=True, shallBeVerbose=False)
 
-        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False), call().compile(), call().run()]
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False, None), call().compile(), call().run(),
+                    call().compressLog()]
         self.assertCalls(self.testsRunner, expected)
-        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', ''), results)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
+
+    def test_compileTestPackage(self):
+        results = compileTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallBeVerbose=False)
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False, None), call().compile()]
+        self.assertCalls(self.testsRunner, expected)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
+
+    def test_buildTestRuntime(self):
+        results = buildTestRuntime(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallBeVerbose=False)
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False, None), call().buildRuntime()]
+        self.assertCalls(self.testsRunner, expected)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
+
+    def test_compileSharedObjects(self):
+        objectFiles = ['output/product/simple/obj/a.o', 'output/product/simple/obj/b.o']
+
+        results = compileSharedObjects(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False, objectFiles)
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS + objectFiles, False, None), call().compile()]
+        self.assertCalls(self.testsRunner, expected)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
+
+    def test_runTestExecutable(self):
+        results = runTestExecutable(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallBeVerbose=False)
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False, None), call().run(), call().compressLog()]
+        self.assertCalls(self.testsRunner, expected)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
+
+    def test_runTestExecutable_withReplay(self):
+        runTestExecutable(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallBeVerbose=False, shallReplay=True)
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False, None), call().runOrReplay(),
+                    call().compressLog()]
+        self.assertCalls(self.testsRunner, expected)
+
+    def test_runTestPackageAsync(self):
+        loop = createEventLoop()
+        try:
+            results = loop.run_until_complete(runTestPackageAsync(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, False, True))
+        finally:
+            loop.close()
+
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, False, None), call().compileAsync(),
+                    call().runOrReplayAsync(), call().compressLogAsync()]
+        self.assertCalls(self.testsRunner, expected)
+        self.assertEqual((SINGLE_MAKE_FILE, 'PASSED', '', self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
+
+    def test_asyncJobsMatchTheirCounterparts(self):
+        for job, asyncJob in ASYNC_JOBS.items():
+            self.assertEqual(job.__name__ + 'Async', asyncJob.__name__)
 
     def test_runTestPackage_withTestException(self):
         exception = "Fake exception to test error-handling"
@@ -344,10 +932,11 @@ class TestRunTestPackage(AdvancedTestCase):
 
         results = runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallRun=True, shallBeVerbose=True)
 
-        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True),
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, None),
                     call().compile(), call().run(), call().writeLog(exception)]
         self.assertCalls(self.testsRunner, expected)
-        self.assertEqual((SINGLE_MAKE_FILE, 'FAILED', exception), results)
+        self.assertEqual((SINGLE_MAKE_FILE, 'FAILED', exception, self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
 
     def test_runTestPackage_withAbnormalTestException(self):
         exception = "This is abnormal exception emulation"
@@ -359,10 +948,11 @@ class TestRunTestPackage(AdvancedTestCase):
 
         results = runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallRun=True, shallBeVerbose=True)
 
-        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True),
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, None),
                     call().compile(), call().run(), call().writeLog(exception)]
         self.assertCalls(self.testsRunner, expected)
-        self.assertEqual((SINGLE_MAKE_FILE, 'CRASHED', exception), results)
+        self.assertEqual((SINGLE_MAKE_FILE, 'CRASHED', exception, self.testsRunner.return_value.timings,
+                          self.testsRunner.return_value.statistics), results)
 
     def test_runTestPackage_withExceptionUponInitialization(self):
         exception = Exception("This is an emulation of exception upon makefile processing")
@@ -374,10 +964,11 @@ class TestRunTestPackage(AdvancedTestCase):
 
         results = runTestPackage(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, shallRun=True, shallBeVerbose=True)
 
-        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True)]
+        expected = [call(SINGLE_MAKE_FILE, MAKE_ARGUMENTS, True, None)]
         self.assertCalls(self.testsRunner, expected)
         self.assertEqual((SINGLE_MAKE_FILE, 'CRASHED',
-                          MAKEFILE_CORRUPTION.format(filename=SINGLE_MAKE_FILE, exception=str(exception))), results)
+                          MAKEFILE_CORRUPTION.format(filename=SINGLE_MAKE_FILE, exception=str(exception)), {}, {}),
+                         results)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,141 @@
+import os
+from collections import OrderedDict
+
+import stat_attributes as attributes
+from stat_makefile import StatMakefile
+from stat_object_sharing import StatObjectSharing, SHARED_OBJECTS_LISTING
+from tests.testing_tools import FileBasedTestCase, FakeMakefile, writeFile
+
+CUT = StatObjectSharing.__module__
+
+PRODUCT = 'product'
+OBJECT_EXTENSION = '.obj' if os.name == 'nt' else '.o'
+SOURCES = 'file_in_root.c ../lib/src/stat.c'
+
+
+def composePackage(name, **variables):
+    return FakeMakefile(name, **dict({StatMakefile.DEFINES: 'PROJECT_EXAMPLE', StatMakefile.SOURCES: SOURCES,
+                                      'STAT_SOURCES': '../lib/src/stat.c'}, **variables))
+
+
+def composeObjectPath(package, source):
+    return '/'.join([attributes.OUTPUT_DIRECTORY, PRODUCT, package, 'obj', source + OBJECT_EXTENSION])
+
+
+class TestStatObjectSharing(FileBasedTestCase):
+
+    def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+        self.runtimeVariant = self.patch(CUT, 'calculateRuntimeVariant', return_value='')
+
+    def tearDown(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    @staticmethod
+    def addPackages(*makefiles):
+        return OrderedDict((makefile.name + '.mak', makefile) for makefile in makefiles)
+
+    def test_owners_perIdenticalCompilations(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second', DEFINES=' PROJECT_EXAMPLE '),
+                                    composePackage('third', DEFINES='ANOTHER_PROJECT'),
+                                    composePackage('fourth', SOURCES='file_in_root.c'))
+
+        sharing = StatObjectSharing(OrderedDict(packages, **{'failing.mak': {}}))
+
+        expected = {'first.mak': [composeObjectPath('first', 'file_in_root'), composeObjectPath('first', 'stat')]}
+        self.assertEqual(expected, sharing.owners)
+
+    def test_owners_uponDifferentHeaders(self):
+        packages = self.addPackages(composePackage('first'),
+                                    composePackage('second', DUMMY_INTERFACES='second_dummy.h'),
+                                    composePackage('third', INCLUDES='./ dummies'))
+
+        self.assertEqual({}, StatObjectSharing(packages).owners)
+
+    def test_owners_excludeSharedRuntime(self):
+        self.runtimeVariant.return_value = '0123456789abcdef'
+        packages = self.addPackages(composePackage('first'), composePackage('second'))
+
+        sharing = StatObjectSharing(packages)
+
+        self.assertEqual({'first.mak': [composeObjectPath('first', 'file_in_root')]}, sharing.owners)
+
+    def test_owners_withoutSharing(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second'))
+
+        self.assertEqual({}, StatObjectSharing(packages, shallShare=False).owners)
+
+    def test_share(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second'), composePackage('third'))
+        ownedObject = composeObjectPath('first', 'file_in_root')
+        writeFile(ownedObject)
+
+        StatObjectSharing(packages).share()
+
+        for package in ['second', 'third']:
+            self.assertTrue(os.path.samefile(ownedObject, composeObjectPath(package, 'file_in_root')))
+        self.assertFalse(os.path.exists(composeObjectPath('second', 'stat')))
+
+    def test_share_listsSharedObjectsPerPackage(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second'),
+                                    composePackage('third', DEFINES=''))
+        writeFile(composeObjectPath('first', 'file_in_root'))
+
+        StatObjectSharing(packages).share()
+
+        for package in ['first', 'second']:
+            listing = '/'.join([attributes.OUTPUT_DIRECTORY, PRODUCT, package, 'obj', SHARED_OBJECTS_LISTING])
+            with open(listing) as fp:
+                self.assertEqual('STAT_SHARED_OBJECTS:={0}\n'.format(composeObjectPath(package, 'file_in_root')),
+                                 fp.read())
+        self.assertFalse(os.path.exists('/'.join([attributes.OUTPUT_DIRECTORY, PRODUCT, 'third'])))
+
+    def test_unshare_breaksStaleLinks(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second'))
+        writeFile(composeObjectPath('first', 'file_in_root'))
+        StatObjectSharing(packages).share()
+        packages['second.mak'] = composePackage('second', DEFINES='ANOTHER_PROJECT')
+
+        StatObjectSharing(packages).unshare()
+
+        objectFiles = [composeObjectPath(package, 'file_in_root') for package in ['first', 'second']]
+        self.assertEqual([1], [os.stat(path).st_nlink for path in objectFiles if os.path.exists(path)])
+
+    def test_unshare_keepsOwnedObjects(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second'), composePackage('third'))
+        writeFile(composeObjectPath('first', 'file_in_root'))
+        StatObjectSharing(packages).share()
+        packages['third.mak'] = composePackage('third', DEFINES='ANOTHER_PROJECT')
+
+        StatObjectSharing(packages).unshare()
+
+        self.assertTrue(os.path.isfile(composeObjectPath('first', 'file_in_root')))
+        for package in ['second', 'third']:
+            self.assertFalse(os.path.exists(composeObjectPath(package, 'file_in_root')))
+
+    def test_unshare_removesOwnedObjectsUponRebuild(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second'))
+        writeFile(composeObjectPath('first', 'file_in_root'))
+        writeFile(composeObjectPath('first', 'stat'))
+        StatObjectSharing(packages).share()
+
+        StatObjectSharing(packages).unshare(shallRebuild=True)
+
+        self.assertFalse(os.path.exists(composeObjectPath('first', 'file_in_root')))
+        self.assertFalse(os.path.exists(composeObjectPath('first', 'stat')))
+        self.assertEqual(1, os.stat(composeObjectPath('second', 'file_in_root')).st_nlink)
+        for package in ['first', 'second']:
+            self.assertFalse(os.path.exists('/'.join([attributes.OUTPUT_DIRECTORY, PRODUCT, package, 'obj',
+                                                      SHARED_OBJECTS_LISTING])))
+
+    def test_unshare_withoutSharing(self):
+        packages = self.addPackages(composePackage('first'), composePackage('second'))
+        writeFile(composeObjectPath('first', 'file_in_root'))
+        writeFile(composeObjectPath('first', 'stat'))
+        StatObjectSharing(packages).share()
+
+        StatObjectSharing(packages, shallShare=False).unshare()
+
+        objectFiles = [composeObjectPath(package, source) for package in ['first', 'second']
+                       for source in ['file_in_root', 'stat']]
+        self.assertEqual([1, 1], [os.stat(path).st_nlink for path in objectFiles if os.path.exists(path)])
@@ -0,0 +1,55 @@
+import os
+from collections import OrderedDict
+
+from stat_makefile import StatMakefile
+from stat_runtime import calculateRuntimeVariant, selectRuntimeBuilders
+from tests.testing_tools import FileBasedTestCase
+
+CUT = calculateRuntimeVariant.__module__
+
+SHADOWING_DIRECTORY = 'shadowing'
+
+
+def composeMakefile(defines='PROJECT_EXAMPLE UNITY_INCLUDE_CONFIG_H STAT', includes='./ ../unity ../lib/inc',
+                    interfaces='first_dummy.h'):
+    return {StatMakefile.DEFINES: defines, StatMakefile.INCLUDES: includes, StatMakefile.INTERFACES: interfaces}
+
+
+class TestStatRuntime(FileBasedTestCase):
+
+    def tearDown(self):
+        self.rmtree(SHADOWING_DIRECTORY)
+
+    def test_calculateRuntimeVariant_perDefinitions(self):
+        variant = calculateRuntimeVariant(composeMakefile())
+
+        self.assertEqual(16, len(variant))
+        self.assertEqual(variant, calculateRuntimeVariant(composeMakefile(includes='./')))
+        spacedDefines = ' PROJECT_EXAMPLE  UNITY_INCLUDE_CONFIG_H  STAT '
+        self.assertEqual(variant, calculateRuntimeVariant(composeMakefile(spacedDefines)))
+        self.assertNotEqual(variant, calculateRuntimeVariant(composeMakefile('STAT_MOCK=8192 UNITY_INCLUDE_CONFIG_H')))
+
+    def test_calculateRuntimeVariant_uponShadowingInterface(self):
+        self.assertEqual('', calculateRuntimeVariant(composeMakefile(interfaces='first_dummy.h stat_mock.h')))
+
+    def test_calculateRuntimeVariant_uponShadowingIncludeDirectory(self):
+        os.mkdir(SHADOWING_DIRECTORY)
+        with open(os.path.join(SHADOWING_DIRECTORY, 'unity_config.h'), 'w') as fp:
+            fp.write('#define UNITY_EXCLUDE_FLOAT\n')
+
+        self.assertEqual('', calculateRuntimeVariant(composeMakefile(includes='./ shadowing ../unity')))
+
+    def test_selectRuntimeBuilders(self):
+        variants = {'first.mak': 'A', 'second.mak': 'B', 'third.mak': 'A', 'shadowing.mak': ''}
+        self.patch(CUT, calculateRuntimeVariant.__name__, side_effect=lambda makefile: variants[makefile])
+        catalog = OrderedDict((makefile, makefile) for makefile in ['first.mak', 'shadowing.mak', 'second.mak',
+                                                                    'third.mak'])
+
+        builders = selectRuntimeBuilders(catalog)
+
+        self.assertEqual(['first.mak', 'second.mak'], builders)
+
+    def test_selectRuntimeBuilders_skipsFailingPackages(self):
+        catalog = OrderedDict([('failing.mak', {}), ('simple.mak', composeMakefile())])
+
+        self.assertEqual(['simple.mak'], selectRuntimeBuilders(catalog))
@@ -0,0 +1,211 @@
+import asyncio
+
+from stat_scheduler import StatScheduler, StatSchedulerException, RUN_STAGE, ASYNC_ENGINE
+from tests.testing_tools import AdvancedTestCase
+
+CUT = StatScheduler.__module__
+
+ESTIMATES = {('first', 'short.mak'): 1, ('first', 'long.mak'): 30, ('first', 'medium.mak'): 10,
+             ('second', 'short.mak'): 2, ('second', 'long.mak'): 40, ('second', 'medium.mak'): 20}
+
+
+class FakePool(object):
+    instances = []
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.applied = []
+        self.isClosed = self.isTerminated = self.isJoined = False
+        FakePool.instances.append(self)
+
+    def apply_async(self, function, args, callback, error_callback):
+        self.applied.append(args)
+        try:
+            result = function(*args)
+        except Exception as exception:
+            error_callback(exception)
+        else:
+            callback(result)
+
+    def close(self):
+        self.isClosed = True
+
+    def terminate(self):
+        self.isTerminated = True
+
+    def join(self):
+        self.isJoined = True
+
+
+def fakeJob(makefile, *args):
+    return makefile, 'PASSED', ''
+
+
+def failingJob(makefile, *args):
+    raise RuntimeError('Emulation of broken worker for {0}'.format(makefile))
+
+
+class TestStatScheduler(AdvancedTestCase):
+
+    def setUp(self):
+        FakePool.instances = []
+        self.pool = self.patch(CUT, 'Pool', new=FakePool)
+        self.results = []
+
+    def handleResult(self, target, result):
+        self.results.append((target, result[0]))
+
+    def test_drain_dispatchesLongestFirst(self):
+        scheduler = StatScheduler(1, estimate=lambda target, makefile: ESTIMATES[target, makefile])
+        for makefile in ['short.mak', 'long.mak', 'medium.mak']:
+            scheduler.submit('first', fakeJob, makefile, 'arg')
+
+        scheduler.drain(self.handleResult)
+
+        self.assertEqual([('first', 'long.mak'), ('first', 'medium.mak'), ('first', 'short.mak')], self.results)
+        self.assertEqual([('long.mak', 'arg'), ('medium.mak', 'arg'), ('short.mak', 'arg')],
+                         FakePool.instances[0].applied)
+
+    def test_drain_keepsSubmissionOrderWithoutEstimates(self):
+        scheduler = StatScheduler(2)
+        for makefile in ['short.mak', 'long.mak', 'medium.mak']:
+            scheduler.submit('first', fakeJob, makefile)
+
+        scheduler.drain(self.handleResult)
+
+        self.assertEqual([('first', 'short.mak'), ('first', 'long.mak'), ('first', 'medium.mak')], self.results)
+
+    def test_drain_stealsFromOtherTargetsWhenOwnQueueIsEmpty(self):
+        scheduler = StatScheduler(1, estimate=lambda target, makefile: ESTIMATES[target, makefile])
+        scheduler.submit('first', fakeJob, 'long.mak')
+        for makefile in ['short.mak', 'long.mak', 'medium.mak']:
+            scheduler.submit('second', fakeJob, makefile)
+
+        scheduler.drain(self.handleResult)
+
+        expected = [('second', 'long.mak'), ('second', 'medium.mak'), ('second', 'short.mak'), ('first', 'long.mak')]
+        self.assertEqual(expected, self.results)
+        self.assertEqual(0, scheduler.pending)
+
+    def test_drain_reusesSinglePoolAcrossDrains(self):
+        with StatScheduler(3) as scheduler:
+            scheduler.submit('first', fakeJob, 'short.mak')
+            scheduler.drain(self.handleResult)
+            scheduler.submit('second', fakeJob, 'short.mak')
+            scheduler.drain(self.handleResult)
+
+        self.assertEqual(1, len(FakePool.instances))
+        self.assertEqual(3, FakePool.instances[0].processes)
+        self.assertTrue(FakePool.instances[0].isClosed)
+        self.assertTrue(FakePool.instances[0].isJoined)
+        self.assertEqual([('first', 'short.mak'), ('second', 'short.mak')], self.results)
+
+    def test_drain_uponWorkerFailure(self):
+        try:
+            with StatScheduler(2) as scheduler:
+                scheduler.submit('first', failingJob, 'broken.mak')
+                scheduler.drain(self.handleResult)
+        except StatSchedulerException as exception:
+            self.assertIn('broken.mak', str(exception))
+        else:
+            self.fail('The scheduler was supposed to fire an exception!')
+
+        self.assertTrue(FakePool.instances[0].isTerminated)
+        self.assertFalse(FakePool.instances[0].isClosed)
+
+    def test_drain_pipelinesJobsIntoRunStage(self):
+        def handleResult(target, result):
+            makefile, status = result[:2]
+            self.results.append((target, makefile, status))
+            if status == 'PASSED':
+                scheduler.submitToStage(RUN_STAGE, target, runJob, makefile)
+
+        def runJob(makefile):
+            return makefile, 'EXECUTED', ''
+
+        with StatScheduler(2, runProcesses=1) as scheduler:
+            for makefile in ['short.mak', 'long.mak']:
+                scheduler.submit('first', fakeJob, makefile)
+            scheduler.drain(handleResult)
+
+        self.assertEqual([2, 1], [pool.processes for pool in FakePool.instances])
+        self.assertEqual([('short.mak',), ('long.mak',)], FakePool.instances[0].applied)
+        self.assertEqual([('short.mak',), ('long.mak',)], FakePool.instances[1].applied)
+        self.assertEqual(['PASSED', 'PASSED', 'EXECUTED', 'EXECUTED'], [result[2] for result in self.results])
+        self.assertTrue(all(pool.isClosed for pool in FakePool.instances))
+        self.assertEqual(0, scheduler.pending)
+
+    def test_drain_runsStagesInSharedPoolByDefault(self):
+        def handleResult(target, result):
+            self.results.append(result[0])
+            if result[1] == 'PASSED':
+                scheduler.submitToStage(RUN_STAGE, target, runJob, result[0])
+
+        def runJob(makefile):
+            return makefile, 'EXECUTED', ''
+
+        with StatScheduler(2) as scheduler:
+            scheduler.submit('first', fakeJob, 'short.mak')
+            scheduler.drain(handleResult)
+
+        self.assertEqual(1, len(FakePool.instances))
+        self.assertEqual([('short.mak',), ('short.mak',)], FakePool.instances[0].applied)
+        self.assertEqual(['short.mak', 'short.mak'], self.results)
+
+    def test_close_withoutAnyJob(self):
+        with StatScheduler(2) as scheduler:
+            scheduler.drain(self.handleResult)
+
+        self.assertEqual([], FakePool.instances)
+        self.assertEqual([], self.results)
+
+
+class TestStatSchedulerAsyncEngine(AdvancedTestCase):
+
+    def setUp(self):
+        self.results = []
+        self.inFlight = []
+        self.maxInFlight = 0
+
+    def handleResult(self, target, result):
+        self.results.append((target, result[0]))
+
+    async def asyncJob(self, makefile, delay):
+        self.inFlight.append(makefile)
+        self.maxInFlight = max(self.maxInFlight, len(self.inFlight))
+        await asyncio.sleep(delay)
+        self.inFlight.remove(makefile)
+        return makefile, 'PASSED', ''
+
+    async def failingAsyncJob(self, makefile):
+        raise RuntimeError('Emulation of broken job for {0}'.format(makefile))
+
+    def test_drain_gatesJobsInFlight(self):
+        with StatScheduler(2, engine=ASYNC_ENGINE) as scheduler:
+            for makefile, delay in [('slow.mak', 0.05), ('quick.mak', 0), ('medium.mak', 0.01)]:
+                scheduler.submit('first', self.asyncJob, makefile, delay)
+            scheduler.drain(self.handleResult)
+
+        self.assertEqual(2, self.maxInFlight)
+        self.assertEqual([('first', 'quick.mak'), ('first', 'medium.mak'), ('first', 'slow.mak')], self.results)
+
+    def test_drain_pipelinesJobsIntoRunStage(self):
+        def handleResult(target, result):
+            self.handleResult(target, result)
+            if result[0] == 'compile.mak':
+                scheduler.submitToStage(RUN_STAGE, target, self.asyncJob, 'run.mak', 0)
+
+        with StatScheduler(2, runProcesses=1, engine=ASYNC_ENGINE) as scheduler:
+            scheduler.submit('first', self.asyncJob, 'compile.mak', 0)
+            scheduler.drain(handleResult)
+
+        self.assertEqual([('first', 'compile.mak'), ('first', 'run.mak')], self.results)
+
+    def test_drain_uponJobFailure(self):
+        with self.assertRaises(StatSchedulerException):
+            with StatScheduler(2, engine=ASYNC_ENGINE) as scheduler:
+                scheduler.submit('first', self.failingAsyncJob, 'broken.mak')
+                scheduler.submit('first', self.asyncJob, 'slow.mak', 10)
+                scheduler.drain(self.handleResult)
+
+        self.assertEqual([], self.results)
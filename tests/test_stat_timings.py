@@ -0,0 +1,111 @@
+import os
+from json import load as loadJson
+
+import stat_attributes as attributes
+from services import mkdir, writeJsonFile
+from stat_timings import StatTimings, StatEta, formatDuration
+from tests.testing_tools import FileBasedTestCase, AdvancedTestCase
+
+PREVIOUS_TIMINGS = {
+    'product': {
+        'simple.mak': {'Compile': 4.0, 'Link': 1.0, 'Run': 5.0, 'ExitCode': 0},
+        'full_example.mak': {'Compile': 10.0, 'Link': 2.0, 'Run': 18.0, 'ExitCode': 1},
+    }
+}
+
+
+class TestStatTimings(FileBasedTestCase):
+
+    def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    def tearDown(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    def __writePreviousTimings(self, timings=None):
+        mkdir(attributes.OUTPUT_DIRECTORY, exist_ok=True)
+        writeJsonFile(attributes.TIMINGS_FILENAME, PREVIOUS_TIMINGS if timings is None else timings)
+
+    def test_estimate_withoutHistory(self):
+        timings = StatTimings()
+
+        self.assertEqual({}, timings['product', 'simple.mak'])
+        self.assertEqual(0, timings.estimate('product', 'simple.mak'))
+
+    def test_estimate_withHistory(self):
+        self.__writePreviousTimings()
+        timings = StatTimings()
+
+        self.assertEqual(PREVIOUS_TIMINGS['product']['simple.mak'], timings['product', 'simple.mak'])
+        self.assertEqual(10.0, timings.estimate('product', 'simple.mak'))
+        self.assertEqual(30.0, timings.estimate('product', 'full_example.mak'))
+        self.assertEqual(20.0, timings.estimate('product', 'never_measured.mak'))
+        self.assertEqual(0, timings.estimate('another_product', 'simple.mak'))
+
+    def test_read_uponCorruptedFile(self):
+        mkdir(attributes.OUTPUT_DIRECTORY, exist_ok=True)
+        with open(attributes.TIMINGS_FILENAME, 'w') as fp:
+            fp.write('{ broken')
+
+        self.assertEqual(0, StatTimings().estimate('product', 'simple.mak'))
+
+    def test_write_accumulatesAcrossRuns(self):
+        self.__writePreviousTimings()
+        timings = StatTimings()
+        timings['product', 'simple.mak'] = {'Compile': 3.0, 'Link': 0.5, 'ExitCode': 2}
+        timings['product', 'full_example.mak'] = {}
+        timings['another_product', 'simple.mak'] = {'Compile': 1.0, 'Link': 0.25, 'Run': 0.5, 'ExitCode': 0}
+
+        timings.write()
+
+        with open(attributes.TIMINGS_FILENAME) as fp:
+            written = loadJson(fp)
+        expected = {
+            'product': {
+                'simple.mak': {'Compile': 3.0, 'Link': 0.5, 'Run': 5.0, 'ExitCode': 2},
+                'full_example.mak': PREVIOUS_TIMINGS['product']['full_example.mak'],
+            },
+            'another_product': {'simple.mak': {'Compile': 1.0, 'Link': 0.25, 'Run': 0.5, 'ExitCode': 0}}
+        }
+        self.assertEqual(expected, written)
+        self.assertTrue(os.path.isfile(attributes.TIMINGS_FILENAME))
+
+
+class TestStatEta(AdvancedTestCase):
+
+    def setUp(self):
+        self.estimates = {('first', 'a.mak'): 40, ('first', 'b.mak'): 20, ('second', 'a.mak'): 30,
+                          ('second', 'b.mak'): 10}
+
+    def __createEta(self, workers):
+        eta = StatEta(lambda target, makefile: self.estimates[target, makefile], workers)
+        for target, makefile in sorted(self.estimates):
+            eta.add(target, makefile)
+        return eta
+
+    def test_remaining_withSingleWorker(self):
+        eta = self.__createEta(workers=0)
+
+        self.assertEqual(100, eta.remaining)
+        self.assertEqual(('first', 'a.mak'), eta.criticalPath)
+
+    def test_remaining_isBoundByCriticalPath(self):
+        eta = self.__createEta(workers=4)
+
+        self.assertEqual(40, eta.remaining)
+        eta.complete('first', 'a.mak')
+        self.assertEqual(30, eta.remaining)
+        self.assertEqual(('second', 'a.mak'), eta.criticalPath)
+
+    def test_remaining_uponCompletion(self):
+        eta = self.__createEta(workers=2)
+        for target, makefile in list(self.estimates):
+            eta.complete(target, makefile)
+
+        self.assertEqual(0, eta.remaining)
+        self.assertIsNone(eta.criticalPath)
+
+    def test_formatDuration(self):
+        self.assertEqual('0:00', formatDuration(0))
+        self.assertEqual('1:05', formatDuration(64.6))
+        self.assertEqual('125:00', formatDuration(7500))
@@ -0,0 +1,171 @@
+import os
+from xml.dom.minidom import parse as parseXml
+
+import stat_attributes as attributes
+from stat_unity import UnityResultParser, writeJUnitReport, rankSlowestTests, mergeShardResults
+from tests.testing_tools import FileBasedTestCase, AdvancedTestCase
+
+JUNIT_FILENAME = os.path.join(attributes.OUTPUT_DIRECTORY, 'junit.xml')
+FIRST_TEST = dict(Name='Test_First', File='tests.c', Line=10, Status='PASSED', Message='', Duration=0.012)
+SECOND_TEST = dict(Name='Test_Second', File='tests.c', Line=20, Status='FAILED', Message='Expected 1 Was 2')
+THIRD_TEST = dict(Name='Test_Third', File='tests.c', Line=30, Status='IGNORED', Message='Not yet')
+
+
+class TestUnityResultParser(AdvancedTestCase):
+
+    def setUp(self):
+        self.parser = UnityResultParser()
+
+    def __parse(self, *lines):
+        for line in lines:
+            self.parser.parseLine(line)
+        return self.parser.results
+
+    def test_parseLine_uponStatuses(self):
+        results = self.__parse('tests.c:10:Test_Passing:PASS\n', 'tests.c:20:Test_Failing:FAIL: Expected 1 Was 2\n',
+                               'tests.c:30:Test_Ignored:IGNORE\n', 'tests.c:40:Test_Skipped:IGNORE: Not yet\n')
+
+        self.assertEqual([dict(Name='Test_Passing', File='tests.c', Line=10, Status='PASSED', Message=''),
+                          dict(Name='Test_Failing', File='tests.c', Line=20, Status='FAILED',
+                               Message='Expected 1 Was 2'),
+                          dict(Name='Test_Ignored', File='tests.c', Line=30, Status='IGNORED', Message=''),
+                          dict(Name='Test_Skipped', File='tests.c', Line=40, Status='IGNORED', Message='Not yet')],
+                         results)
+
+    def test_parseLine_uponExecutionTime(self):
+        results = self.__parse('tests.c:10:Test_Passing:PASS (12 ms)\n',
+                               'tests.c:20:Test_Failing:FAIL: Expected 1 Was 2 (1500 ms)\n')
+
+        self.assertEqual([dict(Name='Test_Passing', File='tests.c', Line=10, Status='PASSED', Message='',
+                               Duration=0.012),
+                          dict(Name='Test_Failing', File='tests.c', Line=20, Status='FAILED',
+                               Message='Expected 1 Was 2', Duration=1.5)], results)
+
+    def test_parseLine_uponWindowsPathsAndColors(self):
+        results = self.__parse('C:\\project\\tests.c:10:Test_Passing:\x1b[42mPASS\x1b[00m\r\n')
+
+        self.assertEqual([dict(Name='Test_Passing', File='C:\\project\\tests.c', Line=10, Status='PASSED',
+                               Message='')], results)
+
+    def test_parseLine_uponTimingRecords(self):
+        results = self.__parse('STAT_TIMING:Test_Passing:1250\n', 'tests.c:10:Test_Passing:PASS (1 ms)\n',
+                               'tests.c:20:Test_Failing:FAIL: Expected 1 Was 2\n', 'STAT_TIMING:Test_Failing:7\n',
+                               '\n', 'tests.c:30:Test_Untimed:PASS\n')
+
+        self.assertEqual([dict(Name='Test_Passing', File='tests.c', Line=10, Status='PASSED', Message='',
+                               Duration=0.00125),
+                          dict(Name='Test_Failing', File='tests.c', Line=20, Status='FAILED',
+                               Message='Expected 1 Was 2', Duration=0.000007),
+                          dict(Name='Test_Untimed', File='tests.c', Line=30, Status='PASSED', Message='')], results)
+
+    def test_parseLine_uponIndexRecords(self):
+        results = self.__parse('STAT_INDEX:Test_Passing:4\n', 'tests.c:10:Test_Passing:PASS\n',
+                               'tests.c:20:Test_Unnumbered:PASS\n')
+
+        self.assertEqual([dict(Name='Test_Passing', File='tests.c', Line=10, Status='PASSED', Message='', Index=4),
+                          dict(Name='Test_Unnumbered', File='tests.c', Line=20, Status='PASSED', Message='')], results)
+
+    def test_parseLine_ignoresOtherLines(self):
+        results = self.__parse('Building...\n', '-----------------------\n', '3 Tests 1 Failures 0 Ignored\n',
+                               'FAIL\n', 'tests.c:Test_NoLine:PASS\n')
+
+        self.assertEqual([], results)
+
+
+class TestMergeShardResults(AdvancedTestCase):
+
+    def test_mergeShardResults(self):
+        shards = [[dict(Name='Test_A', Index=0), dict(Name='Test_D', Index=3)], [dict(Name='Test_B', Index=1)],
+                  [dict(Name='Test_C', Index=2)]]
+
+        self.assertEqual([dict(Name='Test_A'), dict(Name='Test_B'), dict(Name='Test_C'), dict(Name='Test_D')],
+                         mergeShardResults(shards))
+
+    def test_mergeShardResults_uponUnevenShards(self):
+        """
+        The filter skipped most of the tests of the first shard, while the second shard crashed after its first test
+        """
+        shards = [[dict(Name='Test_G', Index=6)], [dict(Name='Test_B', Index=1)],
+                  [dict(Name='Test_C', Index=2), dict(Name='Test_F', Index=5), dict(Name='Test_I', Index=8)]]
+
+        self.assertEqual(['Test_B', 'Test_C', 'Test_F', 'Test_G', 'Test_I'],
+                         [test['Name'] for test in mergeShardResults(shards)])
+
+    def test_mergeShardResults_uponUnnumberedResults(self):
+        shards = [[dict(Name='Test_X'), dict(Name='Test_C', Index=2)], [dict(Name='Test_A', Index=0)]]
+
+        self.assertEqual(['Test_A', 'Test_C', 'Test_X'], [test['Name'] for test in mergeShardResults(shards)])
+
+    def test_mergeShardResults_withoutResults(self):
+        self.assertEqual([], mergeShardResults([[], []]))
+        self.assertEqual([], mergeShardResults([]))
+
+
+class TestRankSlowestTests(AdvancedTestCase):
+
+    def test_rankSlowestTests(self):
+        report = {'product': {'simple.mak': dict(Status='PASSED', Info='', Tests=[
+            dict(Name='Test_Fast', Duration=1.0), dict(Name='Test_Slow', Duration=6.0), dict(Name='Test_Untimed')]),
+            'other.mak': dict(Status='PASSED', Info='', Tests=[dict(Name='Test_Medium', Duration=3.0)])},
+            'derived': {'simple.mak': dict(Status='CRASHED', Info='')}}
+
+        self.assertEqual([dict(Product='product', Package='simple.mak', Name='Test_Slow', Duration=6.0, Share=0.6)],
+                         rankSlowestTests(report))
+        self.assertEqual(['Test_Slow', 'Test_Medium', 'Test_Fast'],
+                         [test['Name'] for test in rankSlowestTests(report, share=1.0)])
+        self.assertEqual(['Test_Slow', 'Test_Medium'],
+                         [test['Name'] for test in rankSlowestTests(report, share=1.0, limit=2)])
+
+    def test_rankSlowestTests_withoutMeasuredTests(self):
+        report = {'product': {'simple.mak': dict(Status='PASSED', Info='', Tests=[dict(Name='Test_Untimed')])}}
+
+        self.assertEqual([], rankSlowestTests(report))
+
+
+class TestWriteJUnitReport(FileBasedTestCase):
+
+    def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    def tearDown(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+
+    def __writeAndParse(self, report):
+        writeJUnitReport(JUNIT_FILENAME, report)
+        return parseXml(JUNIT_FILENAME).documentElement
+
+    def test_writeJUnitReport(self):
+        tests = [FIRST_TEST, SECOND_TEST, THIRD_TEST]
+        report = {'product': {'simple.mak': dict(Status='FAILED', Info='', Tests=tests)}}
+
+        root = self.__writeAndParse(report)
+
+        self.assertEqual(('3', '1', '0'), (root.getAttribute('tests'), root.getAttribute('failures'),
+                                           root.getAttribute('errors')))
+        suite, = root.getElementsByTagName('testsuite')
+        self.assertEqual('product/simple.mak', suite.getAttribute('name'))
+        self.assertEqual(('3', '1', '0', '1'), tuple(suite.getAttribute(name)
+                                                     for name in ('tests', 'failures', 'errors', 'skipped')))
+        cases = suite.getElementsByTagName('testcase')
+        self.assertEqual(['Test_First', 'Test_Second', 'Test_Third'], [case.getAttribute('name') for case in cases])
+        self.assertEqual({'product.simple'}, {case.getAttribute('classname') for case in cases})
+        self.assertEqual(['0.012000', '', ''], [case.getAttribute('time') for case in cases])
+        self.assertEqual('Expected 1 Was 2', cases[1].getElementsByTagName('failure')[0].getAttribute('message'))
+        self.assertEqual('Not yet', cases[2].getElementsByTagName('skipped')[0].getAttribute('message'))
+
+    def test_writeJUnitReport_uponPackageWithoutTests(self):
+        report = {'product': {'simple.mak': dict(Status='PASSED', Info=''),
+                              'broken.mak': dict(Status='CRASHED', Info='Makefile is corrupted')}}
+
+        root = self.__writeAndParse(report)
+
+        self.assertEqual(('1', '0', '1'), (root.getAttribute('tests'), root.getAttribute('failures'),
+                                           root.getAttribute('errors')))
+        broken, simple = root.getElementsByTagName('testsuite')
+        self.assertEqual('product/simple.mak', simple.getAttribute('name'))
+        self.assertEqual([], simple.getElementsByTagName('testcase'))
+        case, = broken.getElementsByTagName('testcase')
+        self.assertEqual('broken.mak', case.getAttribute('name'))
+        error, = case.getElementsByTagName('error')
+        self.assertEqual('CRASHED', error.getAttribute('message'))
+        self.assertEqual('Makefile is corrupted', error.firstChild.data)
@@ -1,10 +1,15 @@
+import gzip
 import os
+import sys
+from unittest.mock import ANY
 
 import stat_attributes as attributes
-from services import execute, remove, formatMakeCommand
+from services import remove, formatMakeCommand, mkdir
+from stat_executor import createEventLoop, OUTPUT_TAIL_SIZE
 from stat_makefile import StatMakefile
-from tests_runner import TestsRunner, TestsRunnerException
-from tests.testing_tools import FileBasedTestCase, call
+from tests_runner import TestsRunner, TestsRunnerException, COMPRESS_LOGS_VARIABLE, RESULT_OUTPUT_EXTENSION, \
+    SHARD_VARIABLE
+from tests.testing_tools import FileBasedTestCase, call, Mock
 
 CUT = TestsRunner.__module__
 
@@ -13,6 +18,8 @@ TEST_MAKEFILE_NAME = 'simple.mak'
 TEST_PACKAGE_NAME = TEST_MAKEFILE_NAME[:-4]
 TEST_LOGFILE_NAME = TEST_PACKAGE_NAME + '.log'
 TEST_ENVIRONMENT_MOCK = dict(user='Arseniy Aharonov', path='/the/right/way', encoding='UTF-8')
+TEST_RUNTIME_VARIANT = '0123456789abcdef'
+TEST_HEADERS_OVERLAY = 'fedcba9876543210'
 
 
 def createRunner(isVerbose=True):
@@ -26,46 +33,346 @@ def formatMakeCommandFake(filename, args):
 class TestTestsRunner(FileBasedTestCase):
 
     def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+        self.rmtree(attributes.LOGS_DIRECTORY)
         self.makefile = StatMakefile(TEST_MAKEFILE_NAME)
-        self.execute = self.patch(CUT, execute.__name__, return_value=(0, []))
+        self.execute = Mock(return_value=(0, []))  # The child processes: the exit-code and the lines of their output
+        self.patch(CUT, 'executeSync', side_effect=self.__fakeExecuteSync)
+        self.patch(CUT, 'executeAsync', new=self.__fakeExecuteAsync)  # The shards are executed concurrently
+        self.connectJobServer = self.patch(CUT, 'connectJobServer', return_value=None)
         self.patch(CUT, 'os.environ', new=TEST_ENVIRONMENT_MOCK)
+        self.calculateRuntimeVariant = self.patch(CUT, 'calculateRuntimeVariant', return_value=TEST_RUNTIME_VARIANT)
+        self.prepareHeadersOverlay = self.patch(CUT, 'prepareHeadersOverlay', return_value=TEST_HEADERS_OVERLAY)
         self.patch(CUT, formatMakeCommand.__name__, side_effect=formatMakeCommandFake)
         self.expectedCommand = formatMakeCommandFake(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS)
 
+    def tearDown(self):
+        self.rmtree(attributes.LOGS_DIRECTORY)
+
+    def __fakeExecuteSync(self, command, sink, **kwargs):
+        status, lines = self.execute(command, **kwargs)
+        for line in lines:
+            sink.write(line.encode())
+        sink.close()
+        return status
+
+    async def __fakeExecuteAsync(self, command, sink, **kwargs):
+        return self.__fakeExecuteSync(command, sink, **kwargs)
+
+    def __readLogFile(self):
+        with open('/'.join([attributes.LOGS_DIRECTORY, TEST_LOGFILE_NAME])) as fp:
+            return fp.read()
+
     def test_compile(self):
         runner = createRunner()
         runner.compile()
 
-        expectedEnv = dict(TEST_ENVIRONMENT_MOCK, STAT_NAMESPACE=self.makefile.name)
-        self.assertCalls(self.execute, [call(self.expectedCommand, beSilent=False, env=expectedEnv)])
+        expectedEnv = dict(TEST_ENVIRONMENT_MOCK, STAT_NAMESPACE=self.makefile.name,
+                           STAT_RUNTIME_VARIANT=TEST_RUNTIME_VARIANT, STAT_PYTHON=sys.executable,
+                           STAT_HEADERS_OVERLAY=TEST_HEADERS_OVERLAY)
+        self.assertCalls(self.execute, [call(self.expectedCommand, env=expectedEnv)])
+
+    def test_compile_withParsedMakefile(self):
+        statMakefile = self.patch(CUT, StatMakefile.__name__)
+
+        TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, True, self.makefile).compile()
+
+        statMakefile.assert_not_called()
+        self.assertCalls(self.execute, [call(self.expectedCommand, env=ANY)])
+
+    def test_compile_forProductOfParsedMakefile(self):
+        self.makefile[StatMakefile.NAME] = 'product'
+
+        TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, True, self.makefile).compile()
+
+        expectedEnv = dict(TEST_ENVIRONMENT_MOCK, STAT_NAMESPACE=self.makefile.name, STAT_PRODUCT='product',
+                           STAT_RUNTIME_VARIANT=TEST_RUNTIME_VARIANT, STAT_PYTHON=sys.executable,
+                           STAT_HEADERS_OVERLAY=TEST_HEADERS_OVERLAY)
+        self.assertCalls(self.execute, [call(self.expectedCommand, env=expectedEnv)])
+
+    def test_compile_withinJobServer(self):
+        jobServer = Mock(makeFlags='-j --jobserver-auth=7,7', descriptors=(7,))
+        self.connectJobServer.return_value = jobServer
+        jobServer.attach_mock(self.execute, 'execute')
+
+        createRunner().compile()
+
+        expectedEnv = dict(TEST_ENVIRONMENT_MOCK, STAT_NAMESPACE=self.makefile.name, MAKEFLAGS='-j --jobserver-auth=7,7',
+                           STAT_RUNTIME_VARIANT=TEST_RUNTIME_VARIANT, STAT_PYTHON=sys.executable,
+                           STAT_HEADERS_OVERLAY=TEST_HEADERS_OVERLAY)
+        self.assertCalls(self.execute, [call(self.expectedCommand, env=expectedEnv, pass_fds=(7,))])
+        self.assertEqual(['acquire', 'execute', 'release'], [item[0] for item in jobServer.mock_calls])
+
+    def test_run_outsideOfJobServer(self):
+        jobServer = Mock(makeFlags='-j --jobserver-auth=7,7', descriptors=(7,))
+        self.connectJobServer.return_value = jobServer
+
+        createRunner().run()
+
+        self.assertEqual([], jobServer.mock_calls)
+
+    def test_run_inShards(self):
+        self.makefile[StatMakefile.SHARDS] = '3'
+        outputs = {'0/3': ['STAT_INDEX:Test_A:0\n', 'tests.c:1:Test_A:PASS\n', 'STAT_INDEX:Test_D:3\n',
+                           'tests.c:4:Test_D:PASS\n'],
+                   '1/3': ['STAT_INDEX:Test_B:1\n', 'tests.c:2:Test_B:PASS\n'],
+                   '2/3': ['STAT_INDEX:Test_C:2\n', 'tests.c:3:Test_C:PASS\n']}
+        self.execute.side_effect = lambda command, env: (0, outputs[env[SHARD_VARIABLE]])
+        runner = TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, False, self.makefile)
+
+        runner.run()
+
+        execPath = os.path.join(attributes.OUTPUT_DIRECTORY, TEST_PACKAGE_NAME, 'bin', self.makefile[StatMakefile.EXEC])
+        self.assertCalls(self.execute, [call(execPath, env=dict(TEST_ENVIRONMENT_MOCK, STAT_SHARD=shard))
+                                        for shard in ['0/3', '1/3', '2/3']])
+        tests = runner.statistics['Tests']
+        self.assertEqual(['Test_A', 'Test_B', 'Test_C', 'Test_D'], [test['Name'] for test in tests])
+        self.assertEqual(3, runner.statistics['Shards'])
+        self.assertEqual({'Run', 'ExitCode'}, set(runner.timings))
+        self.assertEqual(''.join(outputs['0/3'] + outputs['1/3'] + outputs['2/3']), self.__readLogFile())
+        self.assertEqual([TEST_LOGFILE_NAME], os.listdir(attributes.LOGS_DIRECTORY))
+
+    def test_run_inShards_uponFailure(self):
+        self.makefile[StatMakefile.SHARDS] = '2'
+        self.execute.side_effect = [(0, ['tests.c:1:Test_A:PASS\n']), (1, ['tests.c:2:Test_B:FAIL: Oops\n'])]
+        runner = TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, False, self.makefile)
+
+        self.assertRaises(TestsRunnerException, runner.run)
+
+        self.assertEqual(1, runner.timings['ExitCode'])
+        self.assertEqual(['PASSED', 'FAILED'], [test['Status'] for test in runner.statistics['Tests']])
+
+    def test_run_inShards_withinJobServer(self):
+        self.makefile[StatMakefile.SHARDS] = '3'
+        jobServer = FakeJobServer(self.execute)
+        self.connectJobServer.return_value = jobServer
+
+        TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, False, self.makefile).run()
+
+        self.assertEqual(['execute', 'acquire', 'execute', 'release', 'acquire', 'execute', 'release'], jobServer.calls)
+
+    def test_run_uponInvalidShards(self):
+        self.makefile[StatMakefile.SHARDS] = 'many'
+        runner = TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, False, self.makefile)
+
+        self.assertRaises(TestsRunnerException, runner.run)
+        self.execute.assert_not_called()
+
+    def test_buildRuntime(self):
+        runner = TestsRunner(TEST_MAKEFILE_NAME, ['INSTALL_BY_COPY="TRUE"'], False)
+        runner.buildRuntime()
+
+        expectedEnv = dict(TEST_ENVIRONMENT_MOCK, STAT_NAMESPACE=self.makefile.name,
+                           STAT_RUNTIME_VARIANT=TEST_RUNTIME_VARIANT, STAT_PYTHON=sys.executable,
+                           STAT_HEADERS_OVERLAY=TEST_HEADERS_OVERLAY)
+        expectedCommand = formatMakeCommandFake(TEST_MAKEFILE_NAME, ['INSTALL_BY_COPY="TRUE"', 'stat_runtime'])
+        self.assertCalls(self.execute, [call(expectedCommand, env=expectedEnv)])
+
+    def test_buildRuntime_uponCleaning(self):
+        runner = TestsRunner(TEST_MAKEFILE_NAME, ['INSTALL_BY_COPY="TRUE"', 'clean', 'rebuild'])
+        runner.buildRuntime()
+
+        expectedCommand = formatMakeCommandFake(TEST_MAKEFILE_NAME, ['-B', 'INSTALL_BY_COPY="TRUE"', 'stat_runtime'])
+        self.assertCalls(self.execute, [call(expectedCommand, env=ANY)])
+
+    def test_buildRuntime_uponFailure(self):
+        self.execute.return_value = (2, ['runtime compilation error'])
+
+        runner = createRunner()
+
+        self.assertRaises(TestsRunnerException, runner.buildRuntime)
+        self.assertEqual(['runtime compilation error'], runner.getLog())
 
     def test_run(self):
         runner = createRunner()
         runner.run()
 
         execPath = os.path.join(attributes.OUTPUT_DIRECTORY, TEST_PACKAGE_NAME, 'bin', self.makefile[StatMakefile.EXEC])
-        self.assertCalls(self.execute, [call(execPath, beSilent=False)])
+        self.assertCalls(self.execute, [call(execPath)])
 
-    def test_get_log(self):
-        self.execute.side_effect = [(0, ['compile-1', 'compile-2']), (0, ['run-1', 'run-2', 'run-3'])]
-        expected = ['compile-1', 'compile-2', 'run-1', 'run-2',  'run-3']
+    def __createExecutable(self, content='executable'):
+        execPath = os.path.join(attributes.OUTPUT_DIRECTORY, TEST_PACKAGE_NAME, 'bin', self.makefile[StatMakefile.EXEC])
+        if not os.path.isdir(os.path.dirname(execPath)):
+            os.makedirs(os.path.dirname(execPath))
+        with open(execPath, 'w') as fp:
+            fp.write(content)
+        return execPath
+
+    def test_runOrReplay_uponPassedExecutable(self):
+        execPath = self.__createExecutable()
+        self.execute.return_value = (0, ['run-1\n', 'run-2\n'])
+        createRunner(isVerbose=False).runOrReplay()
+        printMock = self.patchBuiltinObject('print')
 
         runner = createRunner()
+        runner.runOrReplay()
+
+        self.assertCalls(self.execute, [call(execPath)])
+        self.assertCalls(printMock, [call('run-1\n', end=''), call('run-2\n', end='')])
+        self.assertEqual(['run-1\n', 'run-2\n'], runner.getLog())
+        self.assertEqual({'ExitCode': 0}, runner.timings)
+        self.assertEqual({'Replayed': True}, runner.statistics)
+
+    def test_runOrReplay_recordsOnlyOutputOfRun(self):
+        execPath = self.__createExecutable()
+        self.execute.side_effect = [(0, ['compile-1\n']), (0, ['run-1\n', 'run-2\n'])]
+        runner = createRunner(isVerbose=False)
+        runner.compile()
+        runner.runOrReplay()
+        self.rmtree(attributes.LOGS_DIRECTORY)
+
+        createRunner(isVerbose=False).runOrReplay()
+
+        self.assertEqual('run-1\nrun-2\n', self.__readLogFile())
+        with open(execPath + RESULT_OUTPUT_EXTENSION) as fp:
+            self.assertEqual('run-1\nrun-2\n', fp.read())
+
+    def test_runOrReplay_uponMissingRecordedOutput(self):
+        execPath = self.__createExecutable()
+        createRunner(isVerbose=False).runOrReplay()
+        os.remove(execPath + RESULT_OUTPUT_EXTENSION)
+
+        createRunner(isVerbose=False).runOrReplay()
+
+        self.assertCalls(self.execute, [call(execPath)] * 2)
+
+    def test_runOrReplay_uponChangedExecutable(self):
+        execPath = self.__createExecutable()
+        createRunner(isVerbose=False).runOrReplay()
+        self.__createExecutable('another executable')
+
+        createRunner(isVerbose=False).runOrReplay()
+
+        self.assertCalls(self.execute, [call(execPath)] * 2)
+
+    def test_runOrReplay_uponChangedRuntimeInputs(self):
+        execPath = self.__createExecutable()
+        createRunner(isVerbose=False).runOrReplay()
+        self.patch(CUT, 'os.environ', new=dict(TEST_ENVIRONMENT_MOCK, STAT_SEED='7'))
+
+        createRunner(isVerbose=False).runOrReplay()
+
+        self.assertCalls(self.execute, [call(execPath)] * 2)
+
+    def test_runOrReplay_regardlessOfJobServer(self):
+        execPath = self.__createExecutable()
+        createRunner(isVerbose=False).runOrReplay()
+        self.patch(CUT, 'os.environ', new=dict(TEST_ENVIRONMENT_MOCK, STAT_JOBSERVER='output/jobserver.fifo'))
+
+        createRunner(isVerbose=False).runOrReplay()
+
+        self.assertCalls(self.execute, [call(execPath)])
+
+    def test_runOrReplay_regardlessOfSelectedProduct(self):
+        execPath = self.__createExecutable()
+        createRunner(isVerbose=False).runOrReplay()
+        self.patch(CUT, 'os.environ', new=dict(TEST_ENVIRONMENT_MOCK, STAT_PRODUCT='another_product'))
+
+        createRunner(isVerbose=False).runOrReplay()
+
+        self.assertCalls(self.execute, [call(execPath)])
+
+    def test_runOrReplay_uponFailedExecutable(self):
+        execPath = self.__createExecutable()
+        self.execute.return_value = (3, ['run-1\n'])
+        self.assertRaises(TestsRunnerException, createRunner(isVerbose=False).runOrReplay)
+
+        self.assertRaises(TestsRunnerException, createRunner(isVerbose=False).runOrReplay)
+
+        self.assertCalls(self.execute, [call(execPath)] * 2)
+
+    def test_get_log(self):
+        self.execute.side_effect = [(0, ['compile-1\n', 'compile-2\n']), (0, ['run-1\n', 'run-2\n', 'run-3\n'])]
+        expected = ['compile-1\n', 'compile-2\n', 'run-1\n', 'run-2\n', 'run-3\n']
+
+        runner = createRunner(isVerbose=False)
         runner.compile()
         runner.run()
 
         self.assertEqual(expected, runner.getLog())
+        self.assertEqual(''.join(expected), self.__readLogFile())
+
+    def test_get_log_keepsBoundedTail(self):
+        lines = ['line-{0}\n'.format(index) for index in range(OUTPUT_TAIL_SIZE + 10)]
+        self.execute.return_value = (0, lines)
+
+        runner = createRunner(isVerbose=False)
+        runner.compile()
+
+        self.assertEqual(lines[-OUTPUT_TAIL_SIZE:], runner.getLog())
+        self.assertEqual(''.join(lines), self.__readLogFile())
 
     def test_silent(self):
+        self.execute.return_value = (0, ['output\n'])
+        printMock = self.patchBuiltinObject('print')
+
         runner = createRunner(isVerbose=False)
         runner.compile()
         runner.run()
 
-        expectedEnv = dict(TEST_ENVIRONMENT_MOCK, STAT_NAMESPACE=self.makefile.name)
+        self.assertCalls(printMock, [])
+
+        expectedEnv = dict(TEST_ENVIRONMENT_MOCK, STAT_NAMESPACE=self.makefile.name,
+                           STAT_RUNTIME_VARIANT=TEST_RUNTIME_VARIANT, STAT_PYTHON=sys.executable,
+                           STAT_HEADERS_OVERLAY=TEST_HEADERS_OVERLAY)
         execPath = os.path.join(attributes.OUTPUT_DIRECTORY, TEST_PACKAGE_NAME, 'bin', self.makefile[StatMakefile.EXEC])
-        expected = [call(self.expectedCommand, beSilent=True, env=expectedEnv), call(execPath, beSilent=True)]
+        expected = [call(self.expectedCommand, env=expectedEnv),
+                    call(execPath)]
         self.assertCalls(self.execute, expected)
 
+    def test_timings(self):
+        self.execute.side_effect = [(0, ['compile-1\n', 'Linking...\n', 'Done.\n']), (3, [])]
+        self.patch(CUT, 'default_timer', side_effect=[10.0, 13.5, 14.0, 20.0, 21.25])
+
+        runner = createRunner()
+        runner.compile()
+        self.assertEqual({'Compile': 3.5, 'Link': 0.5, 'ExitCode': 0}, runner.timings)
+        self.assertRaises(TestsRunnerException, runner.run)
+
+        self.assertEqual({'Compile': 3.5, 'Link': 0.5, 'Run': 1.25, 'ExitCode': 3}, runner.timings)
+
+    def test_statistics_ofCompilationCache(self):
+        self.execute.return_value = (0, ['Cache hit: ./a.c\n', 'Cache miss: ./b.c\n', 'Cache hit: ./c.c\n',
+                                         'Linking...\n'])
+
+        runner = createRunner()
+        self.assertEqual({}, runner.statistics)
+        runner.compile()
+
+        self.assertEqual({'Cache': {'Hits': 2, 'Misses': 1}}, runner.statistics)
+
+    def test_statistics_ofTests(self):
+        self.execute.return_value = (1, ['Preamble\n', 'tests.c:10:Test_First:PASS\n',
+                                         'tests.c:20:Test_Second:FAIL: Expected 1 Was 2\n', '2 Tests 1 Failures\n'])
+
+        runner = createRunner()
+        self.assertRaises(TestsRunnerException, runner.run)
+
+        expected = [dict(Name='Test_First', File='tests.c', Line=10, Status='PASSED', Message=''),
+                    dict(Name='Test_Second', File='tests.c', Line=20, Status='FAILED', Message='Expected 1 Was 2')]
+        self.assertEqual({'Tests': expected}, runner.statistics)
+
+    def test_statistics_ofReplayedTests(self):
+        self.__createExecutable()
+        self.execute.return_value = (0, ['tests.c:10:Test_First:PASS\n', 'tests.c:15:Test_Second:IGNORE\n'])
+        createRunner(isVerbose=False).runOrReplay()
+
+        runner = createRunner(isVerbose=False)
+        runner.runOrReplay()
+
+        expected = [dict(Name='Test_First', File='tests.c', Line=10, Status='PASSED', Message=''),
+                    dict(Name='Test_Second', File='tests.c', Line=15, Status='IGNORED', Message='')]
+        self.assertEqual({'Replayed': True, 'Tests': expected}, runner.statistics)
+
+    def test_timings_withoutLinking(self):
+        self.execute.return_value = (2, ['compile-1\n'])
+        self.patch(CUT, 'default_timer', side_effect=[5.0, 7.0])
+
+        runner = createRunner()
+        self.assertRaises(TestsRunnerException, runner.compile)
+
+        self.assertEqual({'Compile': 2.0, 'Link': 0.0, 'ExitCode': 2}, runner.timings)
+
     def test_compile_uponFailure(self):
         self.execute.return_value = (11, ['output of compilation execution'])
 
@@ -94,20 +401,113 @@ class TestTestsRunner(FileBasedTestCase):
             self.fail('The code was supposed to fire an exception!')
 
     def test_writeLog(self):
-        executeResults = [(0, ['compile-1', 'compile-2']), (0, ['run-1', 'run-2', 'run-3'])]
-        expectedPrintOut = [line for results in executeResults for line in results[1]]
+        self.execute.side_effect = [(0, ['compile-1\n', 'compile-2\n']), (0, ['run-1\n', 'run-2\n', 'run-3\n'])]
         exceptionExtraInfo = "ERROR: Some extra information"
-        self.execute.side_effect = executeResults
-        runner = createRunner()
+        runner = createRunner(isVerbose=False)
         runner.compile()
         runner.run()
-        openMock = self.patchOpen()
 
         runner.writeLog(exceptionExtraInfo)
 
-        expected = [call('/'.join([attributes.LOGS_DIRECTORY, TEST_LOGFILE_NAME]), 'a'),
-                    call().__enter__(),
-                    call().writelines(expectedPrintOut),
-                    call().write(exceptionExtraInfo),
-                    call().__exit__(None, None, None)]
-        self.assertCalls(openMock, expected)
+        self.assertEqual('compile-1\ncompile-2\nrun-1\nrun-2\nrun-3\n' + exceptionExtraInfo, self.__readLogFile())
+
+    def test_compressLog_uponConfiguration(self):
+        self.execute.return_value = (0, ['compile-1\n'])
+        self.makefile[COMPRESS_LOGS_VARIABLE] = 'TRUE'
+        runner = TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, False, self.makefile)
+        runner.compile()
+
+        runner.compressLog()
+
+        logFilePath = '/'.join([attributes.LOGS_DIRECTORY, TEST_LOGFILE_NAME])
+        self.assertFalse(os.path.isfile(logFilePath))
+        with gzip.open(logFilePath + '.gz', 'rt') as fp:
+            self.assertEqual('compile-1\n', fp.read())
+
+    def test_compressLog_withoutConfiguration(self):
+        self.execute.return_value = (0, ['compile-1\n'])
+        runner = createRunner(isVerbose=False)
+        runner.compile()
+
+        runner.compressLog()
+
+        self.assertEqual('compile-1\n', self.__readLogFile())
+        self.assertFalse(os.path.isfile('/'.join([attributes.LOGS_DIRECTORY, TEST_LOGFILE_NAME]) + '.gz'))
+
+    def test_logFile_perProduct(self):
+        self.makefile[StatMakefile.NAME] = 'product'
+        self.execute.return_value = (0, ['compile-1\n'])
+
+        TestsRunner(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS, False, self.makefile).compile()
+
+        with open('/'.join([attributes.LOGS_DIRECTORY, 'product', TEST_LOGFILE_NAME])) as fp:
+            self.assertEqual('compile-1\n', fp.read())
+
+
+class FakeJobServer(object):
+    """
+    Records the acquisitions and the releases of the tokens along with the executions
+    """
+
+    def __init__(self, execute):
+        self.calls = []
+        execute.side_effect = lambda *args, **kwargs: self.calls.append('execute') or (0, [])
+
+    async def acquireAsync(self):
+        self.calls.append('acquire')
+
+    def release(self):
+        self.calls.append('release')
+
+
+class TestTestsRunnerAsync(FileBasedTestCase):
+
+    def setUp(self):
+        self.rmtree(attributes.OUTPUT_DIRECTORY)
+        self.rmtree(attributes.LOGS_DIRECTORY)
+        mkdir(attributes.LOGS_DIRECTORY)
+        self.makefile = StatMakefile(TEST_MAKEFILE_NAME)
+        self.outputs = {}
+        self.executions = []
+        self.patch(CUT, 'executeAsync', new=self.__fakeExecuteAsync)
+        self.patch(CUT, 'calculateRuntimeVariant', return_value=TEST_RUNTIME_VARIANT)
+        self.patch(CUT, 'prepareHeadersOverlay', return_value=TEST_HEADERS_OVERLAY)
+        self.patch(CUT, formatMakeCommand.__name__, side_effect=formatMakeCommandFake)
+        self.loop = createEventLoop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.rmtree(attributes.LOGS_DIRECTORY)
+
+    async def __fakeExecuteAsync(self, command, sink, **kwargs):
+        self.executions.append((command, kwargs))
+        status, output = self.outputs[command]
+        sink.write(output)
+        sink.close()
+        return status
+
+    def test_compileAsync_thenRunAsync(self):
+        execPath = os.path.join(attributes.OUTPUT_DIRECTORY, TEST_PACKAGE_NAME, 'bin', self.makefile[StatMakefile.EXEC])
+        command = formatMakeCommandFake(TEST_MAKEFILE_NAME, TEST_MAKE_ARGUMENTS)
+        self.outputs = {command: (0, b'Compiling...\nLinking...\n'), execPath: (0, b'run-1\nrun-2\n')}
+        runner = createRunner(isVerbose=False)
+
+        self.loop.run_until_complete(runner.compileAsync())
+        self.loop.run_until_complete(runner.runAsync())
+
+        self.assertEqual([command, execPath], [execution[0] for execution in self.executions])
+        self.assertEqual(['env'], list(self.executions[0][1]))
+        self.assertEqual(['Compiling...\n', 'Linking...\n', 'run-1\n', 'run-2\n'], runner.getLog())
+        self.assertEqual({'Compile', 'Link', 'Run', 'ExitCode'}, set(runner.timings))
+
+    def test_runAsync_uponFailure_logsStreamedLinesOnce(self):
+        execPath = os.path.join(attributes.OUTPUT_DIRECTORY, TEST_PACKAGE_NAME, 'bin', self.makefile[StatMakefile.EXEC])
+        self.outputs = {execPath: (1, b'run-1\n')}
+        runner = createRunner(isVerbose=False)
+
+        with self.assertRaises(TestsRunnerException) as context:
+            self.loop.run_until_complete(runner.runAsync())
+        runner.writeLog(str(context.exception))
+
+        with open('/'.join([attributes.LOGS_DIRECTORY, TEST_LOGFILE_NAME])) as fp:
+            self.assertEqual('run-1\n' + 2 * str(context.exception), fp.read())
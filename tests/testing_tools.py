@@ -7,7 +7,8 @@ from unittest import TestCase
 # noinspection PyUnresolvedReferences
 from xml.dom.minidom import Text
 
-from services import isWindows
+from services import isWindows, mkdir
+from stat_makefile import StatMakefile
 
 try:
     from unittest.mock import Mock, patch, call, mock_open, PropertyMock  # pylint: disable=no-name-in-module
@@ -31,6 +32,27 @@ def readFileLines(filePath):
     return lines
 
 
+def writeFile(path, content=''):
+    mkdir(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as fp:
+        fp.write(content)
+
+
+class FakeMakefile(dict):
+    """
+    The parsed makefile of a test-package, where the variables (by their names in the makefile) override the defaults
+    """
+
+    def __init__(self, name='simplified', files=('simple.mak',), **variables):
+        super(FakeMakefile, self).__init__({
+            'OUTPUT_DIR': attributes.OUTPUT_DIRECTORY, 'DUMMIES_DIR': 'dummies', StatMakefile.NAME: 'product',
+            StatMakefile.SOURCES: 'file_in_root.c', StatMakefile.INCLUDES: './',
+            StatMakefile.INTERFACES: 'first_dummy.h'})
+        self.update(variables)
+        self.name = name
+        self.files = list(files)
+
+
 def convertXmlToDictionary(xml):
     def recursive_dict(element):
         if isinstance(element, Text):
@@ -98,6 +120,17 @@ class AdvancedTestCase(TestCase):
         patcher = self.patch(BUILTINS_NAME, objectName, *args, **kwargs)
         return patcher
 
+    def patchStatMakefile(self, moduleName, parse):
+        """
+        Patches the parser of the makefiles, while its names of the variables stay intact
+
+        :param parse: a callable returning the parsed makefile (e.g. FakeMakefile) by its file-name
+        """
+        statMakefile = self.patch(moduleName, StatMakefile.__name__, side_effect=parse)
+        for key in [key for key in vars(StatMakefile) if key.isupper()]:
+            setattr(statMakefile, key, getattr(StatMakefile, key))
+        return statMakefile
+
     def patchWithSpy(self, moduleName, objectName):
         patcher = patch('{0}.{1}'.format(moduleName, objectName), SpyClass.getSpy(objectName, moduleName))
         return self.__addPatcher(patcher)
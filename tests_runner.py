@@ -4,51 +4,403 @@
 #
 # SPDX-License-Identifier: MIT
 
+
+import asyncio
+import gzip
 import os
+import sys
+from collections import deque
+from hashlib import sha1
+from json import load as loadJson
+from shutil import copyfileobj
+from timeit import default_timer
 
 import stat_attributes as attributes
-from services import execute, formatMakeCommand
+from services import formatMakeCommand, writeJsonFile, remove, mkdir
+from stat_cache import CACHE_HIT, CACHE_MISS
+from stat_executor import StatOutputSink, createEventLoop, executeSync, executeAsync, OUTPUT_TAIL_SIZE
+from stat_headers import prepareHeadersOverlay
+from stat_jobserver import JOBSERVER_VARIABLE, connectJobServer
 from stat_makefile import StatMakefile
+from stat_runtime import calculateRuntimeVariant
+from stat_unity import UnityResultParser, mergeShardResults
+
+LINKING_ANNOUNCEMENT = 'Linking...'
+RUNTIME_TARGET = 'stat_runtime'
+RESULT_EXTENSION = '.result.json'
+RESULT_OUTPUT_EXTENSION = '.result.log'
+COMPRESSED_LOG_EXTENSION = '.gz'
+# The configuration variable (of ".statconfig") that enables the compression of the logs of the passed packages
+COMPRESS_LOGS_VARIABLE = 'COMPRESS_LOGS'
+# The environment variables of this prefix are considered as inputs of the test-executables
+RUNTIME_VARIABLES_PREFIX = 'STAT_'
+# The environment variable selecting the shard of the tests a test-executable runs, i.e. "<index>/<amount of shards>"
+SHARD_VARIABLE = 'STAT_SHARD'
+# The environment variable selecting the tests a test-executable runs by their names, i.e. a glob-pattern
+TEST_FILTER_VARIABLE = 'STAT_TEST_FILTER'
+SHARD_LOG_EXTENSION = '.shard{0}.log'
 
 
 class TestsRunner(object):
 
-    def __init__(self, makefileName, makeArguments, isVerbose=True):
+    def __init__(self, makefileName, makeArguments, isVerbose=True, makefile=None):
+        """
+        :param makefile: the makefile parsed ahead (e.g. by the catalog of the test-packages); if None, it's parsed
+        """
         self.__fileName = makefileName
-        self.__makefile = StatMakefile(makefileName)
+        self.__makefile = StatMakefile(makefileName) if makefile is None else makefile
         self.__beSilent = not isVerbose
-        self.__log = []
+        self.__log = deque(maxlen=OUTPUT_TAIL_SIZE)  # The output is streamed into the log-file, its tail is kept
         self.__arguments = makeArguments
+        self.__timings = {}
+        self.__statistics = {}
+
+    @property
+    def timings(self):
+        """
+        :return: durations (in seconds) of the phases carried out so far along with the last exit-code
+        """
+        return self.__timings
+
+    @property
+    def statistics(self):
+        """
+        :return: figures of the package to be reported, e.g. the hits and misses of the compilation cache
+        """
+        return self.__statistics
 
     def __getOutputPath(self, *args):
         makefile = self.__makefile
         return os.path.join(attributes.OUTPUT_DIRECTORY, makefile[self.__makefile.NAME], makefile.name, *args)
 
+    def __composeEnvironment(self):
+        environ = dict(os.environ, STAT_NAMESPACE=self.__makefile.name,
+                       STAT_RUNTIME_VARIANT=calculateRuntimeVariant(self.__makefile), STAT_PYTHON=sys.executable,
+                       STAT_HEADERS_OVERLAY=prepareHeadersOverlay(self.__makefile))
+        if self.__makefile[StatMakefile.NAME]:  # The product the makefile was parsed for, regardless of the default one
+            environ[StatMakefile.PRODUCT] = self.__makefile[StatMakefile.NAME]
+        return environ
+
+    def __composeMakeExecution(self, makeCommand, **arguments):
+        """
+        Composes the execution of make, which joins the jobserver of the gear (if any) to run its jobs in parallel
+        """
+        environ = self.__composeEnvironment()
+        jobServer = connectJobServer()
+        if jobServer is not None:
+            environ['MAKEFLAGS'] = ' '.join([jobServer.makeFlags, environ.get('MAKEFLAGS', '')]).strip()
+            arguments['pass_fds'] = jobServer.descriptors
+        return _Execution(makeCommand, jobServer, env=environ, **arguments)
+
+    def buildRuntime(self):
+        """
+        Builds the variant of the shared runtime library the package links against; the requested cleaning of the
+        package is turned into an unconditional build of the runtime
+        """
+        self.__drive(self.__buildRuntime())
+
+    async def buildRuntimeAsync(self):
+        await self.__driveAsync(self.__buildRuntime())
+
     def compile(self):
-        environ = dict(os.environ, STAT_NAMESPACE=self.__makefile.name)
+        self.__drive(self.__compile())
+
+    async def compileAsync(self):
+        await self.__driveAsync(self.__compile())
+
+    def run(self):
+        self.__drive(self.__run())
+
+    async def runAsync(self):
+        await self.__driveAsync(self.__run())
+
+    def runOrReplay(self):
+        """
+        Replays the output of the previous run if the very same executable already passed with the same runtime inputs,
+        otherwise runs it and records its output upon success
+        """
+        self.__drive(self.__runOrReplay())
+
+    async def runOrReplayAsync(self):
+        await self.__driveAsync(self.__runOrReplay())
+
+    def compressLog(self):
+        """
+        Compresses the log-file of the package (once it passed), if requested by the configuration
+        """
+        logFilePath = self.__getLogFilePath()
+        if self.__makefile[COMPRESS_LOGS_VARIABLE].upper() != 'TRUE' or not os.path.isfile(logFilePath):
+            return
+        with open(logFilePath, 'rb') as source, gzip.open(logFilePath + COMPRESSED_LOG_EXTENSION, 'wb') as target:
+            copyfileobj(source, target)
+        remove(logFilePath)
+
+    async def compressLogAsync(self):
+        await asyncio.get_event_loop().run_in_executor(None, self.compressLog)
+
+    def __drive(self, steps):
+        """
+        Carries out the steps of a phase, executing each child process they yield and sending back its exit-code; the
+        child processes yielded at once (as a list) are executed concurrently and their exit-codes are sent back
+        """
+        status = None
+        while True:
+            try:
+                execution = steps.send(status)
+            except StopIteration:
+                return
+            if isinstance(execution, list):
+                loop = createEventLoop()
+                try:
+                    status = loop.run_until_complete(self.__executeConcurrently(execution))
+                finally:
+                    loop.close()
+            else:
+                status = self.__execute(execution)
+
+    async def __driveAsync(self, steps):
+        """
+        Carries out the steps of a phase on the running event-loop
+        """
+        status = None
+        while True:
+            try:
+                execution = steps.send(status)
+            except StopIteration:
+                return
+            if isinstance(execution, list):
+                status = await self.__executeConcurrently(execution)
+            else:
+                status, lines = await self.__executeAsync(execution)
+                self.__log.extend(lines)
+
+    def __execute(self, execution):
+        arguments = dict(execution.arguments)
+        sink = self.__openSink(arguments.pop('lineHandler', None), arguments.pop('logFilePath', None))
+        if execution.jobServer is not None:
+            execution.jobServer.acquire()
+        try:
+            status = executeSync(execution.command, sink, **arguments)
+        finally:
+            if execution.jobServer is not None:
+                execution.jobServer.release()
+        self.__log.extend(sink.lines)
+        return status
+
+    async def __executeAsync(self, execution):
+        """
+        :return: the exit-code of the child process along with the tail of its output
+        """
+        arguments = dict(execution.arguments)
+        sink = self.__openSink(arguments.pop('lineHandler', None), arguments.pop('logFilePath', None))
+        if execution.jobServer is not None:
+            await execution.jobServer.acquireAsync()
+        try:
+            status = await executeAsync(execution.command, sink, **arguments)
+        finally:
+            if execution.jobServer is not None:
+                execution.jobServer.release()
+        return status, sink.lines
+
+    async def __executeConcurrently(self, executions):
+        """
+        :return: the exit-codes of the child processes, whose tails of output are kept in the order of the executions
+        """
+        outcomes = await asyncio.gather(*[self.__executeAsync(execution) for execution in executions])
+        for _, lines in outcomes:
+            self.__log.extend(lines)
+        return [status for status, _ in outcomes]
+
+    def __openSink(self, lineHandler=None, logFilePath=None):
+        """
+        :return: the sink streaming the output of a child process into the log-file, while only its tail is kept
+        """
+        logFilePath = self.__getLogFilePath() if logFilePath is None else logFilePath
+        mkdir(os.path.dirname(logFilePath), exist_ok=True)
+        return StatOutputSink(logFilePath, self.__beSilent, lineHandler)
+
+    def __buildRuntime(self):
+        arguments = [argument for argument in self.__arguments
+                     if argument not in (attributes.CLEAN_TARGET, attributes.REBUILD_TARGET)]
+        forcing = ['-B'] if len(arguments) < len(self.__arguments) else []
+        makeCommand = formatMakeCommand(self.__fileName, forcing + arguments + [RUNTIME_TARGET])
+        status = yield self.__composeMakeExecution(makeCommand)
+        if status:
+            raise TestsRunnerException('The runtime of package "{0}" failed to build.'.format(self.__fileName))
+
+    def __compile(self):
         makeCommand = formatMakeCommand(self.__fileName, self.__arguments, )
-        status, log = execute(makeCommand, beSilent=self.__beSilent, env=environ)
-        self.__log.extend(log)
+        linkingStarts = []
+        cache = dict(Hits=0, Misses=0)
+        cacheAnnouncements = [(CACHE_HIT.format(''), 'Hits'), (CACHE_MISS.format(''), 'Misses')]
+
+        def inspectLine(line):
+            if not linkingStarts and line.strip() == LINKING_ANNOUNCEMENT:
+                linkingStarts.append(default_timer())
+            for announcement, counter in cacheAnnouncements:
+                if line.startswith(announcement):
+                    cache[counter] += 1
+
+        startTime = default_timer()
+        status = yield self.__composeMakeExecution(makeCommand, lineHandler=inspectLine)
+        endTime = default_timer()
+        linkingStart = linkingStarts[0] if linkingStarts else endTime
+        self.__timings.update(Compile=linkingStart - startTime, Link=endTime - linkingStart, ExitCode=status)
+        if cache['Hits'] or cache['Misses']:
+            self.__statistics['Cache'] = cache
         if status:
             raise TestsRunnerException('Package "{0}" failed to compile.'.format(self.__fileName))
 
-    def run(self):
-        status, log = execute(self.__getOutputPath('bin', self.__makefile[StatMakefile.EXEC]), beSilent=self.__beSilent)
-        self.__log.extend(log)
+    def __run(self):
+        shards = self.__countShards()
+        results = [UnityResultParser() for _ in range(shards)]
+        startTime = default_timer()
+        if shards > 1:
+            statuses = yield [self.__composeShardExecution(index, shards, results[index].parseLine)
+                              for index in range(shards)]
+            self.__mergeShardLogs(shards)
+            status = next((status for status in statuses if status), 0)
+            self.__statistics['Shards'] = shards
+        else:
+            status = yield _Execution(self.__getExecutablePath(), lineHandler=results[0].parseLine)
+        self.__timings.update(Run=default_timer() - startTime, ExitCode=status)
+        self.__reportTests(mergeShardResults([shard.results for shard in results]))
         if status:
             message = 'The executable of package "{0}" failed with error-code {1:#X}.\n'.format(self.__fileName,
                                                                                                 status & 0xFFFFFFFF)
             self.__log.append(message)
+            self.__writeToLogFile(message)
             raise TestsRunnerException(message)
 
+    def __countShards(self):
+        """
+        :return: the amount of shards the tests of the executable are split into (by "TEST_SHARDS" of the makefile)
+        """
+        shards = self.__makefile[StatMakefile.SHARDS] or '1'
+        if not shards.isdigit() or not int(shards):
+            raise TestsRunnerException(
+                'Package "{0}" has invalid amount of shards "{1}".'.format(self.__fileName, shards))
+        return int(shards)
+
+    def __composeShardExecution(self, index, shards, lineHandler):
+        """
+        The first shard takes the slot of this process, while each of the others holds a token of the jobserver (if
+        any), so that the shards spread over the free slots of the gear; each shard is logged into a file of its own
+        """
+        environ = dict(os.environ)
+        environ[SHARD_VARIABLE] = '{0}/{1}'.format(index, shards)
+        return _Execution(self.__getExecutablePath(), connectJobServer() if index else None, env=environ,
+                          lineHandler=lineHandler, logFilePath=self.__getShardLogFilePath(index))
+
+    def __mergeShardLogs(self, shards):
+        with open(self.__getLogFilePath(), 'ab') as target:
+            for index in range(shards):
+                shardLogFilePath = self.__getShardLogFilePath(index)
+                if os.path.isfile(shardLogFilePath):
+                    with open(shardLogFilePath, 'rb') as source:
+                        copyfileobj(source, target)
+                    remove(shardLogFilePath)
+
+    def __runOrReplay(self):
+        """
+        The output of the run is recorded into a file of its own next to the executable, rather than held in memory
+        """
+        resultPath = self.__getExecutablePath() + RESULT_EXTENSION
+        outputPath = self.__getExecutablePath() + RESULT_OUTPUT_EXTENSION
+        key = self.__calculateResultKey()
+        if _readResult(resultPath).get('Key') == key and os.path.isfile(outputPath):
+            self.__replay(outputPath)
+            self.__timings.update(ExitCode=0)
+            self.__statistics['Replayed'] = True
+            return
+        remove(resultPath)
+        logFilePath = self.__getLogFilePath()
+        logStart = os.path.getsize(logFilePath) if os.path.isfile(logFilePath) else 0
+        yield from self.__run()
+        with open(logFilePath, 'rb') as source, open(outputPath, 'wb') as target:
+            source.seek(logStart)
+            copyfileobj(source, target)
+        writeJsonFile(resultPath, dict(Key=key))
+
+    def __replay(self, outputPath):
+        results = UnityResultParser()
+        sink = self.__openSink(results.parseLine)
+        try:
+            with open(outputPath, 'rb') as source:
+                for data in iter(lambda: source.read(1 << 16), b''):
+                    sink.write(data)
+        finally:
+            sink.close()
+        self.__log.extend(sink.lines)
+        self.__reportTests(results.results)
+
+    def __reportTests(self, results):
+        if results:
+            self.__statistics['Tests'] = results
+
+    def __writeToLogFile(self, text):
+        logFilePath = self.__getLogFilePath()
+        mkdir(os.path.dirname(logFilePath), exist_ok=True)
+        with open(logFilePath, 'a') as fp:
+            fp.write(text)
+
+    def __getLogFilePath(self):
+        """
+        The log-files are kept per product, since the products are processed concurrently
+        """
+        product = self.__makefile[StatMakefile.NAME]
+        return '/'.join([attributes.LOGS_DIRECTORY] + ([product] if product else []) + [self.__makefile.name + '.log'])
+
+    def __getShardLogFilePath(self, index):
+        return self.__getLogFilePath()[:-len('.log')] + SHARD_LOG_EXTENSION.format(index)
+
+    def __getExecutablePath(self):
+        return self.__getOutputPath('bin', self.__makefile[StatMakefile.EXEC])
+
+    def __calculateResultKey(self):
+        key = sha1()
+        with open(self.__getExecutablePath(), 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1 << 16), b''):
+                key.update(chunk)
+        # The product is identified by the path of the executable, regardless of the one selected for this process
+        variables = sorted(item for item in os.environ.items() if item[0].startswith(RUNTIME_VARIABLES_PREFIX) and
+                           item[0] not in (JOBSERVER_VARIABLE, StatMakefile.PRODUCT))
+        key.update(repr(variables).encode('utf-8'))
+        return key.hexdigest()
+
     def getLog(self):
-        return self.__log
+        """
+        :return: the tail of the output, since the output is streamed into the log-file
+        """
+        return list(self.__log)
 
     def writeLog(self, extraInfo=''):
-        logFilePath = '/'.join([attributes.LOGS_DIRECTORY, self.__makefile.name + '.log'])
-        with open(logFilePath, 'a') as fp:
-            fp.writelines(self.__log)
-            fp.write(extraInfo)
+        self.__writeToLogFile(extraInfo)
+
+
+class _Execution(object):
+    """
+    A child process to be executed on behalf of a phase, along with the arguments of its execution
+    """
+
+    def __init__(self, command, jobServer=None, **arguments):
+        """
+        :param jobServer: the client of the jobserver, whose token is held for the implicit slot of make (if any)
+        """
+        self.command = command
+        self.jobServer = jobServer
+        self.arguments = arguments
+
+
+def _readResult(filePath):
+    if not os.path.isfile(filePath):
+        return {}
+    try:
+        with open(filePath) as fp:
+            result = loadJson(fp)
+    except ValueError:
+        return {}
+    return result if isinstance(result, dict) else {}
 
 
 class TestsRunnerException(Exception):